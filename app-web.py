@@ -1,5 +1,5 @@
 import os
-from flask import Flask, request, jsonify, send_file, render_template_string
+from flask import Flask, Response, request, jsonify, send_file, render_template_string
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 import logging
@@ -9,7 +9,36 @@ import re
 import requests
 from io import BytesIO
 import json
+import time
+import shutil
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urlparse
+from summarizer_engine import (SentenceIndex, STOP_WORDS, WEB_SENTENCE_PATTERN, MAX_SUMMARY_SENTENCES, clean_text,
+                               count_sentences, ranked_summary_sentences, summary_length)
+from graph_summarizer import rank_sentences
+from streaming_summarizer import summarize_chunks, iter_text_file
+from hierarchical_summarizer import hierarchical_extractive_reduce, PAGE_BREAK, DEFAULT_CHUNK_CHARS
+from pdf_extraction import iter_pages
+from text_actions import process_text, render_summaries as render_text_summaries, TEXT_ACTIONS, TEXT_SUMMARY_MODES, SUMMARY_LENGTHS
+from text_analytics import analyze, compression_stats
+from idf_lexicon import apply_lexicon
+from result_cache import ResultCache, ObjectCache, file_sha256, text_sha256, make_key
+from near_duplicates import NearDuplicateIndex, fingerprint
+from query_summarizer import QueryIndex
+try:
+    from incremental_summarizer import DocumentState
+except ImportError:  # NumPy/SciPy not installed: pages are always summarized in full
+    DocumentState = None
+try:
+    from ocr_cache import OCRCache, file_image_key
+except ImportError:  # Pillow not installed: every image goes to the OCR API
+    OCRCache = None
+from result_store import open_result_store, DEFAULT_DB_PATH, DEFAULT_MAX_BYTES
+
+# Spawned PDF extraction workers (pdf_extraction.get_pool) import this script
+# again as __mp_main__; they only run pdf_extraction, so start-up work is skipped
+PDF_WORKER_IMPORT = __name__ == '__mp_main__'
 
 app = Flask(__name__)
 CORS(app)
@@ -20,6 +49,86 @@ OUTPUT_FOLDER = 'output'
 app.config['UPLOAD_FOLDER'] = os.path.join(os.path.dirname(os.path.abspath(__file__)), UPLOAD_FOLDER)
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB
 
+# Summarization modes accepted by the processing endpoints
+SUMMARY_MODES = {'advanced', 'graph', 'hierarchical'}
+
+# Uploads at least this large are summarized page by page (PDF) or block by
+# block (TXT) without ever building the full document string
+STREAMING_MIN_BYTES = 1 * 1024 * 1024
+STREAMING_EXTENSIONS = {'.pdf', '.txt'}
+
+# Scanned PDF pages (too little text layer) sent to the online OCR API per
+# document, several at a time; later scanned pages keep their text layer.
+# 0 disables OCR for PDFs
+PDF_OCR_MAX_PAGES = int(os.environ.get('PDF_OCR_MAX_PAGES', 20))
+
+# Summary lengths returned next to the default summary by /process (sentence
+# counts or shares of the document), all rendered from one ranking
+SUMMARY_GRANULARITIES = ('3', '5', '10', '20%')
+SUPPORTED_LENGTHS = f'comma-separated sentence counts (1-{MAX_SUMMARY_SENTENCES}) or percentages, e.g. 3,5,10,20%'
+
+# Longest accepted ``query`` for query-focused summaries
+QUERY_MAX_CHARS = 1000
+
+# Longest accepted page ``url`` for incremental re-summarization
+URL_MAX_CHARS = 2048
+
+BRIEF_CONTENT_SUMMARY = "Document processed successfully. Content appears to be brief or formatted data."
+
+# Largest text accepted by /process-text (about 400 pages)
+PROCESS_TEXT_MAX_CHARS = 2 * 1024 * 1024
+
+# Document types accepted by /process and /process-batch
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp'}
+DOCUMENT_EXTENSIONS = IMAGE_EXTENSIONS | {'.pdf', '.txt'}
+SUPPORTED_DOCUMENTS = 'PDF, PNG, JPG, JPEG, GIF, BMP, WEBP, TXT'
+
+# /process-batch limits: files per request (zip members included) and total
+# uncompressed size of zip members, so a small zip can't expand without bound
+BATCH_MAX_FILES = int(os.environ.get('BATCH_MAX_FILES', 50))
+BATCH_MAX_UNCOMPRESSED_BYTES = int(os.environ.get('BATCH_MAX_UNCOMPRESSED_BYTES', 200 * 1024 * 1024))
+
+# Threads processing batch files, shared by all batch requests of a worker so
+# concurrent batches queue instead of multiplying threads (extraction and
+# OCR calls mostly wait on I/O or release the GIL)
+BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', min(4, os.cpu_count() or 1)))
+batch_pool = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix='batch')
+
+# Results keyed by content hash (or video ID) + summarization parameters, so
+# repeated uploads skip extraction, OCR, transcription and summarization
+summary_cache = ResultCache(
+    max_entries=int(os.environ.get('SUMMARY_CACHE_MAX_ENTRIES', 256)),
+    max_bytes=int(os.environ.get('SUMMARY_CACHE_MAX_BYTES', 64 * 1024 * 1024)),
+    ttl=int(os.environ.get('SUMMARY_CACHE_TTL', 24 * 3600))
+)
+
+# Persistent store behind the cache: survives restarts and is shared by all
+# gunicorn workers (set RESULT_STORE_PATH to an empty string to disable)
+result_store = open_result_store(
+    os.environ.get('RESULT_STORE_PATH', DEFAULT_DB_PATH) if not PDF_WORKER_IMPORT else '',
+    max_bytes=int(os.environ.get('RESULT_STORE_MAX_BYTES', DEFAULT_MAX_BYTES))
+)
+
+# Inverted sentence indexes of recently queried documents, so follow-up
+# queries skip extraction and scoring (per process; each holds a whole document)
+query_indexes = ObjectCache(max_entries=int(os.environ.get('QUERY_INDEX_CACHE_ENTRIES', 16)))
+
+# Term statistics of recently summarized pages by URL, so a changed page is
+# re-summarized from the sentences that changed (per process; 0 disables)
+page_states = ObjectCache(max_entries=int(os.environ.get('INCREMENTAL_CACHE_ENTRIES', 32)))
+
+# OCR texts of recent images by perceptual hash, so a re-compressed or
+# resized copy skips the OCR API round-trip (per process; see ocr_cache)
+ocr_cache = OCRCache() if OCRCache is not None else None
+
+# Documents whose shingles overlap an already processed one by at least this
+# Jaccard similarity reuse its summary (same article from another URL, with
+# ads or comments changed); 0 disables near-duplicate matching
+NEAR_DUPLICATE_THRESHOLD = float(os.environ.get('NEAR_DUPLICATE_THRESHOLD', 0.8))
+
+# Sketches live next to the results they point at, shared by all workers
+near_duplicate_index = result_store if result_store is not None else NearDuplicateIndex()
+
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs(OUTPUT_FOLDER, exist_ok=True)
 
@@ -27,33 +136,64 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 def extract_text_with_online_ocr(image_path):
-    """Use online OCR API as fallback"""
+    """Use online OCR API as fallback
+
+    Images looking like one recognized before (by perceptual hash) reuse
+    its text instead of calling the API.
+    """
+    image_key = file_image_key(image_path) if ocr_cache is not None else None
+    text = ocr_cache.get(image_key, 'ocr.space') if image_key is not None else None
+    if text is not None:
+        logger.info(f'🖼️ OCR cache hit: {os.path.basename(image_path)}')
+        return text
+    try:
+        with open(image_path, 'rb') as f:
+            text = request_online_ocr(f)
+    except OSError as e:
+        logger.error(f"Online OCR failed: {str(e)}")
+        return None
+    if text and image_key is not None:
+        ocr_cache.set(image_key, text, 'ocr.space')
+    return text
+
+def extract_pdf_page_with_online_ocr(pdf_path, page_number):
+    """OCR one scanned PDF page with the online API, sent as a one-page PDF (None on failure)"""
+    import PyPDF2
+
+    writer = PyPDF2.PdfWriter()
+    with open(pdf_path, 'rb') as file:
+        writer.add_page(PyPDF2.PdfReader(file).pages[page_number])
+        page_pdf = BytesIO()
+        writer.write(page_pdf)
+    return request_online_ocr(('page.pdf', page_pdf.getvalue(), 'application/pdf'))
+
+def request_online_ocr(file):
+    """Text the OCR.space API recognizes in ``file`` (an open file or a requests file tuple), or None"""
     try:
         # Try OCR.space API (free tier available)
         api_key = os.environ.get('OCR_API_KEY', 'helloworld')  # Free API key
         
-        with open(image_path, 'rb') as f:
-            files = {'file': f}
-            data = {
-                'apikey': api_key,
-                'language': 'eng',
-                'isOverlayRequired': False,
-                'scale': True,
-                'OCREngine': 2
-            }
-            
-            response = requests.post(
-                'https://api.ocr.space/parse/image',
-                files=files,
-                data=data,
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                if result.get('ParsedResults'):
-                    text = result['ParsedResults'][0].get('ParsedText', '')
-                    return text.strip()
+        files = {'file': file}
+        data = {
+            'apikey': api_key,
+            'language': 'eng',
+            'isOverlayRequired': False,
+            'scale': True,
+            'OCREngine': 2
+        }
+        
+        response = requests.post(
+            'https://api.ocr.space/parse/image',
+            files=files,
+            data=data,
+            timeout=30
+        )
+        
+        if response.status_code == 200:
+            result = response.json()
+            if result.get('ParsedResults'):
+                text = result['ParsedResults'][0].get('ParsedText', '')
+                return text.strip()
         
         return None
     except Exception as e:
@@ -108,19 +248,20 @@ Format: Image file uploaded successfully
     except Exception as e:
         return f"Image processing completed. File analyzed: {os.path.basename(image_path)}"
 
-def extract_text_from_pdf_basic(pdf_path):
+def iter_pdf_pages(pdf_path, ocr_report=None):
+    """Yield the text of each PDF page in order (requires PyPDF2; long PDFs are extracted on a process pool)
+
+    Scanned pages go to the online OCR API (see PDF_OCR_MAX_PAGES);
+    ``ocr_report`` receives the pdf_extraction.iter_pages() OCR counts.
+    """
+    ocr = extract_pdf_page_with_online_ocr if PDF_OCR_MAX_PAGES > 0 else None
+    for page in iter_pages(pdf_path, ocr=ocr, max_ocr_pages=PDF_OCR_MAX_PAGES, report=ocr_report):
+        yield page + "\n"
+
+def extract_text_from_pdf_basic(pdf_path, page_separator='', ocr_report=None):
     """Extract text from PDF using PyPDF2"""
     try:
-        import PyPDF2
-        
-        text = ""
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                page_text = page.extract_text()
-                text += page_text + "\n"
+        text = page_separator.join(iter_pdf_pages(pdf_path, ocr_report))
         
         return text.strip()
         
@@ -131,68 +272,382 @@ def extract_text_from_pdf_basic(pdf_path):
         logger.error(f"PDF extraction error: {str(e)}")
         return f"PDF file processed: {os.path.basename(pdf_path)}. Content analysis completed."
 
-def advanced_summarize(text, max_sentences=5):
-    """Advanced text summarization using sentence scoring"""
+def advanced_summarize(text, max_sentences=5, mode='advanced'):
+    """Advanced text summarization using sentence scoring
+
+    mode='graph' ranks sentences by centrality in a sentence similarity graph
+    (TextRank-style) instead of the length/position/keyword score.
+    mode='hierarchical' summarizes long documents section by section on a
+    process pool and then summarizes the section summaries.
+    """
+    return summarize_with_analytics(text, max_sentences, mode)[0]
+
+def summarize_with_analytics(text, max_sentences=5, mode='advanced'):
+    """advanced_summarize() plus text_analytics.analyze() from the same token stream
+
+    Analytics are None for brief texts and for hierarchical summaries,
+    which never tokenize the whole document at once.
+    """
+    return summarize_document(text, max_sentences, mode)[:2]
+
+def summarize_document(text, max_sentences=5, mode='advanced'):
+    """(summary, analytics, ranking) of ``text``; see rank_with_analytics() for the ranking
+
+    The ranking is None for brief texts.
+    """
     if not text or len(text.strip()) < 50:
-        return "Document processed successfully. Content appears to be brief or formatted data."
-    
-    # Clean and prepare text
-    text = re.sub(r'\s+', ' ', text).strip()
-    
-    # Split into sentences
-    sentences = re.split(r'[.!?]+', text)
-    sentences = [s.strip() for s in sentences if len(s.strip()) > 10]
+        return BRIEF_CONTENT_SUMMARY, None, None
     
-    if len(sentences) <= max_sentences:
-        return text
-    
-    # Create word frequency map (excluding common words)
-    stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can', 'this', 'that', 'these', 'those'}
-    
-    word_freq = {}
-    words = re.findall(r'\b\w+\b', text.lower())
+    if mode == 'hierarchical' and len(text) > DEFAULT_CHUNK_CHARS:
+        # Chunk at page and section boundaries before clean_text() removes them
+        ranking = hierarchical_ranking(text)
+        return render_summary(ranking, max_sentences), None, ranking
     
-    for word in words:
-        if word not in stop_words and len(word) > 3:
-            word_freq[word] = word_freq.get(word, 0) + 1
+    ranking, analytics = rank_with_analytics(text, mode)
+    return render_summary(ranking, max_sentences), analytics, ranking
+
+def rank_with_analytics(text, mode='advanced'):
+    """Score the sentences of ``text`` once for summaries of every length
+
+    Returns the ranking (a JSON-serializable dict for render_summary(), so
+    it can be cached and a different length costs only the selection) and
+    text_analytics.analyze() of the same index.
+    """
+    # Clean and prepare text
+    text = clean_text(text)
     
-    # Score sentences
-    scores = []
-    for i, sentence in enumerate(sentences):
-        score = 0
-        sentence_words = re.findall(r'\b\w+\b', sentence.lower())
-        
-        # Length score (prefer medium-length sentences)
-        length_score = min(len(sentence_words) / 15, 1.0)
-        score += length_score * 0.3
-        
-        # Position score (prefer sentences from beginning and end)
-        position_score = 1.0 if i < 2 or i >= len(sentences) - 2 else 0.5
-        score += position_score * 0.3
-        
-        # Keyword frequency score
-        if sentence_words and word_freq:
-            keyword_score = sum(word_freq.get(word, 0) for word in sentence_words) / len(sentence_words)
-            score += min(keyword_score / max(word_freq.values()), 1.0) * 0.4
-        
-        scores.append((score, sentence))
+    # Split into sentences and tokenize once
+    index = SentenceIndex.from_text(text, WEB_SENTENCE_PATTERN, min_length=10, stop_words=STOP_WORDS)
+    # Corpus IDF weights for keywords, when a lexicon has been built
+    apply_lexicon(index)
+    analytics = analyze(index, text)
     
-    # Select top sentences
-    scores.sort(reverse=True, key=lambda x: x[0])
-    selected_sentences = [s[1] for s in scores[:max_sentences]]
+    scores = rank_sentences(index) if mode == 'graph' else None
+    ranking = {'sentences': len(index), 'words': len(text.split()), 'ranked': index.summary_ranking(scores)}
+    if len(index) <= MAX_SUMMARY_SENTENCES:
+        # Short enough to be its own summary at some lengths
+        ranking['text'] = text
+    return ranking, analytics
+
+def hierarchical_ranking(text):
+    """rank_with_analytics() ranking of the MAX_SUMMARY_SENTENCES sentences a hierarchical run keeps
+
+    Chunks are reduced on the shared pool; only the sentences left at the
+    end are ranked, so the whole document is never tokenized at once.
+    """
+    reduced, _ = hierarchical_extractive_reduce(text, MAX_SUMMARY_SENTENCES)
+    index = SentenceIndex.from_text(clean_text(reduced), WEB_SENTENCE_PATTERN, min_length=10, stop_words=STOP_WORDS)
+    apply_lexicon(index)
+    text = clean_text(text)
+    ranking = {'sentences': count_sentences(text), 'words': len(text.split()), 'ranked': index.summary_ranking()}
+    if ranking['sentences'] <= MAX_SUMMARY_SENTENCES:
+        ranking['text'] = text
+    return ranking
+
+def render_summary(ranking, max_sentences=5):
+    """Summary of ``max_sentences`` from a rank_with_analytics() ranking, keeping the top ones in original order"""
+    if ranking['sentences'] <= max_sentences and 'text' in ranking:
+        return ranking['text']
+    summary = '. '.join(ranked_summary_sentences(ranking['ranked'], max_sentences)) + '.'
+    return format_summary(summary, ranking['words'])
+
+def render_summaries(ranking, lengths):
+    """``{length: summary}`` for length specs such as '5' or '20%', or None without a ranking"""
+    if ranking is None:
+        return None
+    return {spec: render_summary(ranking, summary_length(spec, ranking['sentences'])) for spec in lengths}
+
+def parse_summary_lengths(value):
+    """Length specs of a comma-separated ``lengths`` form field (SUMMARY_GRANULARITIES when empty)
+
+    Raises ValueError for an invalid spec.
+    """
+    if not value:
+        return SUMMARY_GRANULARITIES
+    lengths = tuple(dict.fromkeys(spec.strip() for spec in value.split(',') if spec.strip()))
+    for spec in lengths:
+        summary_length(spec, 1)
+    return lengths
+
+def parse_query(value):
+    """The stripped ``query`` parameter, or None when absent; raises ValueError when it isn't usable"""
+    if value is None:
+        return None
+    if not isinstance(value, str) or len(value) > QUERY_MAX_CHARS:
+        raise ValueError(f'Query must be text of at most {QUERY_MAX_CHARS} characters')
+    return value.strip() or None
+
+def parse_page_url(value):
+    """The ``url`` parameter of a page summary, or None when absent; raises ValueError when it isn't usable"""
+    if value is None:
+        return None
+    if not isinstance(value, str) or len(value) > URL_MAX_CHARS:
+        raise ValueError(f'URL must be text of at most {URL_MAX_CHARS} characters')
+    return value.strip() or None
+
+def format_summary(summary, original_words):
+    """Add the SummaBrowser header and word counts to a summary"""
+    return f"📄 SUMMARY (Generated by SummaBrowser AI)\n\n{summary}\n\n---\nSummary contains {len(summary.split())} words from original {original_words} words."
+
+def lookup_result(cache_key):
+    """Look a result up in the in-process cache, then in the shared store"""
+    result = summary_cache.get(cache_key)
+    if result is None and result_store is not None:
+        result = result_store.get(cache_key)
+        if result is not None:
+            summary_cache.set(cache_key, result)
+    return result
+
+def remember_result(cache_key, result, kind, content_hash, extracted_text=None, sketch=None, scope=None):
+    """Save a result in the in-process cache and the shared store
+
+    With a ``sketch`` the result can later be found as a near-duplicate
+    by documents processed with the same ``scope``.
+    """
+    summary_cache.set(cache_key, result)
+    if result_store is not None:
+        result_store.put(cache_key, result, kind=kind, content_hash=content_hash, extracted_text=extracted_text)
+    if sketch is not None:
+        near_duplicate_index.add_fingerprint(cache_key, scope, sketch)
+
+def stored_extracted_text(cache_key):
+    """Extracted text saved with a result in the shared store, or None"""
+    if result_store is None:
+        return None
+    stored = result_store.get(cache_key)
+    return stored.get('extracted_text') if stored is not None else None
+
+def query_focused_ranking(query, document_key, get_text, mode='advanced'):
+    """Ranking of a document's sentences for ``query`` (see render_summary()) and the report returned with it
+
+    The document's inverted index is cached under ``document_key``;
+    ``get_text()`` is only called to build it. Returns (None, report) when
+    the document has no sentences to rank.
+    """
+    index_key = f'{document_key}&query-index'
+    query_index = query_indexes.get(index_key)
+    index_cached = query_index is not None
+    if query_index is None:
+        text = get_text()
+        if not text:
+            return None, None
+        query_index = QueryIndex.from_text(text, mode)
+        query_indexes.set(index_key, query_index)
+
+    ranked, matched = query_index.ranking(query)
+    report = {'text': query, 'matched_terms': matched, 'index_cached': index_cached}
+    if not len(query_index):
+        return None, report
+    ranking = {'sentences': len(query_index), 'words': query_index.words, 'ranked': ranked}
+    if query_index.text is not None:
+        ranking['text'] = query_index.text
+    return ranking, report
+
+def query_focused_transcript(query, transcript, summary, mode='advanced'):
+    """(summary, query report) of a video: the transcript summarized for ``query``, or ``summary`` unchanged"""
+    if not query or not transcript:
+        return summary, None
+    ranking, report = query_focused_ranking(
+        query, make_key('transcript', text_sha256(transcript), mode=mode), lambda: transcript, mode
+    )
+    return (render_summary(ranking) if ranking is not None else summary), report
+
+def summarize_page_incrementally(url, text, content_hash, length='brief'):
+    """(result, changes): summaries of a page updated from its last version at ``url``, or (None, None)
+
+    Only the sentences that changed since the last submission are
+    re-tokenized (see incremental_summarizer.DocumentState). Returns
+    (None, None) when incremental summarization is unavailable or the text
+    needs a full run.
+    """
+    if DocumentState is None or page_states.max_entries <= 0:
+        return None, None
+    state_key = make_key('page', url, mode='advanced')
+    state = page_states.get(state_key)
+    if state is None:
+        state = DocumentState()
+        page_states.set(state_key, state)
+    with state.lock:
+        changes = state.update(text, content_hash)
+        if changes is None:
+            return None, None
+        summaries = state.summaries(SUMMARY_LENGTHS)
+    return {'summaries': summaries, 'summary': summaries[length]}, changes
+
+def near_duplicate_sketch(text):
+    """Near-duplicate fingerprint of a text, or None when matching is disabled or the text is too short"""
+    return fingerprint(text) if NEAR_DUPLICATE_THRESHOLD > 0 else None
+
+def lookup_near_duplicate(sketch, scope):
+    """Stored result of an already processed near-duplicate and its similarity, or (None, None)"""
+    if sketch is None:
+        return None, None
+    match = near_duplicate_index.find_near_duplicate(sketch, scope, NEAR_DUPLICATE_THRESHOLD)
+    if match is None:
+        return None, None
+    key, score = match
+    result = lookup_result(key)
+    if result is None:
+        return None, None
+    return result, round(score, 3)
+
+def stream_summarize(chunks, max_sentences=5):
+    """Summarize an iterator of text chunks without building the full document
+
+    Returns the summary, the number of characters consumed and a ranking
+    for render_summaries() (None for brief content).
+    """
+    summary_sentences, summarizer = summarize_chunks(chunks, max_sentences)
     
-    # Maintain original order
-    summary_sentences = []
-    for sentence in sentences:
-        if sentence in selected_sentences:
-            summary_sentences.append(sentence)
+    if summarizer.char_count < 50 or not summary_sentences:
+        return BRIEF_CONTENT_SUMMARY, summarizer.char_count, None
     
     summary = '. '.join(summary_sentences) + '.'
+    ranking = {'sentences': summarizer.sentence_count, 'words': summarizer.word_count,
+               'ranked': summarizer.summary_ranking()}
     
-    # Add metadata
-    summary = f"📄 SUMMARY (Generated by SummaBrowser AI)\n\n{summary}\n\n---\nSummary contains {len(summary.split())} words from original {len(text.split())} words."
+    return format_summary(summary, summarizer.word_count), summarizer.char_count, ranking
+
+def unique_upload_path(name):
+    """Secure path in the upload folder for ``name`` that doesn't overwrite another upload"""
+    filename = secure_filename(name) or 'upload'
+    file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+
+    # Handle duplicate filenames
+    counter = 1
+    original_path = file_path
+    while os.path.exists(file_path):
+        base, ext = os.path.splitext(original_path)
+        file_path = f"{base}_{counter}{ext}"
+        filename = os.path.basename(file_path)
+        counter += 1
+    return file_path, filename
+
+def extract_upload_text(file_path, filename, file_ext, mode='advanced'):
+    """Text of a saved upload and whether it may be cached (False for OCR fallbacks)"""
+    text = ""
+    cacheable = True
+    if file_ext == '.txt':
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            text = f.read()
+    elif file_ext == '.pdf':
+        # Hierarchical mode chunks at page boundaries
+        ocr_report = {}
+        text = extract_text_from_pdf_basic(file_path, PAGE_BREAK if mode == 'hierarchical' else '', ocr_report)
+        # Don't remember text missing the scanned pages whose OCR call failed
+        cacheable = not ocr_report.get('ocr_failed')
+    elif file_ext in IMAGE_EXTENSIONS:
+        # Try online OCR first, then fallback to basic analysis
+        text = extract_text_with_online_ocr(file_path)
+        if not text or len(text.strip()) < 20:
+            text = extract_text_basic_image_analysis(file_path)
+            # Don't remember a placeholder caused by a failed OCR call
+            cacheable = False
+    return text, cacheable
+
+def summarize_upload(file_path, filename, file_ext, mode='advanced', lengths=SUMMARY_GRANULARITIES, query=None):
+    """Extract and summarize a saved upload, reusing cached and near-duplicate results
+
+    Returns a dict with the summary, the response fields ``summaries`` (one
+    per entry of ``lengths``, from the cached sentence ranking), ``cached``,
+    ``near_match``, ``query`` and ``stats``, and ``timings`` in
+    milliseconds. With a ``query`` the summaries are focused on it (see
+    query_focused_ranking()).
+    """
+    start = time.perf_counter()
+
+    # Reuse the result of an identical upload processed with the same settings
+    content_hash = file_sha256(file_path)
+    cache_key = make_key('file', content_hash, ext=file_ext, mode=mode)
+    cached = lookup_result(cache_key)
+
+    # Extract text based on file type
+    text = ""
+    summary = None
+    analytics = None
+    ranking = None
+    near_match = None
+    sketch = None
+    cacheable = True
     
-    return summary
+    if cached is not None:
+        logger.info(f'Cache hit: {filename}')
+        summary = cached['summary']
+        original_length = cached['original_length']
+        analytics = cached.get('analytics')
+        ranking = cached.get('ranking')
+    elif (file_ext in STREAMING_EXTENSIONS and mode == 'advanced' and not query
+            and os.path.getsize(file_path) >= STREAMING_MIN_BYTES):
+        # Large documents: summarize while reading, with bounded memory
+        ocr_report = {}
+        chunks = iter_text_file(file_path) if file_ext == '.txt' else iter_pdf_pages(file_path, ocr_report)
+        try:
+            summary, original_length, ranking = stream_summarize(chunks)
+            cacheable = not ocr_report.get('ocr_failed')
+        except ImportError:
+            # PyPDF2 not available
+            text = extract_text_from_pdf_basic(file_path)
+            cacheable = False
+        except Exception as e:
+            # Unreadable (corrupt or encrypted) PDF, answered like extract_text_from_pdf_basic() does
+            logger.error(f"PDF extraction error: {str(e)}")
+            text = f"PDF file processed: {os.path.basename(file_path)}. Content analysis completed."
+            cacheable = False
+    else:
+        text, cacheable = extract_upload_text(file_path, filename, file_ext, mode)
+    extracted = time.perf_counter()
+
+    if summary is None:
+        if not text or len(text.strip()) < 10:
+            text = f"File '{filename}' processed successfully. Content analysis completed."
+            cacheable = False
+
+        # Same article from another source: reuse the summary of the processed copy
+        sketch = near_duplicate_sketch(text) if cacheable else None
+        near_result, near_match = lookup_near_duplicate(sketch, make_key('file', '*', mode=mode))
+        if near_result is not None:
+            logger.info(f'Near-duplicate of a processed document ({near_match:.0%} similar): {filename}')
+            # The stored analytics and ranking describe the other copy, so they are left out
+            summary = near_result['summary']
+        else:
+            # Generate advanced summary
+            summary, analytics, ranking = summarize_document(text, mode=mode)
+        original_length = len(text)
+
+    # Near matches aren't stored under their own key, so a summary never
+    # drifts along a chain of small edits
+    if cached is None and cacheable and near_match is None:
+        remember_result(cache_key, {'summary': summary, 'original_length': original_length,
+                                    'analytics': analytics, 'ranking': ranking},
+                        'file', content_hash, extracted_text=text or None,
+                        sketch=sketch, scope=make_key('file', '*', mode=mode))
+
+    query_report = None
+    if query:
+        # Follow-up queries find the index cached and never need the text
+        def document_text():
+            return text or stored_extracted_text(cache_key) or extract_upload_text(file_path, filename, file_ext, mode)[0]
+        query_ranking, query_report = query_focused_ranking(query, cache_key, document_text, mode)
+        if query_ranking is not None:
+            ranking = query_ranking
+            summary = render_summary(ranking)
+    finished = time.perf_counter()
+
+    return {
+        'summary': summary,
+        'summaries': render_summaries(ranking, lengths),
+        'cached': cached is not None,
+        'near_match': {'similarity': near_match} if near_match is not None else None,
+        'query': query_report,
+        'stats': {
+            **compression_stats(original_length, summary),
+            'analytics': analytics
+        },
+        'timings': {
+            'extract_ms': round((extracted - start) * 1000, 2),
+            'summarize_ms': round((finished - extracted) * 1000, 2)
+        }
+    }
 
 @app.route('/')
 def index():
@@ -1323,6 +1778,11 @@ def health():
             'ai_summarization': 'ready',
             'download_service': 'ready'
         },
+        'cache': summary_cache.stats(),
+        'query_indexes': query_indexes.stats(),
+        'page_states': page_states.stats() if DocumentState is not None else 'unavailable',
+        'ocr_cache': ocr_cache.stats() if ocr_cache is not None else 'unavailable',
+        'result_store': result_store.stats() if result_store is not None else 'disabled',
         'uptime': 'online'
     })
 
@@ -1337,51 +1797,41 @@ def process_file():
             return jsonify({'error': 'No file selected'}), 400
 
         # Validate file type
-        allowed_extensions = {'.pdf', '.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp', '.txt'}
         file_ext = os.path.splitext(file.filename.lower())[1]
         
-        if file_ext not in allowed_extensions:
+        if file_ext not in DOCUMENT_EXTENSIONS:
             return jsonify({
                 'error': 'Unsupported file type', 
-                'supported': 'PDF, PNG, JPG, JPEG, GIF, BMP, WEBP, TXT'
+                'supported': SUPPORTED_DOCUMENTS
             }), 400
 
-        # Secure filename
-        filename = secure_filename(file.filename)
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+        # Validate summarization mode
+        mode = request.form.get('mode', 'advanced')
+        if mode not in SUMMARY_MODES:
+            return jsonify({
+                'error': 'Unsupported summarization mode',
+                'supported': ', '.join(sorted(SUMMARY_MODES))
+            }), 400
 
-        # Handle duplicate filenames
-        counter = 1
-        original_path = file_path
-        while os.path.exists(file_path):
-            base, ext = os.path.splitext(original_path)
-            file_path = f"{base}_{counter}{ext}"
-            filename = os.path.basename(file_path)
-            counter += 1
+        # Extra summary lengths returned in 'summaries', e.g. "3,5,10,20%"
+        try:
+            lengths = parse_summary_lengths(request.form.get('lengths'))
+        except ValueError as e:
+            return jsonify({'error': str(e), 'supported': SUPPORTED_LENGTHS}), 400
+
+        # Optional query: summarize what the document says about it
+        try:
+            query = parse_query(request.form.get('query'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
 
         # Save file
+        file_path, filename = unique_upload_path(file.filename)
         file.save(file_path)
         logger.info(f'Processing file: {filename}')
 
-        # Extract text based on file type
-        text = ""
-        
-        if file_ext.lower() == '.txt':
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                text = f.read()
-        elif file_ext.lower() == '.pdf':
-            text = extract_text_from_pdf_basic(file_path)
-        elif file_ext.lower() in {'.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp'}:
-            # Try online OCR first, then fallback to basic analysis
-            text = extract_text_with_online_ocr(file_path)
-            if not text or len(text.strip()) < 20:
-                text = extract_text_basic_image_analysis(file_path)
-
-        if not text or len(text.strip()) < 10:
-            text = f"File '{filename}' processed successfully. Content analysis completed."
-
-        # Generate advanced summary
-        summary = advanced_summarize(text)
+        result = summarize_upload(file_path, filename, file_ext, mode, lengths, query)
+        summary = result['summary']
 
         # Save results with timestamp
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -1410,6 +1860,11 @@ Visit: https://github.com/eepanshu/Summa_Browser
             'success': True,
             'message': 'Document processed successfully! 🎉',
             'summary': summary,
+            'summaries': result['summaries'],
+            'mode': mode,
+            'cached': result['cached'],
+            'near_match': result['near_match'],
+            'query': result['query'],
             'download_url': f'/download/summary_{timestamp}.txt',
             'file_info': {
                 'name': filename,
@@ -1417,11 +1872,7 @@ Visit: https://github.com/eepanshu/Summa_Browser
                 'type': file_ext,
                 'processed_at': datetime.now().isoformat()
             },
-            'stats': {
-                'original_length': len(text),
-                'summary_length': len(summary),
-                'compression_ratio': f"{len(summary)/len(text)*100:.1f}%" if len(text) > 0 else "N/A"
-            }
+            'stats': result['stats']
         })
 
     except Exception as e:
@@ -1441,6 +1892,256 @@ Visit: https://github.com/eepanshu/Summa_Browser
         except Exception as e:
             logger.warning(f'Cleanup failed: {e}')
 
+@app.route('/process-text', methods=['POST'])
+def process_text_endpoint():
+    """Summarize, analyze and/or extract keywords from pasted or page text (JSON in, JSON out)"""
+    start = time.perf_counter()
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    text = data.get('text') or ''
+
+    actions = data.get('actions') or data.get('action') or 'summarize'
+    if isinstance(actions, str):
+        actions = [actions]
+    unknown = [action for action in actions if action not in TEXT_ACTIONS] if isinstance(actions, list) else [actions]
+    if unknown:
+        return jsonify({
+            'error': f"Unsupported action: {', '.join(map(str, unknown))}",
+            'supported': ', '.join(TEXT_ACTIONS)
+        }), 400
+
+    length = data.get('length', 'brief')
+    if not isinstance(length, str) or length not in SUMMARY_LENGTHS:
+        return jsonify({'error': 'Unsupported summary length', 'supported': ', '.join(SUMMARY_LENGTHS)}), 400
+
+    mode = data.get('mode', 'advanced')
+    if not isinstance(mode, str) or mode not in TEXT_SUMMARY_MODES:
+        return jsonify({'error': 'Unsupported summarization mode', 'supported': ', '.join(TEXT_SUMMARY_MODES)}), 400
+
+    try:
+        query = parse_query(data.get('query'))
+        url = parse_page_url(data.get('url'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if not isinstance(text, str) or not text.strip():
+        return jsonify({'error': 'No text provided'}), 400
+    if len(text) > PROCESS_TEXT_MAX_CHARS:
+        return jsonify({'error': 'Text too long', 'max_characters': PROCESS_TEXT_MAX_CHARS}), 413
+
+    # Results hold the summaries of every length, so length isn't part of the key
+    params = {'actions': ','.join(sorted(set(actions))), 'mode': mode}
+    content_hash = text_sha256(text)
+    cache_key = make_key('text', content_hash, **params)
+    near_match = None
+    query_report = None
+    incremental = None
+    try:
+        result = lookup_result(cache_key)
+        cached = result is not None
+        if result is None and url and actions == ['summarize'] and mode == 'advanced':
+            # A new version of a page summarized before: patch its statistics
+            result, incremental = summarize_page_incrementally(url, text, content_hash, length)
+            if result is not None:
+                remember_result(cache_key, result, 'text', content_hash, extracted_text=text)
+        if result is None:
+            sketch = near_duplicate_sketch(text)
+            near_result, near_match = lookup_near_duplicate(sketch, make_key('text', '*', **params))
+            if near_result is not None:
+                # Only the summaries carry over; analysis and keywords describe the submitted text
+                result = process_text(text, actions, length, mode, summaries=near_result.get('summaries'))
+            else:
+                result = process_text(text, actions, length, mode)
+                remember_result(cache_key, result, 'text', content_hash, extracted_text=text,
+                                sketch=sketch, scope=make_key('text', '*', **params))
+
+        if query and 'summarize' in actions:
+            ranking, query_report = query_focused_ranking(
+                query, make_key('text', content_hash, mode=mode), lambda: text, mode
+            )
+            if ranking is not None:
+                result = {**result, 'summaries': render_text_summaries(
+                    ranking['ranked'], ranking['sentences'], ranking.get('text'), SUMMARY_LENGTHS
+                )}
+    except Exception as e:
+        logger.error(f'Text processing error: {str(e)}', exc_info=True)
+        return jsonify({'error': 'Text processing failed', 'details': str(e)}), 500
+
+    result = {name: value for name, value in result.items() if name != 'extracted_text'}
+    if 'summaries' in result:
+        result['summary'] = result['summaries'][length]
+    return jsonify({
+        'success': True,
+        'actions': actions,
+        **result,
+        'cached': cached,
+        'near_match': {'similarity': near_match} if near_match is not None else None,
+        'query': query_report,
+        'incremental': incremental,
+        'stats': compression_stats(len(text), result['summary']) if 'summary' in result else {
+            'original_length': len(text),
+            'summary_length': None
+        },
+        'processing_ms': round((time.perf_counter() - start) * 1000, 2)
+    })
+
+def save_batch_uploads(uploads):
+    """Save the files of a batch upload, expanding zip archives into their documents
+
+    Returns one entry per document, in upload order: ``{'index', 'name',
+    'path', 'ext'}`` when it was saved for processing, or ``{'index',
+    'name', 'error'}`` when it was rejected.
+    """
+    entries = []
+    saved = 0
+    expanded_bytes = 0
+
+    def add(name, error=None, source=None):
+        nonlocal saved
+        entry = {'index': len(entries), 'name': name}
+        entries.append(entry)
+        ext = os.path.splitext(name.lower())[1]
+        if error is None and saved >= BATCH_MAX_FILES:
+            error = f'Batch limit of {BATCH_MAX_FILES} files reached'
+        if error is None and ext not in DOCUMENT_EXTENSIONS:
+            error = f'Unsupported file type (supported: {SUPPORTED_DOCUMENTS})'
+        if error is not None:
+            entry['error'] = error
+            return
+        file_path, _ = unique_upload_path(os.path.basename(name))
+        try:
+            if hasattr(source, 'save'):
+                source.save(file_path)
+            else:
+                with open(file_path, 'wb') as f:
+                    shutil.copyfileobj(source, f)
+        except Exception as e:
+            # e.g. a corrupt zip member; the other files still go through
+            remove_upload(file_path)
+            entry['error'] = f'Upload could not be read: {e}'
+            return
+        saved += 1
+        entry.update(path=file_path, ext=ext)
+
+    for upload in uploads:
+        if not upload.filename:
+            continue
+        if not upload.filename.lower().endswith('.zip'):
+            add(upload.filename, source=upload)
+            continue
+        try:
+            with zipfile.ZipFile(upload.stream) as archive:
+                for member in archive.infolist():
+                    base = os.path.basename(member.filename)
+                    # Folders and macOS resource forks aren't documents
+                    if member.is_dir() or member.filename.startswith('__MACOSX/') or base.startswith('.'):
+                        continue
+                    name = f'{upload.filename}/{member.filename}'
+                    expanded_bytes += member.file_size
+                    if expanded_bytes > BATCH_MAX_UNCOMPRESSED_BYTES:
+                        add(name, f'Archive expands beyond {BATCH_MAX_UNCOMPRESSED_BYTES // (1024 * 1024)}MB')
+                        continue
+                    with archive.open(member) as source:
+                        add(name, source=source)
+        except (zipfile.BadZipFile, zipfile.LargeZipFile, NotImplementedError) as e:
+            add(upload.filename, f'Unreadable zip archive: {e}')
+    return entries
+
+def remove_upload(file_path):
+    try:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+    except OSError as e:
+        logger.warning(f'Cleanup failed: {e}')
+
+def process_batch_file(entry, mode, lengths, query, submitted):
+    """One NDJSON result line of /process-batch; errors are reported in the line, never raised"""
+    start = time.perf_counter()
+    line = {'index': entry['index'], 'name': entry['name']}
+    try:
+        result = summarize_upload(entry['path'], os.path.basename(entry['path']), entry['ext'], mode, lengths, query)
+        line.update(success=True, **result)
+    except Exception as e:
+        logger.error(f"Batch processing error ({entry['name']}): {str(e)}", exc_info=True)
+        line.update(success=False, error='Document processing failed', details=str(e), timings={})
+    finally:
+        remove_upload(entry['path'])
+    line['timings'].update(
+        queued_ms=round((start - submitted) * 1000, 2),
+        total_ms=round((time.perf_counter() - start) * 1000, 2)
+    )
+    return line
+
+def stream_batch(entries, mode, lengths=SUMMARY_GRANULARITIES, query=None):
+    """Yield one JSON line per document as soon as it's done, then a totals line"""
+    start = time.perf_counter()
+    succeeded = 0
+    futures = {}
+    try:
+        for entry in entries:
+            if 'error' in entry:
+                # Rejected before processing; timings keep every line the same shape
+                yield json.dumps({**entry, 'success': False, 'timings': {'queued_ms': 0.0, 'total_ms': 0.0}}) + '\n'
+            else:
+                futures[batch_pool.submit(process_batch_file, entry, mode, lengths, query, time.perf_counter())] = entry
+        for future in as_completed(futures):
+            line = future.result()
+            succeeded += line['success']
+            yield json.dumps(line) + '\n'
+        yield json.dumps({
+            'done': True,
+            'files': len(entries),
+            'succeeded': succeeded,
+            'failed': len(entries) - succeeded,
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 2)
+        }) + '\n'
+    finally:
+        # Client went away: drop the files still waiting for a worker
+        for future, entry in futures.items():
+            if future.cancel():
+                remove_upload(entry['path'])
+
+@app.route('/process-batch', methods=['POST'])
+def process_batch():
+    """Summarize many files (or zip archives of them) in one request
+
+    Files are processed concurrently on the shared batch pool and the
+    response streams one NDJSON line per file as soon as it finishes, in
+    completion order (``index`` gives the upload order). A file that fails
+    gets an error line; the rest of the batch carries on.
+    """
+    uploads = request.files.getlist('files') + request.files.getlist('file')
+    if not any(upload.filename for upload in uploads):
+        return jsonify({'error': 'No files uploaded'}), 400
+
+    mode = request.form.get('mode', 'advanced')
+    if mode not in SUMMARY_MODES:
+        return jsonify({
+            'error': 'Unsupported summarization mode',
+            'supported': ', '.join(sorted(SUMMARY_MODES))
+        }), 400
+
+    try:
+        lengths = parse_summary_lengths(request.form.get('lengths'))
+    except ValueError as e:
+        return jsonify({'error': str(e), 'supported': SUPPORTED_LENGTHS}), 400
+    try:
+        query = parse_query(request.form.get('query'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Everything is read from the request before the response starts streaming
+    try:
+        entries = save_batch_uploads(uploads)
+    except Exception as e:
+        logger.error(f'Batch upload error: {str(e)}', exc_info=True)
+        return jsonify({'error': 'Batch upload failed', 'details': str(e)}), 500
+    logger.info(f'Processing batch of {len(entries)} files')
+
+    return Response(stream_batch(entries, mode, lengths, query), mimetype='application/x-ndjson',
+                    headers={'X-Accel-Buffering': 'no', 'Cache-Control': 'no-cache'})
+
 @app.route('/download/<filename>')
 def download_file(filename):
     try:
@@ -1482,6 +2183,20 @@ def process_video_file():
                 'supported': 'MP4, AVI, MOV, MP3, WAV, M4A, WMA'
             }), 400
 
+        # Validate summarization mode
+        mode = request.form.get('mode', 'advanced')
+        if mode not in SUMMARY_MODES:
+            return jsonify({
+                'error': 'Unsupported summarization mode',
+                'supported': ', '.join(sorted(SUMMARY_MODES))
+            }), 400
+
+        # Optional query: summarize what the video says about it
+        try:
+            query = parse_query(request.form.get('query'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
         # Secure filename
         filename = secure_filename(video_file.filename)
         file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
@@ -1503,8 +2218,19 @@ def process_video_file():
             # Try to import video processing
             from video_integration import process_video_request
             
-            # Process the video file using AssemblyAI
-            result = process_video_request(file_path, 'file')
+            # Reuse the transcript and summary of an identical upload
+            content_hash = file_sha256(file_path)
+            cache_key = make_key('video_file', content_hash, mode=mode)
+            cached = lookup_result(cache_key)
+            
+            if cached is not None:
+                logger.info(f'Cache hit: {filename}')
+                result = cached
+            else:
+                # Process the video file using AssemblyAI
+                result = process_video_request(file_path, 'file', mode=mode)
+                if result.get('success'):
+                    remember_result(cache_key, result, 'video_file', content_hash)
             
             if result.get('success'):
                 # Generate summary file
@@ -1515,6 +2241,7 @@ def process_video_file():
                 # Create summary content
                 transcript = result.get('transcript', '')
                 summary = result.get('summary', '')
+                summary, query_report = query_focused_transcript(query, transcript, summary, mode)
                 
                 summary_content = f"""SummaBrowser AI - Video File Summary Report
 Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
@@ -1544,6 +2271,8 @@ Video processing capability powered by AI transcription
                     'transcript': transcript[:1000] + '...' if len(transcript) > 1000 else transcript,
                     'download_url': f'/download/{summary_filename}',
                     'processing_method': result.get('type', 'AssemblyAI'),
+                    'cached': cached is not None,
+                    'query': query_report,
                     'file_info': {
                         'name': filename,
                         'size': os.path.getsize(file_path),
@@ -1599,20 +2328,44 @@ def process_video():
                 'error': 'Please provide a valid YouTube URL'
             })
         
+        # Validate summarization mode
+        mode = request.form.get('mode', 'advanced')
+        if mode not in SUMMARY_MODES:
+            return jsonify({
+                'success': False,
+                'error': f"Unsupported summarization mode. Supported: {', '.join(sorted(SUMMARY_MODES))}"
+            })
+        
+        # Optional query: summarize what the video says about it
+        try:
+            query = parse_query(request.form.get('query'))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)})
+        
         logger.info(f'Processing video URL: {video_url}')
         
         try:
             # Try to import video processing
             from video_integration import process_video_request
             
-            # Process the video
-            result = process_video_request(video_url, 'url')
+            video_id = re.search(r'(?:youtube\.com\/watch\?v=|youtu\.be\/)([^&\n?#]+)', video_url)
+            video_id = video_id.group(1) if video_id else 'unknown'
+            
+            # Reuse the transcript and summary of the same video
+            cache_key = make_key('video', video_id, mode=mode)
+            cached = lookup_result(cache_key) if video_id != 'unknown' else None
+            
+            if cached is not None:
+                logger.info(f'Cache hit: video {video_id}')
+                result = cached
+            else:
+                # Process the video
+                result = process_video_request(video_url, 'url', mode=mode)
+                if result.get('success') and video_id != 'unknown':
+                    remember_result(cache_key, result, 'video', video_id)
             
             if result.get('success'):
                 # Generate summary file
-                video_id = re.search(r'(?:youtube\.com\/watch\?v=|youtu\.be\/)([^&\n?#]+)', video_url)
-                video_id = video_id.group(1) if video_id else 'unknown'
-                
                 summary_filename = f"video_summary_{video_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
                 summary_path = os.path.join(OUTPUT_FOLDER, summary_filename)
                 
@@ -1620,6 +2373,7 @@ def process_video():
                 metadata = result.get('metadata', {})
                 transcript = result.get('transcript', '')
                 summary = result.get('summary', '')
+                summary, query_report = query_focused_transcript(query, transcript, summary, mode)
                 
                 summary_content = f"""SummaBrowser AI - Video Summary Report
 Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
@@ -1651,7 +2405,9 @@ Video processing capability powered by AI transcription
                     'transcript': transcript[:1000] + '...' if len(transcript) > 1000 else transcript,
                     'metadata': metadata,
                     'download_url': f'/download/{summary_filename}',
-                    'processing_method': result.get('type', 'YouTube Transcript')
+                    'processing_method': result.get('type', 'YouTube Transcript'),
+                    'cached': cached is not None,
+                    'query': query_report
                 })
             
             else:
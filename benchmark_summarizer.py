@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the indexed summarization engine
+
+Compares the original per-sentence implementation of advanced_summarize
+(app-web.py and summary/app-ocr.py) against summarizer_engine on synthetic
+documents, and checks that both produce identical summaries.
+
+Usage:
+    python benchmark_summarizer.py
+    python benchmark_summarizer.py --sizes 1KB 1MB --skip-legacy-above 5MB
+    python benchmark_summarizer.py --backends    # scoring backends only
+    python benchmark_summarizer.py --graph --sizes 10KB 100KB 1MB 2MB
+    python benchmark_summarizer.py --text-actions --sizes 5KB 40KB 200KB
+    python benchmark_summarizer.py --analytics --sizes 10KB 1MB 5MB
+    python benchmark_summarizer.py --keyphrases --files README.md TESTING_GUIDE.md --sizes 100KB 1MB
+    python benchmark_summarizer.py --incremental --sizes 100KB 1MB 2MB
+"""
+
+import argparse
+import random
+import re
+import time
+import timeit
+
+import glob
+import os
+import resource
+
+import graph_summarizer
+import keyphrases
+import summarizer_engine
+import text_actions
+import text_analytics
+from summarizer_engine import (
+    SentenceIndex, STOP_WORDS, WEB_SENTENCE_PATTERN, OCR_SENTENCE_PATTERN, clean_text
+)
+
+SIZE_UNITS = {'KB': 1024, 'MB': 1024 * 1024}
+
+
+def parse_size(value):
+    """Parse sizes such as 1KB or 20MB into bytes"""
+    match = re.fullmatch(r'(\d+)\s*(KB|MB)', value.upper())
+    if not match:
+        raise argparse.ArgumentTypeError(f"Invalid size: {value}")
+    return int(match.group(1)) * SIZE_UNITS[match.group(2)]
+
+
+def generate_document(size, seed=42, vocabulary_size=5000):
+    """Build a synthetic document of roughly ``size`` bytes"""
+    rng = random.Random(seed)
+    vocabulary = [''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(2, 10)))
+                  for _ in range(vocabulary_size)]
+    vocabulary.extend(STOP_WORDS)
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+
+    parts = []
+    length = 0
+    while length < size:
+        words = rng.choices(vocabulary, weights, k=rng.randint(3, 30))
+        sentence = ' '.join(words).capitalize() + rng.choice('..!?')
+        if rng.random() < 0.1:
+            sentence += '\n\n'
+        parts.append(sentence)
+        length += len(sentence) + 1
+    return ' '.join(parts)
+
+
+def legacy_web_summarize(text, max_sentences=5):
+    """Original advanced_summarize from app-web.py"""
+    if not text or len(text.strip()) < 50:
+        return "Document processed successfully. Content appears to be brief or formatted data."
+    text = re.sub(r'\s+', ' ', text).strip()
+    sentences = re.split(r'[.!?]+', text)
+    sentences = [s.strip() for s in sentences if len(s.strip()) > 10]
+    if len(sentences) <= max_sentences:
+        return text
+    word_freq = {}
+    words = re.findall(r'\b\w+\b', text.lower())
+    for word in words:
+        if word not in STOP_WORDS and len(word) > 3:
+            word_freq[word] = word_freq.get(word, 0) + 1
+    scores = []
+    for i, sentence in enumerate(sentences):
+        score = 0
+        sentence_words = re.findall(r'\b\w+\b', sentence.lower())
+        length_score = min(len(sentence_words) / 15, 1.0)
+        score += length_score * 0.3
+        position_score = 1.0 if i < 2 or i >= len(sentences) - 2 else 0.5
+        score += position_score * 0.3
+        if sentence_words and word_freq:
+            keyword_score = sum(word_freq.get(word, 0) for word in sentence_words) / len(sentence_words)
+            score += min(keyword_score / max(word_freq.values()), 1.0) * 0.4
+        scores.append((score, sentence))
+    scores.sort(reverse=True, key=lambda x: x[0])
+    selected_sentences = [s[1] for s in scores[:max_sentences]]
+    summary_sentences = []
+    for sentence in sentences:
+        if sentence in selected_sentences:
+            summary_sentences.append(sentence)
+    summary = '. '.join(summary_sentences) + '.'
+    return f"📄 SUMMARY (Generated by SummaBrowser AI)\n\n{summary}\n\n---\nSummary contains {len(summary.split())} words from original {len(text.split())} words."
+
+
+def legacy_ocr_summarize(text, max_sentences=4):
+    """Original advanced_summarize from summary/app-ocr.py"""
+    if not text or len(text.strip()) < 50:
+        return "Content is too brief to summarize effectively."
+    text = re.sub(r'\s+', ' ', text.strip())
+    sentences = re.split(r'(?<=[.!?])\s+(?=[A-Z])', text)
+    sentences = [s.strip() for s in sentences if len(s.strip()) > 15]
+    if len(sentences) <= max_sentences:
+        summary = ' '.join(sentences)
+    else:
+        scores = []
+        word_freq = {}
+        words = re.findall(r'\b\w+\b', text.lower())
+        for word in words:
+            if len(word) > 3:
+                word_freq[word] = word_freq.get(word, 0) + 1
+        for i, sentence in enumerate(sentences):
+            score = 0
+            sentence_words = re.findall(r'\b\w+\b', sentence.lower())
+            length_score = min(len(sentence_words) / 15, 1.0)
+            score += length_score * 0.3
+            position_score = 1.0 if i < 2 or i >= len(sentences) - 2 else 0.5
+            score += position_score * 0.3
+            keyword_score = sum(word_freq.get(word, 0) for word in sentence_words) / len(sentence_words) if sentence_words else 0
+            score += min(keyword_score / max(word_freq.values()) if word_freq else 0, 1.0) * 0.4
+            scores.append((score, sentence))
+        scores.sort(reverse=True, key=lambda x: x[0])
+        selected_sentences = [s[1] for s in scores[:max_sentences]]
+        summary_sentences = []
+        for sentence in sentences:
+            if sentence in selected_sentences:
+                summary_sentences.append(sentence)
+        summary = ' '.join(summary_sentences)
+    return f"📄 SUMMARY (Generated by SummaBrowser AI)\n\n{summary}\n\n---\nSummary contains {len(summary.split())} words from original {len(text.split())} words."
+
+
+def engine_web_summarize(text, max_sentences=5):
+    """Same flow as advanced_summarize in app-web.py"""
+    if not text or len(text.strip()) < 50:
+        return "Document processed successfully. Content appears to be brief or formatted data."
+    text = clean_text(text)
+    index = SentenceIndex.from_text(text, WEB_SENTENCE_PATTERN, min_length=10, stop_words=STOP_WORDS)
+    if len(index) <= max_sentences:
+        return text
+    summary = '. '.join(index.summary_sentences(max_sentences)) + '.'
+    return f"📄 SUMMARY (Generated by SummaBrowser AI)\n\n{summary}\n\n---\nSummary contains {len(summary.split())} words from original {len(text.split())} words."
+
+
+def engine_ocr_summarize(text, max_sentences=4):
+    """Same flow as advanced_summarize in summary/app-ocr.py"""
+    if not text or len(text.strip()) < 50:
+        return "Content is too brief to summarize effectively."
+    text = clean_text(text)
+    index = SentenceIndex.from_text(text, OCR_SENTENCE_PATTERN, min_length=15, stop_words=frozenset())
+    if len(index) <= max_sentences:
+        summary = ' '.join(index.sentences)
+    else:
+        summary = ' '.join(index.summary_sentences(max_sentences))
+    return f"📄 SUMMARY (Generated by SummaBrowser AI)\n\n{summary}\n\n---\nSummary contains {len(summary.split())} words from original {len(text.split())} words."
+
+
+PROFILES = {
+    'web': (legacy_web_summarize, engine_web_summarize),
+    'ocr': (legacy_ocr_summarize, engine_ocr_summarize),
+}
+
+
+def best_of(func, text, repeat):
+    """Best wall-clock time of ``repeat`` runs and the last result"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(text)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def benchmark_backends(sizes, repeat):
+    """Time sentence scoring alone with each available backend"""
+    if summarizer_engine.summarizer_vectorized is None:
+        print("⚠️ NumPy/SciPy not installed, only the Python backend is available")
+        return
+
+    print(f"{'size':>8} {'sentences':>10} {'python (s)':>12} {'numpy (s)':>12} {'speedup':>9}  identical")
+    print("-" * 66)
+    for size in sizes:
+        text = clean_text(generate_document(size))
+        index = SentenceIndex.from_text(text, WEB_SENTENCE_PATTERN, min_length=10, stop_words=STOP_WORDS)
+        python_time, python_scores = best_of(lambda idx: idx._score_sentences_python(), index, repeat)
+        # Drop the cached matrix so its construction is part of every run
+        numpy_time, numpy_scores = best_of(
+            lambda idx: setattr(idx, '_matrix', None) or summarizer_engine.summarizer_vectorized.score_sentences(
+                idx, summarizer_engine.LENGTH_WEIGHT, summarizer_engine.POSITION_WEIGHT,
+                summarizer_engine.KEYWORD_WEIGHT, summarizer_engine.IDEAL_SENTENCE_WORDS),
+            index, repeat)
+        identical = '✅' if python_scores == numpy_scores.tolist() else '❌'
+        print(f"{format_size(size):>8} {len(index):>10} {python_time:>12.4f} {numpy_time:>12.4f} "
+              f"{python_time / numpy_time:>8.1f}x  {identical}")
+
+
+def naive_graph_ranks(index):
+    """Graph ranking over all sentence pairs (the O(n^2) baseline)"""
+    sets = graph_summarizer.content_sets(index)
+    edges = []
+    for i in range(len(sets)):
+        for j in range(i + 1, len(sets)):
+            shared = len(sets[i] & sets[j])
+            if shared:
+                similarity = shared / (len(sets[i]) + len(sets[j]) - shared)
+                if similarity >= graph_summarizer.MIN_SIMILARITY:
+                    edges.append((i, j, similarity))
+    return graph_summarizer.power_iteration(len(sets), edges)
+
+
+def benchmark_graph(sizes, naive_limit):
+    """Latency of graph mode by document size, next to advanced mode"""
+    print(f"{'size':>8} {'sentences':>10} {'edges':>9} {'advanced (s)':>13} {'graph (s)':>10} {'all-pairs (s)':>14}")
+    print("-" * 70)
+    for size in sizes:
+        text = clean_text(generate_document(size))
+        index = SentenceIndex.from_text(text, WEB_SENTENCE_PATTERN, min_length=10, stop_words=STOP_WORDS)
+        advanced_time, _ = best_of(lambda idx: idx.summary_sentences(5), index, 1)
+
+        start = time.perf_counter()
+        edges = graph_summarizer.build_graph(index)
+        ranks = graph_summarizer.power_iteration(len(index), edges)
+        summarizer_engine.select_sentences(index.sentences, ranks, 5)
+        graph_time = time.perf_counter() - start
+
+        naive = 'skipped'
+        if len(index) <= naive_limit:
+            naive_time, _ = best_of(naive_graph_ranks, index, 1)
+            naive = f"{naive_time:.3f}"
+        print(f"{format_size(size):>8} {len(index):>10} {len(edges):>9} {advanced_time:>13.3f} "
+              f"{graph_time:>10.3f} {naive:>14}")
+
+
+def benchmark_text_actions(sizes, repeat):
+    """Latency of /process-text actions, alone and all three from one tokenization pass"""
+    combinations = [['summarize'], ['analyze'], ['keywords'], list(text_actions.TEXT_ACTIONS)]
+    labels = ['summarize', 'analyze', 'keywords', 'all three']
+    print(f"{'size':>8} " + ' '.join(f"{label + ' (ms)':>16}" for label in labels))
+    print("-" * (9 + 17 * len(labels)))
+    for size in sizes:
+        text = generate_document(size)
+        timings = [best_of(lambda t: text_actions.process_text(t, actions), text, repeat)[0] * 1000
+                   for actions in combinations]
+        print(f"{format_size(size):>8} " + ' '.join(f"{timing:>16.2f}" for timing in timings))
+
+
+def benchmark_analytics(sizes, repeat):
+    """Cost of text_analytics.analyze() on top of the summary it shares a token stream with"""
+    print(f"{'size':>8} {'summary (ms)':>13} {'analytics (ms)':>15} {'overhead':>9}  under 10%")
+    print("-" * 58)
+    for size in sizes:
+        raw = generate_document(size)
+        text = clean_text(raw)
+        index = SentenceIndex.from_text(text, WEB_SENTENCE_PATTERN, min_length=10, stop_words=STOP_WORDS)
+        text_analytics.analyze(index, text)  # warm the syllable cache, as in a running server
+
+        def summarize():
+            cleaned = clean_text(raw)
+            SentenceIndex.from_text(cleaned, WEB_SENTENCE_PATTERN, min_length=10, stop_words=STOP_WORDS).summary_sentences(5)
+
+        number = max(1, SIZE_UNITS['MB'] // (5 * size))
+        summary_time = min(timeit.repeat(summarize, number=number, repeat=repeat)) / number
+        analytics_time = min(timeit.repeat(lambda: text_analytics.analyze(index, text), number=number, repeat=repeat)) / number
+        overhead = analytics_time / summary_time * 100
+        print(f"{format_size(size):>8} {summary_time * 1000:>13.2f} {analytics_time * 1000:>15.3f} "
+              f"{overhead:>8.1f}%  {'✅' if overhead < 10 else '❌'}")
+
+
+def sklearn_keywords(vectorizer_class, text, num_keywords=10):
+    """The original PDFProcessor.extract_keywords (a TfidfVectorizer fitted per document)"""
+    vectorizer = vectorizer_class(stop_words="english")
+    tfidf_matrix = vectorizer.fit_transform([text])
+    feature_names = vectorizer.get_feature_names_out()
+    scores = tfidf_matrix.sum(axis=0).A1
+    keywords = sorted(zip(feature_names, scores), key=lambda x: x[1], reverse=True)
+    return [keyword for keyword, _ in keywords[:num_keywords]]
+
+
+def benchmark_keyphrases(files, sizes, repeat):
+    """keyphrases.extract_keyphrases against the per-call TfidfVectorizer it replaces"""
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    start = time.perf_counter()
+    try:
+        from sklearn.feature_extraction.text import TfidfVectorizer
+    except ImportError:
+        TfidfVectorizer = None
+    import_ms = (time.perf_counter() - start) * 1000
+    if TfidfVectorizer is None:
+        print("scikit-learn not installed: timing the extractor only")
+    else:
+        print(f"sklearn import: {import_ms:.0f} ms, "
+              f"+{resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 - rss_before:.0f} MB RSS")
+
+    # Overlap: share of sklearn's top 10 terms that appear in the top 10 keyphrases
+    documents = [(os.path.basename(path), open(path, encoding='utf-8', errors='ignore').read()) for path in files]
+    documents += [(format_size(size), generate_document(size)) for size in sizes]
+    print(f"{'document':<32} {'sklearn (ms)':>13} {'keyphrases (ms)':>16} {'speedup':>8} {'overlap':>8}")
+    print("-" * 81)
+    for name, text in documents:
+        phrase_time, phrases = best_of(lambda t: keyphrases.extract_keyphrases(t, lexicon=False), text, repeat)
+        if TfidfVectorizer is None:
+            print(f"{name:<32} {'-':>13} {phrase_time * 1000:>16.2f} {'-':>8} {'-':>8}")
+            continue
+        sklearn_time, terms = best_of(lambda t: sklearn_keywords(TfidfVectorizer, t), text, repeat)
+        phrase_words = {word for item in phrases for word in item['phrase'].split()}
+        overlap = sum(term in phrase_words for term in terms) / len(terms) if terms else 0
+        print(f"{name:<32} {sklearn_time * 1000:>13.2f} {phrase_time * 1000:>16.2f} "
+              f"{sklearn_time / phrase_time:>7.1f}x {overlap:>8.0%}")
+
+
+def benchmark_incremental(sizes, repeat, fractions=(0.001, 0.01, 0.1)):
+    """Re-summarizing an edited page incrementally against summarizing it from scratch"""
+    if summarizer_engine.summarizer_vectorized is None:
+        print("⚠️ NumPy/SciPy not installed, incremental summarization is unavailable")
+        return
+    from incremental_summarizer import DocumentState
+
+    print(f"{'size':>8} {'changed':>8} {'full (ms)':>10} {'incremental (ms)':>17} {'share':>7}  identical")
+    print("-" * 64)
+    for size in sizes:
+        text = generate_document(size)
+        replacement = generate_document(size, seed=7)
+        for fraction in fractions:
+            # Replace a block in the middle of the page, as a live page or an edited article would change
+            width = max(1, int(len(text) * fraction))
+            start = len(text) // 2
+            edited = text[:start] + replacement[start:start + width] + text[start + width:]
+            full_time, full_result = best_of(lambda t: text_actions.process_text(t, ['summarize']), edited, repeat)
+
+            best = float('inf')
+            for _ in range(repeat):
+                state = DocumentState()
+                state.update(text)
+                began = time.perf_counter()
+                state.update(edited)
+                summaries = state.summaries(text_actions.SUMMARY_LENGTHS)
+                best = min(best, time.perf_counter() - began)
+            identical = '✅' if summaries == full_result['summaries'] else '❌'
+            print(f"{format_size(size):>8} {fraction:>8.1%} {full_time * 1000:>10.1f} {best * 1000:>17.1f} "
+                  f"{best / full_time:>7.1%}  {identical}")
+
+
+def format_size(size):
+    if size >= SIZE_UNITS['MB']:
+        return f"{size // SIZE_UNITS['MB']} MB"
+    return f"{size // SIZE_UNITS['KB']} KB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark advanced_summarize implementations')
+    parser.add_argument('--sizes', nargs='+', type=parse_size, default=[parse_size(s) for s in ('1KB', '1MB', '20MB')])
+    parser.add_argument('--profiles', nargs='+', choices=sorted(PROFILES), default=['web', 'ocr'])
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement (best time is reported)')
+    parser.add_argument('--skip-legacy-above', type=parse_size, default=None,
+                        help='only time the engine for documents larger than this')
+    parser.add_argument('--backends', action='store_true', help='compare the sentence scoring backends only')
+    parser.add_argument('--graph', action='store_true', help='latency table for graph mode')
+    parser.add_argument('--text-actions', action='store_true', help='latency table for /process-text actions')
+    parser.add_argument('--analytics', action='store_true', help='overhead of document analytics over summarization')
+    parser.add_argument('--keyphrases', action='store_true', help='keyphrase extractor against per-call TF-IDF')
+    parser.add_argument('--incremental', action='store_true', help='re-summarizing an edited page against a full run')
+    parser.add_argument('--files', nargs='+', default=None,
+                        help='real documents for --keyphrases (default: the repository docs)')
+    parser.add_argument('--naive-graph-limit', type=int, default=5000,
+                        help='largest sentence count for the all-pairs graph baseline')
+    args = parser.parse_args()
+
+    if args.text_actions:
+        print("📊 SummaBrowser /process-text latency")
+        benchmark_text_actions(args.sizes, args.repeat)
+        return
+
+    if args.keyphrases:
+        print("📊 SummaBrowser keyphrase extraction")
+        files = args.files or sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), '*.md')))
+        benchmark_keyphrases(files, args.sizes, args.repeat)
+        return
+
+    if args.incremental:
+        print("📊 SummaBrowser incremental re-summarization")
+        benchmark_incremental(args.sizes, args.repeat)
+        return
+
+    if args.analytics:
+        print("📊 SummaBrowser analytics overhead")
+        benchmark_analytics(args.sizes, args.repeat)
+        return
+
+    if args.graph:
+        print("📊 SummaBrowser graph mode latency")
+        benchmark_graph(args.sizes, args.naive_graph_limit)
+        return
+
+    if args.backends:
+        print("📊 SummaBrowser scoring backend benchmark")
+        benchmark_backends(args.sizes, args.repeat)
+        return
+
+    print("📊 SummaBrowser summarizer benchmark")
+    print(f"{'profile':<8} {'size':>8} {'legacy (s)':>12} {'engine (s)':>12} {'speedup':>9}  identical")
+    print("-" * 66)
+
+    for size in args.sizes:
+        text = generate_document(size)
+        repeat = args.repeat if size < SIZE_UNITS['MB'] else 1
+        for profile in args.profiles:
+            legacy, engine = PROFILES[profile]
+            engine_time, engine_result = best_of(engine, text, repeat)
+
+            if args.skip_legacy_above is not None and size > args.skip_legacy_above:
+                print(f"{profile:<8} {format_size(size):>8} {'skipped':>12} {engine_time:>12.4f} {'-':>9}  -")
+                continue
+
+            legacy_time, legacy_result = best_of(legacy, text, repeat)
+            identical = '✅' if legacy_result == engine_result else '❌'
+            print(f"{profile:<8} {format_size(size):>8} {legacy_time:>12.4f} {engine_time:>12.4f} "
+                  f"{legacy_time / engine_time:>8.1f}x  {identical}")
+
+
+if __name__ == "__main__":
+    main()
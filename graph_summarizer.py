@@ -0,0 +1,181 @@
+# Graph-based (TextRank/LexRank style) sentence ranking for SummaBrowser
+# Candidate edges come from MinHash/LSH buckets instead of all sentence pairs
+
+import random
+from collections import Counter
+
+from summarizer_engine import SentenceIndex, STOP_WORDS, WEB_SENTENCE_PATTERN, clean_text, select_sentences
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# MinHash signature layout: BANDS * ROWS hash functions. With 16 bands of 2
+# rows, sentence pairs above roughly 0.25 Jaccard similarity become candidates.
+BANDS = 16
+ROWS = 2
+MERSENNE_PRIME = (1 << 61) - 1
+HASH_SEED = 1337
+
+# Large buckets (very common phrasing) only link each member to its next few
+# neighbours so the candidate set stays linear in the number of sentences
+MAX_BUCKET_NEIGHBOURS = 10
+
+# Terms found in more than this share of sentences carry almost no
+# information (like a near-zero IDF) and are left out of the similarity sets
+MAX_TERM_SENTENCE_SHARE = 0.05
+MIN_TERM_SENTENCE_CAP = 20
+
+# Edges below this Jaccard similarity are dropped
+MIN_SIMILARITY = 0.1
+
+# Power iteration settings
+DAMPING = 0.85
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-6
+
+_rng = random.Random(HASH_SEED)
+_HASH_PARAMS = [(_rng.randrange(1, MERSENNE_PRIME), _rng.randrange(0, MERSENNE_PRIME)) for _ in range(BANDS * ROWS)]
+
+
+def content_sets(index):
+    """Set of informative token ids for every sentence.
+
+    Stop words, short words and terms that occur in a large share of all
+    sentences are removed.
+    """
+    keyword_freq = index.keyword_freq
+    token_ids = index.token_ids
+    offsets = index.offsets
+    sets = [
+        {t for t in token_ids[offsets[i]:offsets[i + 1]] if keyword_freq[t]}
+        for i in range(len(index.sentences))
+    ]
+
+    cap = max(MIN_TERM_SENTENCE_CAP, int(len(sets) * MAX_TERM_SENTENCE_SHARE))
+    sentence_freq = Counter()
+    for token_set in sets:
+        sentence_freq.update(token_set)
+    common = {t for t, count in sentence_freq.items() if count > cap}
+    if common:
+        sets = [token_set - common for token_set in sets]
+    return sets
+
+
+def minhash_signatures(sets):
+    """MinHash signature per set; empty sets get ``None``"""
+    token_signatures = {}
+    signatures = []
+    for token_set in sets:
+        if not token_set:
+            signatures.append(None)
+            continue
+        rows = []
+        for t in token_set:
+            signature = token_signatures.get(t)
+            if signature is None:
+                signature = tuple((a * t + b) % MERSENNE_PRIME for a, b in _HASH_PARAMS)
+                token_signatures[t] = signature
+            rows.append(signature)
+        signatures.append(tuple(map(min, zip(*rows))))
+    return signatures
+
+
+def candidate_pairs(signatures):
+    """Sentence pairs that share at least one LSH band"""
+    pairs = set()
+    for band in range(BANDS):
+        start = band * ROWS
+        buckets = {}
+        for i, signature in enumerate(signatures):
+            if signature is not None:
+                buckets.setdefault(signature[start:start + ROWS], []).append(i)
+        for members in buckets.values():
+            for position, i in enumerate(members):
+                for j in members[position + 1:position + 1 + MAX_BUCKET_NEIGHBOURS]:
+                    pairs.add((i, j))
+    return pairs
+
+
+def build_graph(index):
+    """Weighted similarity edges ``(i, j, weight)`` between candidate sentences"""
+    sets = content_sets(index)
+    edges = []
+    for i, j in candidate_pairs(minhash_signatures(sets)):
+        shared = len(sets[i] & sets[j])
+        if shared:
+            similarity = shared / (len(sets[i]) + len(sets[j]) - shared)
+            if similarity >= MIN_SIMILARITY:
+                edges.append((i, j, similarity))
+    return edges
+
+
+def power_iteration(n, edges):
+    """Weighted PageRank over an undirected sparse graph"""
+    degree = [0.0] * n
+    for i, j, weight in edges:
+        degree[i] += weight
+        degree[j] += weight
+
+    sources = []
+    targets = []
+    weights = []
+    for i, j, weight in edges:
+        sources.append(i)
+        targets.append(j)
+        weights.append(weight / degree[i])
+        sources.append(j)
+        targets.append(i)
+        weights.append(weight / degree[j])
+    dangling = [i for i in range(n) if not degree[i]]
+
+    if np is not None:
+        return _power_iteration_numpy(n, sources, targets, weights, dangling)
+
+    ranks = [1.0 / n] * n
+    for _ in range(MAX_ITERATIONS):
+        dangling_mass = sum(ranks[i] for i in dangling)
+        base = (1.0 - DAMPING) / n + DAMPING * dangling_mass / n
+        new_ranks = [base] * n
+        for source, target, weight in zip(sources, targets, weights):
+            new_ranks[target] += DAMPING * ranks[source] * weight
+        delta = sum(abs(a - b) for a, b in zip(new_ranks, ranks))
+        ranks = new_ranks
+        if delta < TOLERANCE:
+            break
+    return ranks
+
+
+def _power_iteration_numpy(n, sources, targets, weights, dangling):
+    sources = np.asarray(sources, dtype=np.intp)
+    targets = np.asarray(targets, dtype=np.intp)
+    weights = np.asarray(weights, dtype=np.float64)
+    dangling = np.asarray(dangling, dtype=np.intp)
+
+    ranks = np.full(n, 1.0 / n)
+    for _ in range(MAX_ITERATIONS):
+        base = (1.0 - DAMPING) / n + DAMPING * ranks[dangling].sum() / n
+        new_ranks = base + DAMPING * np.bincount(targets, weights=ranks[sources] * weights, minlength=n)
+        delta = np.abs(new_ranks - ranks).sum()
+        ranks = new_ranks
+        if delta < TOLERANCE:
+            break
+    return ranks.tolist()
+
+
+def rank_sentences(index):
+    """Graph centrality score for every sentence of a SentenceIndex"""
+    n = len(index.sentences)
+    if n == 0:
+        return []
+    return power_iteration(n, build_graph(index))
+
+
+def graph_summarize(text, max_sentences=5):
+    """Extract the most central sentences of ``text`` in their original order"""
+    text = clean_text(text)
+    index = SentenceIndex.from_text(text, WEB_SENTENCE_PATTERN, min_length=10, stop_words=STOP_WORDS)
+    if len(index) <= max_sentences:
+        return text
+    return '. '.join(select_sentences(index.sentences, rank_sentences(index), max_sentences)) + '.'
@@ -0,0 +1,180 @@
+# Hierarchical (map-reduce) summarization for very long documents
+# Chunks are summarized in parallel on a process pool, then their summaries are summarized again
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from summarizer_engine import SentenceIndex, STOP_WORDS, WEB_SENTENCE_PATTERN, clean_text
+from idf_lexicon import apply_lexicon
+from pdf_extraction import PDF_WORKERS, get_pool, discard_pool
+
+# Page break used between PDF pages (same as pdftotext)
+PAGE_BREAK = '\f'
+
+# Page breaks and blank lines are section boundaries; single line breaks and
+# sentence ends are only used to cut sections that are too long on their own
+SECTION_PATTERN = re.compile(r'\f|\n[ \t]*\n')
+LINE_PATTERN = re.compile(r'\n')
+SENTENCE_END_PATTERN = re.compile(r'(?<=[.!?])\s+')
+
+# Separator between summaries that are combined into one reduce input
+SUMMARY_SEPARATOR = '\n\n'
+
+# Defaults, overridable per call or through the environment. With a shared
+# pool (pdf_extraction's, or the PDF processor's scheduler threads) the pool
+# sets the parallelism; HIERARCHICAL_WORKERS=1 keeps the work in-process
+DEFAULT_CHUNK_CHARS = int(os.environ.get('HIERARCHICAL_CHUNK_CHARS', 20000))
+DEFAULT_FAN_OUT = int(os.environ.get('HIERARCHICAL_FAN_OUT', 8))
+DEFAULT_MAX_DEPTH = int(os.environ.get('HIERARCHICAL_MAX_DEPTH', 3))
+DEFAULT_WORKERS = int(os.environ.get('HIERARCHICAL_WORKERS', 0)) or os.cpu_count() or 1
+
+# Sentences kept per chunk by the extractive map step
+CHUNK_SENTENCES = 5
+
+
+def split_sections(text, chunk_chars=DEFAULT_CHUNK_CHARS):
+    """Split ``text`` into chunks of at most ``chunk_chars`` characters.
+
+    Cuts happen at page breaks or blank lines where possible. Consecutive
+    short sections are packed into one chunk; a section that is too long by
+    itself is cut at line breaks, then at sentence ends, and only as a last
+    resort in the middle of a line.
+    """
+    pieces = []
+    for section in SECTION_PATTERN.split(text):
+        pieces.extend(_cut(section, chunk_chars, (LINE_PATTERN, SENTENCE_END_PATTERN)))
+    return _pack(pieces, chunk_chars, '\n\n')
+
+
+def _cut(section, chunk_chars, patterns):
+    if len(section) <= chunk_chars:
+        return [section] if section.strip() else []
+    if not patterns:
+        return [section[i:i + chunk_chars] for i in range(0, len(section), chunk_chars)]
+
+    pattern, finer = patterns[0], patterns[1:]
+    pieces = []
+    for part in pattern.split(section):
+        pieces.extend(_cut(part, chunk_chars, finer))
+    return _pack(pieces, chunk_chars, ' ' if pattern is SENTENCE_END_PATTERN else '\n')
+
+
+def _pack(pieces, chunk_chars, separator):
+    chunks = []
+    current = []
+    size = 0
+    for piece in pieces:
+        if current and size + len(separator) + len(piece) > chunk_chars:
+            chunks.append(separator.join(current))
+            current = []
+            size = 0
+        size += len(piece) + (len(separator) if current else 0)
+        current.append(piece)
+    if current:
+        chunks.append(separator.join(current))
+    return chunks
+
+
+def extractive_summary(text, max_sentences=CHUNK_SENTENCES):
+    """Top sentences of one chunk with the advanced_summarize scoring"""
+    text = clean_text(text)
+    index = SentenceIndex.from_text(text, WEB_SENTENCE_PATTERN, min_length=10, stop_words=STOP_WORDS)
+    if len(index) <= max_sentences:
+        return text
+    apply_lexicon(index)
+    return '. '.join(index.summary_sentences(max_sentences)) + '.'
+
+
+def hierarchical_summarize(text_or_sections, summarize_chunk, fan_out=DEFAULT_FAN_OUT,
+                           max_depth=DEFAULT_MAX_DEPTH, chunk_chars=DEFAULT_CHUNK_CHARS,
+                           workers=DEFAULT_WORKERS, mp_context=None, initializer=None, pool=None):
+    """Map-reduce summarization of a long document.
+
+    ``text_or_sections`` is either the full text or a list of sections (e.g.
+    PDF pages), which are packed into chunks of ``chunk_chars``. Every chunk
+    is summarized with ``summarize_chunk`` (a picklable function of one
+    string) on a process pool, whose workers run ``initializer`` once at
+    start-up, or on ``pool`` (an executor owned by the caller, which may
+    run threads) when given; ``workers=1`` summarizes in-process.
+    Then groups of ``fan_out`` summaries are
+    joined and summarized again until one summary is left. After
+    ``max_depth`` reduce rounds the remaining summaries are combined in a
+    single final pass regardless of the fan-out.
+
+    Returns ``(summary, stats)`` where stats holds the chunk count and the
+    number of tasks run at each level.
+    """
+    if isinstance(text_or_sections, str):
+        chunks = split_sections(text_or_sections, chunk_chars)
+    else:
+        chunks = split_sections(PAGE_BREAK.join(text_or_sections), chunk_chars)
+    fan_out = max(2, fan_out)
+    max_depth = max(1, max_depth)
+    stats = {'chunks': len(chunks), 'levels': []}
+    if not chunks:
+        return '', stats
+
+    workers = max(1, min(workers, len(chunks)))
+    if workers == 1:
+        return _reduce(chunks, summarize_chunk, map, fan_out, max_depth, stats), stats
+    if pool is not None:
+        return _reduce(chunks, summarize_chunk, pool.map, fan_out, max_depth, stats), stats
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context, initializer=initializer) as pool:
+        return _reduce(chunks, summarize_chunk, pool.map, fan_out, max_depth, stats), stats
+
+
+def _reduce(chunks, summarize_chunk, map_function, fan_out, max_depth, stats):
+    summaries = list(map_function(summarize_chunk, chunks))
+    stats['levels'].append(len(chunks))
+
+    depth = 0
+    while len(summaries) > 1:
+        depth += 1
+        if depth >= max_depth:
+            groups = [SUMMARY_SEPARATOR.join(summaries)]
+        else:
+            groups = [SUMMARY_SEPARATOR.join(summaries[i:i + fan_out])
+                      for i in range(0, len(summaries), fan_out)]
+        summaries = list(map_function(summarize_chunk, groups))
+        stats['levels'].append(len(groups))
+    return summaries[0]
+
+
+def hierarchical_extractive_summarize(text_or_sections, max_sentences=5, **options):
+    """Hierarchical version of the sentence-scoring summarizer.
+
+    Each chunk is reduced to its ``CHUNK_SENTENCES`` best sentences, the
+    final pass keeps ``max_sentences``. Options are passed on to
+    hierarchical_extractive_reduce().
+    """
+    chunk_sentences = max(CHUNK_SENTENCES, max_sentences)
+    summary, stats = hierarchical_extractive_reduce(text_or_sections, chunk_sentences, **options)
+    if chunk_sentences != max_sentences:
+        summary = extractive_summary(summary, max_sentences)
+    return summary, stats
+
+
+def hierarchical_extractive_reduce(text_or_sections, chunk_sentences=CHUNK_SENTENCES, **options):
+    """The ``chunk_sentences`` best sentences left after the map-reduce passes, as one text, and the stats.
+
+    Options are passed on to hierarchical_summarize(). Unless a pool or
+    context is given, chunks run on the shared pdf_extraction pool, so web
+    requests never start (or fork) processes of their own; if that pool is
+    broken, in-process.
+    """
+    summarize_chunk = partial(extractive_summary, max_sentences=chunk_sentences)
+    shared = None
+    if 'pool' not in options and 'mp_context' not in options and PDF_WORKERS > 1:
+        shared = options['pool'] = get_pool(PDF_WORKERS)
+    try:
+        summary, stats = hierarchical_summarize(text_or_sections, summarize_chunk, **options)
+    except BrokenProcessPool:
+        if shared is None:
+            raise
+        discard_pool(PDF_WORKERS, shared)
+        summary, stats = hierarchical_summarize(text_or_sections, summarize_chunk, **{**options, 'workers': 1})
+    return summary, stats
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Corpus-level IDF lexicon for SummaBrowser
+
+Document frequencies of every word seen in the processed-document store,
+kept in a compact binary file: a header, the sorted 64-bit hashes of the
+terms, their document frequencies and their IDF weights. The file is
+opened with mmap, so every gunicorn worker shares one copy through the
+page cache, and the builder replaces it atomically so running workers pick
+up the new version without locking. Only the standard library is needed;
+lookups are vectorized when NumPy is installed.
+
+Usage:
+    python idf_lexicon.py build [--db PATH] [--lexicon PATH] [--rebuild]
+    python idf_lexicon.py stats [--lexicon PATH]
+"""
+
+import argparse
+import json
+import logging
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from summarizer_engine import WORD_PATTERN
+from result_store import DEFAULT_DB_PATH, ResultStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEXICON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'idf_lexicon.bin')
+
+# Magic, documents counted, terms, created_at of the newest document counted
+HEADER = struct.Struct('<8sQQd')
+MAGIC = b'SBIDF001'
+
+# How often a worker checks whether the builder replaced the file
+RELOAD_CHECK_INTERVAL = 60
+
+
+def term_hash(word):
+    """Stable 64-bit hash of a lowercase word (CRC-32 and Adler-32 of its UTF-8 bytes)"""
+    data = word.encode('utf-8')
+    return zlib.crc32(data) << 32 | zlib.adler32(data)
+
+
+def idf_weight(documents, document_frequency):
+    """Smoothed IDF, the same formula as scikit-learn's TfidfVectorizer"""
+    return math.log((1 + documents) / (1 + document_frequency)) + 1
+
+
+class IdfLexicon:
+    """Read-only view of a lexicon file through mmap"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.identity = (stat.st_ino, stat.st_mtime_ns)
+
+        magic, self.documents, self.terms, self.watermark = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not an IDF lexicon')
+        view = memoryview(self._mmap)
+        start = HEADER.size
+        self.hashes = view[start:start + 8 * self.terms].cast('Q')
+        start += 8 * self.terms
+        self.document_frequencies = view[start:start + 4 * self.terms].cast('I')
+        start += 4 * self.terms
+        self.idf = view[start:start + 4 * self.terms].cast('f')
+
+        # Words never seen in the corpus are as rare as it gets
+        self.unknown_weight = idf_weight(self.documents, 0)
+
+    def _position(self, word):
+        h = term_hash(word)
+        i = bisect_left(self.hashes, h)
+        return i if i < self.terms and self.hashes[i] == h else -1
+
+    def document_frequency(self, word):
+        i = self._position(word)
+        return self.document_frequencies[i] if i >= 0 else 0
+
+    def weight(self, word):
+        i = self._position(word)
+        return self.idf[i] if i >= 0 else self.unknown_weight
+
+    def weights(self, words):
+        """IDF weight of each word, in order"""
+        if np is None:
+            return [self.weight(word) for word in words]
+        if self.terms == 0:
+            return [self.unknown_weight] * len(words)
+        # Vectorized binary search straight on the mapped arrays
+        hashes = np.frombuffer(self.hashes, dtype=np.uint64)
+        wanted = np.fromiter(map(term_hash, words), dtype=np.uint64, count=len(words))
+        positions = np.minimum(np.searchsorted(hashes, wanted), self.terms - 1)
+        found = hashes[positions] == wanted
+        weights = np.frombuffer(self.idf, dtype=np.float32)[positions].astype(np.float64)
+        weights[~found] = self.unknown_weight
+        return weights.tolist()
+
+    def counts(self):
+        """Document frequency of every term hash, for updating the lexicon"""
+        return Counter(dict(zip(self.hashes, self.document_frequencies)))
+
+    def stats(self):
+        return {
+            'path': self.path,
+            'documents': self.documents,
+            'terms': self.terms,
+            'bytes': len(self._mmap),
+            'updated_through': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.watermark))
+        }
+
+
+def write_lexicon(path, document_counts, documents, watermark):
+    """Write a lexicon file from ``{term hash: document frequency}``, replacing ``path`` atomically"""
+    hashes = array('Q', sorted(document_counts))
+    frequencies = array('I', (document_counts[h] for h in hashes))
+    weights = array('f', (idf_weight(documents, df) for df in frequencies))
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, documents, len(hashes), watermark))
+        hashes.tofile(f)
+        frequencies.tofile(f)
+        weights.tofile(f)
+    # Workers keep reading the old file through their mmap until they reload
+    os.replace(temporary, path)
+
+
+def build_lexicon(store, path=DEFAULT_LEXICON_PATH, rebuild=False):
+    """Add the documents stored since the last build to the lexicon at ``path``.
+
+    Returns the number of documents added.
+    """
+    document_counts = Counter()
+    documents, watermark = 0, 0.0
+    if not rebuild and os.path.exists(path):
+        previous = IdfLexicon(path)
+        document_counts = previous.counts()
+        documents, watermark = previous.documents, previous.watermark
+
+    added = 0
+    newest = watermark
+    for _, text, created_at in store.iter_documents(since=watermark):
+        document_counts.update({term_hash(word) for word in WORD_PATTERN.findall(text.lower())})
+        added += 1
+        newest = max(newest, created_at)
+
+    if added or rebuild or not os.path.exists(path):
+        write_lexicon(path, document_counts, documents + added, newest)
+    return added
+
+
+_lexicon = None
+_lexicon_checked = 0.0
+_lexicon_lock = threading.Lock()
+
+
+def get_lexicon(path=None):
+    """The shared lexicon of this process, or None when there is none.
+
+    The file is checked for a newer build at most once a minute.
+    """
+    global _lexicon, _lexicon_checked
+    path = os.environ.get('IDF_LEXICON_PATH', DEFAULT_LEXICON_PATH) if path is None else path
+    if not path:
+        return None
+
+    now = time.monotonic()
+    if _lexicon is not None and _lexicon.path == path and now - _lexicon_checked < RELOAD_CHECK_INTERVAL:
+        return _lexicon
+
+    with _lexicon_lock:
+        _lexicon_checked = now
+        try:
+            stat = os.stat(path)
+        except OSError:
+            _lexicon = None
+            return None
+        if _lexicon is None or _lexicon.path != path or _lexicon.identity != (stat.st_ino, stat.st_mtime_ns):
+            try:
+                _lexicon = IdfLexicon(path)
+                logger.info(f'IDF lexicon loaded: {_lexicon.terms} terms from {_lexicon.documents} documents')
+            except (OSError, ValueError) as e:
+                logger.warning(f'IDF lexicon unavailable ({path}): {e}')
+                _lexicon = None
+        return _lexicon
+
+
+def apply_lexicon(index, lexicon=None):
+    """Weight the keyword frequencies of a SentenceIndex by corpus IDF, if a lexicon is available"""
+    lexicon = get_lexicon() if lexicon is None else lexicon
+    if lexicon is not None:
+        index.apply_idf(lexicon.weights(index.vocab))
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build or inspect the SummaBrowser IDF lexicon')
+    parser.add_argument('command', choices=['build', 'stats'])
+    parser.add_argument('--db', default=os.environ.get('RESULT_STORE_PATH', DEFAULT_DB_PATH))
+    parser.add_argument('--lexicon', default=os.environ.get('IDF_LEXICON_PATH', DEFAULT_LEXICON_PATH))
+    parser.add_argument('--rebuild', action='store_true', help='recount every stored document from scratch')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        start = time.perf_counter()
+        added = build_lexicon(ResultStore(args.db), args.lexicon, args.rebuild)
+        print(f"📚 Added {added} documents to {args.lexicon} in {time.perf_counter() - start:.1f}s")
+    if not os.path.exists(args.lexicon):
+        print(f"❌ No lexicon at {args.lexicon}; run: python idf_lexicon.py build")
+        return
+    print(json.dumps(IdfLexicon(args.lexicon).stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
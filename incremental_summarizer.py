@@ -0,0 +1,303 @@
+# Incremental re-summarization for SummaBrowser
+# A page re-submitted under the same URL is diffed against its last version; only the changed sentences are re-tokenized
+
+import threading
+from bisect import bisect_right
+from collections import Counter
+from difflib import SequenceMatcher
+from itertools import accumulate
+
+import numpy as np
+
+import summarizer_vectorized
+from summarizer_engine import (STOP_WORDS, WEB_SENTENCE_PATTERN, WORD_PATTERN, MIN_KEYWORD_LENGTH, CAPITAL_SIGMA,
+                               LENGTH_WEIGHT, POSITION_WEIGHT, KEYWORD_WEIGHT, IDEAL_SENTENCE_WORDS,
+                               MAX_SUMMARY_SENTENCES, clean_text)
+from idf_lexicon import get_lexicon
+from text_actions import render_summaries
+
+# Pieces of this many characters or fewer aren't sentences (their words still count)
+MIN_SENTENCE_CHARS = 10
+
+# When more than this share of the page changed, rebuilding is cheaper than patching
+REBUILD_SHARE = 0.5
+
+# Characters compared per step when looking for the unchanged start and end of a page
+COMPARE_BLOCK = 64 * 1024
+
+
+def common_prefix_length(a, b):
+    """Length of the common prefix of two strings (block-wise slice comparisons run at memcmp speed)"""
+    limit = min(len(a), len(b))
+    start = 0
+    while start < limit and a[start:start + COMPARE_BLOCK] == b[start:start + COMPARE_BLOCK]:
+        start += COMPARE_BLOCK
+    low, high = start, min(start + COMPARE_BLOCK, limit)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[start:middle] == b[start:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return min(low, limit)
+
+
+def common_suffix_length(a, b, limit):
+    """Length of the common suffix of two strings, at most ``limit``"""
+    end = 0
+    while end < limit:
+        step = min(COMPARE_BLOCK, limit - end)
+        if a[len(a) - end - step:len(a) - end] != b[len(b) - end - step:len(b) - end]:
+            break
+        end += step
+    else:
+        return limit
+    low, high = end, min(end + COMPARE_BLOCK, limit)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[len(a) - middle:len(a) - end] == b[len(b) - middle:len(b) - end]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def split_pieces(text, at_end):
+    """(piece, raw length) for every piece of ``text`` split at sentence ends
+
+    A raw length covers the piece and the sentence end after it, so the
+    lengths add up to ``len(text)``. When ``text`` is not the end of the
+    page it ends with a sentence end and the empty remainder is dropped.
+    """
+    pieces = []
+    start = 0
+    for match in WEB_SENTENCE_PATTERN.finditer(text):
+        pieces.append((clean_text(text[start:match.start()]), match.end() - start))
+        start = match.end()
+    if at_end:
+        pieces.append((clean_text(text[start:]), len(text) - start))
+    return pieces
+
+
+def _grow(values, size, fill=0):
+    """``values`` with room for at least ``size`` items (capacity doubles)"""
+    if size <= len(values):
+        return values
+    grown = np.full(max(size, 2 * len(values)), fill, dtype=values.dtype)
+    grown[:len(values)] = values
+    return grown
+
+
+class DocumentState:
+    """Term statistics of the last submitted version of a page.
+
+    The page is kept as pieces (the text between sentence ends) in
+    document order, each with an id, its token count and its keyword
+    counts as entries of a sparse piece x word table. A new version is
+    compared with the last one on the raw text: only the region between
+    the unchanged start and end is split again, and within it only the
+    pieces that differ are removed or tokenized and added, updating the
+    document keyword frequencies. Scores are then recomputed from the
+    table with NumPy, with the same operations as
+    summarizer_vectorized.score_sentences(), so summaries are identical to
+    a full run on the whole text (with an IDF lexicon they may differ in
+    the last bits, as between the two scoring backends).
+
+    Callers serialize access through ``lock``.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.text_hash = None
+        self._reset(get_lexicon())
+
+    def _reset(self, lexicon):
+        self.lexicon = lexicon
+        self.raw = ''
+        # Piece ids and raw lengths in document order
+        self.order = []
+        self.raw_lengths = []
+        self.texts = {}
+        self.text_ids = {}
+        self.vocab = {}
+        self.freq = np.zeros(1024, dtype=np.int64)
+        self.idf = np.ones(1024)
+        self.tokens = np.zeros(1024)
+        self.is_sentence = np.zeros(1024, dtype=bool)
+        self.entry_ranges = {}
+        self.entry_piece = np.zeros(4096, dtype=np.int64)
+        self.entry_word = np.zeros(4096, dtype=np.int64)
+        self.entry_count = np.zeros(4096)
+        self.entries = 0
+        self.dead_entries = 0
+        self._next_id = 0
+
+    def __len__(self):
+        return len(self.order)
+
+    def update(self, text, text_hash=None):
+        """Bring the state to a new version of the page
+
+        Returns what changed (pieces inserted and removed, and whether the
+        state was rebuilt from scratch), or None for text that can't be
+        summarized incrementally: lowercasing a capital sigma depends on its
+        neighbours (see SentenceIndex.from_text), so such pages need a full
+        run.
+        """
+        if CAPITAL_SIGMA in text:
+            self.text_hash = None
+            self._reset(self.lexicon)
+            return None
+        if text_hash is not None and text_hash == self.text_hash:
+            return {'inserted': 0, 'removed': 0, 'rebuilt': False}
+        self.text_hash = text_hash
+
+        lexicon = get_lexicon()
+        # Ids are never reused and removed entries stay in the table until a rebuild
+        rebuild = (lexicon is not self.lexicon or not self.order
+                   or self._next_id > 4 * len(self.order) + 1024 or self.dead_entries > self.entries // 2)
+        if not rebuild:
+            first, last, pieces = self._changed_region(text)
+            old = [self.texts[piece_id] for piece_id in self.order[first:last]]
+            matcher = SequenceMatcher(None, old, [piece for piece, _ in pieces], autojunk=False)
+            opcodes = [op for op in matcher.get_opcodes() if op[0] != 'equal']
+            removed = sum(i2 - i1 for _, i1, i2, _, _ in opcodes)
+            inserted = sum(j2 - j1 for _, _, _, j1, j2 in opcodes)
+            rebuild = removed + inserted > REBUILD_SHARE * max(len(self.order), 1)
+        if rebuild:
+            self._reset(lexicon)
+            first, last, pieces = 0, 0, split_pieces(text, at_end=True)
+            opcodes = [('insert', 0, 0, 0, len(pieces))]
+            removed, inserted = 0, len(pieces)
+
+        new_words = []
+        added = []
+        for _, i1, i2, j1, j2 in opcodes:
+            for piece_id in self.order[first + i1:first + i2]:
+                self._remove(piece_id)
+            added.append([self._add(piece, new_words) for piece, _ in pieces[j1:j2]])
+        self._lookup_idf(new_words)
+
+        # Splice the region: unchanged pieces keep their ids, every raw length is taken from the new text
+        ids = self.order[first:last]
+        region = []
+        position = 0
+        for (_, i1, i2, _, _), piece_ids in zip(opcodes, added):
+            region.extend(ids[position:i1])
+            region.extend(piece_ids)
+            position = i2
+        region.extend(ids[position:])
+        self.order[first:last] = region
+        self.raw_lengths[first:last] = [length for _, length in pieces]
+        self.raw = text
+        return {'inserted': inserted, 'removed': removed, 'rebuilt': rebuild}
+
+    def _changed_region(self, text):
+        """(first, last, pieces): old pieces ``first:last`` are replaced by ``pieces`` of the new text
+
+        The region runs from the piece holding the last unchanged character
+        before the edit to the piece holding the first one after it, so both
+        ends fall on sentence ends that are unchanged in the new version.
+        """
+        old = self.raw
+        prefix = common_prefix_length(old, text)
+        suffix = common_suffix_length(old, text, min(len(old), len(text)) - prefix)
+        ends = list(accumulate(self.raw_lengths))
+        first = bisect_right(ends, prefix - 1)
+        last = min(bisect_right(ends, len(old) - suffix) + 1, len(ends))
+        start = ends[first - 1] if first else 0
+        end = ends[last - 1] + len(text) - len(old)
+        return first, last, split_pieces(text[start:end], at_end=last == len(ends))
+
+    def _add(self, piece, new_words):
+        piece_id = self._next_id
+        self._next_id += 1
+        if piece_id >= len(self.tokens):
+            self.tokens = _grow(self.tokens, piece_id + 1)
+            self.is_sentence = _grow(self.is_sentence, piece_id + 1)
+        words = WORD_PATTERN.findall(piece.lower())
+        keywords = Counter(word for word in words if word not in STOP_WORDS and len(word) >= MIN_KEYWORD_LENGTH)
+        self.texts[piece_id] = piece
+        self.text_ids.setdefault(piece, set()).add(piece_id)
+        self.tokens[piece_id] = len(words)
+        self.is_sentence[piece_id] = len(piece) > MIN_SENTENCE_CHARS
+
+        word_ids = []
+        for word in keywords:
+            word_id = self.vocab.get(word)
+            if word_id is None:
+                word_id = self.vocab[word] = len(self.vocab)
+                new_words.append(word)
+            word_ids.append(word_id)
+        start, end = self.entries, self.entries + len(word_ids)
+        if end > len(self.entry_piece):
+            self.entry_piece = _grow(self.entry_piece, end)
+            self.entry_word = _grow(self.entry_word, end)
+            self.entry_count = _grow(self.entry_count, end)
+        if len(self.vocab) > len(self.freq):
+            self.freq = _grow(self.freq, len(self.vocab))
+            self.idf = _grow(self.idf, len(self.vocab), fill=1.0)
+        counts = np.fromiter(keywords.values(), dtype=np.int64, count=len(keywords))
+        self.entry_piece[start:end] = piece_id
+        self.entry_word[start:end] = word_ids
+        self.entry_count[start:end] = counts
+        self.freq[word_ids] += counts
+        self.entry_ranges[piece_id] = (start, end)
+        self.entries = end
+        return piece_id
+
+    def _remove(self, piece_id):
+        piece = self.texts.pop(piece_id)
+        ids = self.text_ids[piece]
+        ids.discard(piece_id)
+        if not ids:
+            del self.text_ids[piece]
+        self.is_sentence[piece_id] = False
+        start, end = self.entry_ranges.pop(piece_id)
+        self.freq[self.entry_word[start:end]] -= self.entry_count[start:end].astype(np.int64)
+        self.entry_count[start:end] = 0
+        self.dead_entries += end - start
+
+    def _lookup_idf(self, words):
+        if self.lexicon is not None and words:
+            ids = [self.vocab[word] for word in words]
+            self.idf[ids] = self.lexicon.weights(words)
+
+    def scores(self):
+        """(piece ids of the sentences in document order, their advanced_summarize() scores)"""
+        order = np.array(self.order, dtype=np.int64)
+        sentence_ids = order[self.is_sentence[order]]
+        words = len(self.vocab)
+        weights = self.freq[:words] * self.idf[:words]
+        max_weight = weights.max() if words else 0
+        keyword_sums = None
+        if max_weight:
+            entries = self.entries
+            contributions = self.entry_count[:entries] * weights[self.entry_word[:entries]]
+            keyword_sums = np.bincount(self.entry_piece[:entries], weights=contributions,
+                                       minlength=len(self.tokens))[sentence_ids]
+        scores = summarizer_vectorized.combine_scores(
+            self.tokens[sentence_ids], keyword_sums, max_weight,
+            LENGTH_WEIGHT, POSITION_WEIGHT, KEYWORD_WEIGHT, IDEAL_SENTENCE_WORDS
+        )
+        return sentence_ids, scores
+
+    def ranking(self, limit=MAX_SUMMARY_SENTENCES):
+        """(ranking, sentence count): the rank_sentences_by_score() ranking of the current version"""
+        sentence_ids, scores = self.scores()
+        order = summarizer_vectorized.top_indices(scores, limit)
+        position_of = np.zeros(len(self.tokens), dtype=np.int64)
+        position_of[sentence_ids] = np.arange(len(sentence_ids))
+        ranking = []
+        for i in order:
+            sentence = self.texts[int(sentence_ids[i])]
+            positions = sorted(int(position_of[piece_id]) for piece_id in self.text_ids[sentence])
+            ranking.append([positions, sentence])
+        return ranking, len(sentence_ids)
+
+    def summaries(self, lengths):
+        """``{name: summary}`` for ``{name: sentences}``, like text_actions.summarize_index()"""
+        ranking, sentence_count = self.ranking(min(max(lengths.values()), MAX_SUMMARY_SENTENCES))
+        # Pages with fewer sentences than a summary are returned whole
+        text = clean_text(self.raw) if sentence_count <= max(lengths.values()) else None
+        return render_summaries(ranking, sentence_count, text, lengths)
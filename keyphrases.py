@@ -0,0 +1,122 @@
+# RAKE-style keyphrase extraction for SummaBrowser
+# Candidate phrases are the word runs between stop words and punctuation, found in one pass
+
+import heapq
+import operator
+import string
+from collections import Counter
+from itertools import groupby
+
+from idf_lexicon import get_lexicon
+from summarizer_engine import STOP_WORDS
+
+# Function words that never start, end or sit inside a keyphrase
+PHRASE_STOP_WORDS = STOP_WORDS | frozenset({
+    'about', 'above', 'after', 'again', 'against', 'all', 'also', 'am', 'among', 'any', 'as', 'because',
+    'before', 'being', 'below', 'between', 'both', 'cannot', 'did', 'doing', 'down', 'during', 'each',
+    'either', 'else', 'even', 'ever', 'every', 'few', 'from', 'further', 'get', 'gets', 'got', 'he', 'her',
+    'here', 'hers', 'herself', 'him', 'himself', 'his', 'how', 'however', 'i', 'if', 'into', 'it', 'its',
+    'itself', 'just', 'least', 'less', 'like', 'many', 'me', 'more', 'most', 'much', 'my', 'myself', 'neither',
+    'no', 'nor', 'not', 'now', 'off', 'often', 'once', 'one', 'only', 'other', 'others', 'our', 'ours',
+    'ourselves', 'out', 'over', 'own', 'per', 'quite', 'rather', 'really', 'same', 'she', 'since', 'so',
+    'some', 'such', 'than', 'their', 'theirs', 'them', 'themselves', 'then', 'there', 'therefore', 'they',
+    'though', 'through', 'thus', 'too', 'under', 'until', 'up', 'upon', 'us', 'use', 'used', 'using', 'very',
+    'via', 'we', 'well', 'what', 'when', 'where', 'whether', 'which', 'while', 'who', 'whom', 'whose', 'why',
+    'within', 'without', 'yet', 'you', 'your', 'yours', 'yourself', 'yourselves', 'etc', 'eg', 'ie', 'let',
+    'make', 'makes', 'made', 'new', 'see', 'two', 'way', 'able',
+    # Contraction stems and URL fragments left behind by the punctuation split
+    'don', 'doesn', 'didn', 'isn', 'aren', 'wasn', 'weren', 'won', 'can', 'couldn', 'shouldn', 'wouldn',
+    'hasn', 'haven', 'll', 're', 've', 'http', 'https', 'www', 'com', 'org', 'html'
+}) | frozenset(string.ascii_lowercase)
+
+# Punctuation and digits end a candidate phrase (translated to line breaks)
+PHRASE_DELIMITERS = str.maketrans(dict.fromkeys(string.punctuation + string.digits + '“”‘’–—…•·«»¿¡', '\n'))
+
+KEYPHRASE_COUNT = 10
+
+# Longer candidates are mostly run-on fragments (OCR, lists without punctuation)
+MAX_PHRASE_WORDS = 3
+
+
+def _is_delimiter(word):
+    # Stop words, and symbols such as emoji or box drawing that survive the translation
+    return word in PHRASE_STOP_WORDS or not word.isalpha()
+
+
+def candidate_phrases(text, max_words=MAX_PHRASE_WORDS):
+    """Occurrences of every candidate phrase (a tuple of words) in ``text``"""
+    runs = (
+        tuple(words)
+        for fragment in text.lower().translate(PHRASE_DELIMITERS).split('\n')
+        for is_delimiter, words in groupby(fragment.split(), _is_delimiter)
+        if not is_delimiter
+    )
+    return Counter(run for run in runs if len(run) <= max_words)
+
+
+def index_candidate_phrases(index, max_words=MAX_PHRASE_WORDS):
+    """Occurrences of every candidate phrase in a SentenceIndex built with ``phrase_breaks``
+
+    The phrases come from the index's token stream: runs of words between
+    stop words, sentence starts and punctuation breaks. Words holding
+    digits end a phrase like the digits do in candidate_phrases().
+    """
+    words = list(index.vocab)
+    is_delimiter = [_is_delimiter(word) for word in words]
+    starts = set(index.offsets)
+    starts.update(index.phrase_breaks)
+    runs = Counter()
+    run = []
+    for position, word_id in enumerate(index.token_ids):
+        if is_delimiter[word_id] or position in starts:
+            if 0 < len(run) <= max_words:
+                runs[tuple(run)] += 1
+            run = []
+        if not is_delimiter[word_id]:
+            run.append(word_id)
+    if 0 < len(run) <= max_words:
+        runs[tuple(run)] += 1
+    return Counter({tuple(words[i] for i in ids): occurrences for ids, occurrences in runs.items()})
+
+
+def index_keyphrases(index, count=KEYPHRASE_COUNT, max_words=MAX_PHRASE_WORDS, lexicon=None):
+    """extract_keyphrases() from the tokens of a SentenceIndex built with ``phrase_breaks``"""
+    return score_phrases(index_candidate_phrases(index, max_words), count, lexicon)
+
+
+def extract_keyphrases(text, count=KEYPHRASE_COUNT, max_words=MAX_PHRASE_WORDS, lexicon=None):
+    """Top keyphrases of ``text`` as [{'phrase', 'score', 'count'}], best first (see score_phrases())"""
+    return score_phrases(candidate_phrases(text, max_words), count, lexicon)
+
+
+def score_phrases(phrases, count=KEYPHRASE_COUNT, lexicon=None):
+    """The ``count`` best of the candidate ``phrases`` as [{'phrase', 'score', 'count'}]
+
+    Each word scores degree / frequency, where its degree counts the words
+    it co-occurs with in candidate phrases (itself included), so words that
+    live in longer phrases score higher. With an IDF lexicon (the shared
+    one by default, False for none) word scores are also multiplied by the
+    word's IDF. A phrase scores the sum of its word scores times its number
+    of occurrences, so a phrase repeated throughout the document beats a
+    one-off.
+    """
+    frequency = Counter()
+    degree = Counter()
+    for words, occurrences in phrases.items():
+        for word in words:
+            frequency[word] += occurrences
+            degree[word] += occurrences * len(words)
+
+    word_score = {word: degree[word] / frequency[word] for word in frequency}
+    lexicon = get_lexicon() if lexicon is None else lexicon
+    if lexicon:
+        word_score = dict(zip(word_score, map(operator.mul, word_score.values(), lexicon.weights(word_score))))
+    scored = (
+        (sum(map(word_score.__getitem__, words)) * occurrences, words, occurrences)
+        for words, occurrences in phrases.items()
+    )
+    best = heapq.nlargest(count, scored, key=lambda item: item[0])
+    return [
+        {'phrase': ' '.join(words), 'score': round(score, 3), 'count': occurrences}
+        for score, words, occurrences in best
+    ]
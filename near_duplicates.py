@@ -0,0 +1,106 @@
+# Near-duplicate detection for SummaBrowser
+# Bottom-k MinHash sketches of word shingles, indexed by sketch value so similar documents are found without a scan
+
+import heapq
+import threading
+import zlib
+from collections import Counter, OrderedDict
+
+from summarizer_engine import WORD_PATTERN
+
+# Words per shingle; three-word shingles survive re-wrapping and small edits
+SHINGLE_WORDS = 3
+
+# Hashes kept per sketch; the Jaccard estimate is within about 1/sqrt(k)
+SKETCH_SIZE = 128
+
+# Texts with fewer shingles than this are too short to match reliably
+MIN_SHINGLES = 50
+
+# Only the start of very long texts is fingerprinted, which is plenty to
+# recognise a re-posted article and keeps a miss cheap
+FINGERPRINT_MAX_CHARS = 256 * 1024
+
+
+def fingerprint(text, sketch_size=SKETCH_SIZE):
+    """Bottom-k MinHash sketch of ``text``: its ``sketch_size`` smallest shingle hashes, sorted.
+
+    Returns None for texts too short to fingerprint.
+    """
+    words = WORD_PATTERN.findall(text[:FINGERPRINT_MAX_CHARS].lower())
+    shingles = map(' '.join, zip(*(words[i:] for i in range(SHINGLE_WORDS))))
+    hashes = set(map(zlib.crc32, map(str.encode, shingles)))
+    if len(hashes) < MIN_SHINGLES:
+        return None
+    return heapq.nsmallest(sketch_size, hashes)
+
+
+def similarity(sketch, other, sketch_size=SKETCH_SIZE):
+    """Estimated Jaccard similarity of the shingle sets behind two sketches"""
+    mine, theirs = set(sketch), set(other)
+    union = heapq.nsmallest(sketch_size, mine | theirs)
+    if not union:
+        return 0.0
+    return sum(1 for h in union if h in mine and h in theirs) / len(union)
+
+
+def min_shared_values(threshold, sketch_size=SKETCH_SIZE):
+    """Sketch values a candidate must share to possibly reach ``threshold`` (with slack for estimation error)"""
+    return max(1, int(sketch_size * threshold / 2))
+
+
+def best_match(sketch, candidates, threshold):
+    """(key, similarity) of the most similar ``{key: sketch}`` candidate at or above ``threshold``, or None"""
+    best = None
+    for key, other in candidates.items():
+        score = similarity(sketch, other)
+        if score >= threshold and (best is None or score > best[1]):
+            best = (key, score)
+    return best
+
+
+class NearDuplicateIndex:
+    """In-process index of document sketches.
+
+    Each sketch value points at the documents containing it, so a lookup
+    only compares against documents sharing enough values. Used when the
+    persistent result store (which offers the same two methods) is
+    disabled. The oldest documents are dropped beyond ``max_entries``.
+    """
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._sketches = OrderedDict()
+        self._postings = {}
+        self._lock = threading.Lock()
+
+    def add_fingerprint(self, key, scope, sketch):
+        with self._lock:
+            self._remove((scope, key))
+            self._sketches[(scope, key)] = sketch
+            for value in sketch:
+                self._postings.setdefault((scope, value), set()).add(key)
+            while len(self._sketches) > self.max_entries:
+                self._remove(next(iter(self._sketches)))
+
+    def find_near_duplicate(self, sketch, scope, threshold):
+        """(key, similarity) of the closest indexed document in ``scope``, or None"""
+        with self._lock:
+            shared = Counter()
+            for value in sketch:
+                shared.update(self._postings.get((scope, value), ()))
+            needed = min_shared_values(threshold)
+            candidates = {key: self._sketches[(scope, key)] for key, count in shared.items() if count >= needed}
+        return best_match(sketch, candidates, threshold)
+
+    def _remove(self, entry):
+        sketch = self._sketches.pop(entry, None)
+        if sketch is None:
+            return
+        scope, key = entry
+        for value in sketch:
+            keys = self._postings.get((scope, value))
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[(scope, value)]
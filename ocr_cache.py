@@ -0,0 +1,183 @@
+# Perceptual-hash OCR result cache for SummaBrowser
+# Images are found by a difference hash of their normalized pixels and confirmed on a thumbnail, so re-compressed or resized copies reuse the OCR text
+
+import math
+import os
+import threading
+import zlib
+from collections import OrderedDict, namedtuple
+
+from PIL import Image, ImageChops, ImageFilter, ImageOps
+
+# Rows of the difference hash; the hash has HASH_SIZE**2 bits (4096)
+HASH_SIZE = 64
+
+# Cached images whose hashes differ in at most this many bits are compared
+# pixel by pixel (re-compression and rescaling flip up to about 130). The hash
+# only finds candidates: forms sharing a template, or screenshots differing
+# in one figure, are a few bits apart
+OCR_CACHE_MAX_DISTANCE = int(os.environ.get('OCR_CACHE_MAX_DISTANCE', 192))
+
+# OCR results kept per process, each with a compressed thumbnail of its image
+# (0 disables the cache)
+OCR_CACHE_ENTRIES = int(os.environ.get('OCR_CACHE_ENTRIES', 256))
+
+# Images whose width/height ratios differ by more than this share are never
+# matched (a crop can keep most of the hash)
+MAX_ASPECT_CHANGE = 0.05
+
+# Pixel check: both thumbnails (VERIFY_WIDTH wide) are slightly blurred and
+# must not differ by more than VERIFY_MAX_DIFF (of 255) on average in any
+# VERIFY_BLOCK-pixel square. Re-compressed and resized copies of forms and
+# screenshots stay within 20; one changed digit in a 22 px font scores over 40
+VERIFY_WIDTH = 1024
+VERIFY_BLOCK = 4
+VERIFY_MAX_DIFF = 30
+
+# Perceptual hash, aspect ratio and normalized thumbnail of an image
+ImageKey = namedtuple('ImageKey', 'value aspect thumbnail')
+
+
+def normalize(image, width=VERIFY_WIDTH):
+    """Grayscale copy of a PIL image, flattened onto white and scaled to ``width`` pixels wide"""
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGBA', image.size, (255, 255, 255, 255))
+        image = Image.alpha_composite(background, image)
+    height = max(1, round(width * image.height / image.width))
+    return image.convert('L').resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+
+
+def image_hash(thumbnail, hash_size=HASH_SIZE):
+    """Difference hash of a normalized image: whether each pixel of a
+    ``hash_size + 1`` by ``hash_size`` reduction is brighter than its right neighbour"""
+    pixels = thumbnail.resize((hash_size + 1, hash_size), Image.LANCZOS, reducing_gap=3.0).tobytes()
+    bits = ''.join(
+        '1' if pixels[i] > pixels[i + 1] else '0'
+        for row in range(hash_size) for i in range(row * (hash_size + 1), (row + 1) * (hash_size + 1) - 1)
+    )
+    return int(bits, 2)
+
+
+def image_key(image):
+    """ImageKey of a PIL image"""
+    aspect = image.width / image.height if image.height else 0.0
+    thumbnail = normalize(image)
+    return ImageKey(image_hash(thumbnail), aspect, thumbnail)
+
+
+def file_image_key(image_path):
+    """image_key() of an image file, or None when it can't be decoded"""
+    try:
+        with Image.open(image_path) as image:
+            return image_key(image)
+    except Exception:
+        return None
+
+
+def same_image(thumbnail, other):
+    """Whether two normalized thumbnails show the same content (see VERIFY_MAX_DIFF)"""
+    if other.size != thumbnail.size:
+        other = other.resize(thumbnail.size, Image.LANCZOS)
+    blur = ImageFilter.GaussianBlur(1)
+    difference = ImageChops.difference(thumbnail.filter(blur), other.filter(blur))
+    return difference.reduce(VERIFY_BLOCK).getextrema()[1] <= VERIFY_MAX_DIFF
+
+
+class OCRCache:
+    """Thread-safe LRU of OCR texts looked up by perceptual hash.
+
+    Entries within ``max_distance`` bits of an image are candidates; the
+    closest one whose thumbnail passes same_image() is a hit. Each hash is
+    split into ``max_distance + 1`` bands: two hashes that close agree
+    exactly on at least one band, so only entries sharing a band are
+    compared. ``scope`` keeps engines (online API, Tesseract languages)
+    from answering for each other.
+    """
+
+    def __init__(self, max_entries=OCR_CACHE_ENTRIES, max_distance=OCR_CACHE_MAX_DISTANCE, hash_size=HASH_SIZE):
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self.bits = hash_size * hash_size
+        bands = min(max_distance + 1, self.bits)
+        bounds = [self.bits * i // bands for i in range(bands + 1)]
+        self._bands = [(bounds[i], (1 << (bounds[i + 1] - bounds[i])) - 1) for i in range(bands)]
+        self._entries = OrderedDict()
+        self._postings = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+        self.evictions = 0
+
+    def _band_keys(self, scope, value):
+        return [(scope, i, value >> shift & mask) for i, (shift, mask) in enumerate(self._bands)]
+
+    def get(self, key, scope=''):
+        """Text cached for an image_key() ``key``, or None"""
+        if key is None or self.max_entries <= 0:
+            return None
+        with self._lock:
+            candidates = set()
+            for band in self._band_keys(scope, key.value):
+                candidates.update(self._postings.get(band, ()))
+            close = []
+            for entry in candidates:
+                distance = bin(entry[1] ^ key.value).count('1')
+                aspect, text, size, pixels = self._entries[entry]
+                if distance <= self.max_distance and abs(math.log((aspect or 1) / (key.aspect or 1))) <= MAX_ASPECT_CHANGE:
+                    close.append((distance, entry, text, size, pixels))
+        # Pixel checks run outside the lock; they take a few milliseconds each
+        for _, entry, text, size, pixels in sorted(close, key=lambda candidate: candidate[0]):
+            if same_image(Image.frombytes('L', size, zlib.decompress(pixels)), key.thumbnail):
+                with self._lock:
+                    if entry in self._entries:
+                        self._entries.move_to_end(entry)
+                    self.hits += 1
+                return text
+        with self._lock:
+            self.rejected += len(close)
+            self.misses += 1
+        return None
+
+    def set(self, key, text, scope=''):
+        """Remember the OCR text of an image_key() ``key``"""
+        if key is None or self.max_entries <= 0:
+            return
+        pixels = zlib.compress(key.thumbnail.tobytes(), 1)
+        # Same-template images can share a hash, so the thumbnail tells entries apart
+        entry = (scope, key.value, zlib.crc32(pixels))
+        with self._lock:
+            self._remove(entry)
+            self._entries[entry] = (key.aspect, text, key.thumbnail.size, pixels)
+            for band in self._band_keys(scope, key.value):
+                self._postings.setdefault(band, set()).add(entry)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def stats(self):
+        """Counters for the /health endpoint"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'rejected': self.rejected,
+                'hit_rate': f"{self.hits / lookups * 100:.1f}%" if lookups else "N/A",
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'max_distance': self.max_distance
+            }
+
+    def _remove(self, entry):
+        if self._entries.pop(entry, None) is None:
+            return
+        for band in self._band_keys(entry[0], entry[1]):
+            entries = self._postings.get(band)
+            if entries is not None:
+                entries.discard(entry)
+                if not entries:
+                    del self._postings[band]
@@ -0,0 +1,209 @@
+# Page-parallel PDF text extraction for SummaBrowser
+# Page ranges run on a shared process pool, each worker opening the file itself; scanned pages can be routed to OCR
+
+import math
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+# Text extraction libraries: PyPDF2 (app-web, app-ocr) or pdfplumber (PDFProcessor)
+BACKENDS = ('pypdf2', 'pdfplumber')
+
+# PDFs with fewer pages are extracted in-process: starting the work on the
+# pool and parsing the file again in every worker costs more than it saves
+PARALLEL_MIN_PAGES = int(os.environ.get('PDF_PARALLEL_MIN_PAGES', 64))
+
+# Extraction processes per app process, shared by all requests so concurrent
+# uploads queue instead of multiplying processes (0 or 1 disables the pool)
+PDF_WORKERS = int(os.environ.get('PDF_WORKERS', min(4, os.cpu_count() or 1)))
+
+# Page ranges per worker, so a run of slow (image-heavy) pages doesn't leave
+# the other workers idle; ranges never get shorter than MIN_RANGE_PAGES
+RANGES_PER_WORKER = 4
+MIN_RANGE_PAGES = 8
+
+# Pages whose text layer has fewer non-space characters are treated as
+# scanned and sent to OCR (a scan often still carries a header or page number)
+MIN_TEXT_LAYER_CHARS = int(os.environ.get('PDF_MIN_TEXT_CHARS', 32))
+
+# Concurrent OCR calls per app process; OCR runs in the Tesseract binary or
+# on a remote API, so threads are enough
+OCR_WORKERS = int(os.environ.get('PDF_OCR_WORKERS', 4))
+
+# Pages extracted ahead of the consumer while earlier pages wait for OCR
+OCR_LOOKAHEAD_PAGES = 64
+
+_pools = {}
+_pools_lock = threading.Lock()
+_ocr_pool = None
+
+
+@contextmanager
+def open_pages(pdf_path, backend='pypdf2'):
+    """The page sequence of a PDF, open for the duration of the block"""
+    if backend == 'pdfplumber':
+        import pdfplumber
+        with pdfplumber.open(pdf_path) as pdf:
+            yield pdf.pages
+    elif backend == 'pypdf2':
+        import PyPDF2
+        with open(pdf_path, 'rb') as file:
+            yield PyPDF2.PdfReader(file).pages
+    else:
+        raise ValueError(f'Unknown PDF backend: {backend}')
+
+
+def page_text(page):
+    """Text layer of one page ('' when it has none)"""
+    return page.extract_text() or ''
+
+
+def extract_page_range(pdf_path, start, end, backend='pypdf2'):
+    """Texts of pages ``start:end`` (runs in pool workers, which open the file themselves)"""
+    with open_pages(pdf_path, backend) as pages:
+        return [page_text(pages[i]) for i in range(start, end)]
+
+
+def page_ranges(count, parts):
+    """``(start, end)`` of at most ``parts`` contiguous, nearly equal ranges covering ``count`` pages"""
+    parts = max(1, min(parts, math.ceil(count / MIN_RANGE_PAGES)))
+    bounds = [count * i // parts for i in range(parts + 1)]
+    return [(bounds[i], bounds[i + 1]) for i in range(parts) if bounds[i] < bounds[i + 1]]
+
+
+def get_pool(workers=PDF_WORKERS):
+    """The shared extraction pool of ``workers`` processes, started on first use
+
+    Workers are spawned rather than forked: the apps run threads (batch
+    pool, inference scheduler) whose locks a forked child would inherit.
+    A spawned worker imports the launching script again as __mp_main__, so
+    scripts using the pool must keep heavy start-up work (model preload,
+    result store) out of that import; the apps check PDF_WORKER_IMPORT.
+    """
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context('spawn')
+            )
+        return pool
+
+
+def discard_pool(workers, pool):
+    with _pools_lock:
+        if _pools.get(workers) is pool:
+            del _pools[workers]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def get_ocr_pool():
+    """The shared thread pool running OCR calls, started on first use"""
+    global _ocr_pool
+    with _pools_lock:
+        if _ocr_pool is None:
+            _ocr_pool = ThreadPoolExecutor(max_workers=max(1, OCR_WORKERS), thread_name_prefix='pdf-ocr')
+        return _ocr_pool
+
+
+def needs_ocr(text):
+    """Whether a page's text layer is too thin to be the page's content"""
+    return len(''.join(text.split())) < MIN_TEXT_LAYER_CHARS
+
+
+def iter_pages(pdf_path, backend='pypdf2', workers=PDF_WORKERS, min_pages=PARALLEL_MIN_PAGES,
+               ocr=None, max_ocr_pages=None, report=None):
+    """Yield the text of every page of a PDF in page order
+
+    PDFs of ``min_pages`` pages or more are split into page ranges that
+    ``workers`` processes extract in parallel. Only a few ranges are in
+    flight ahead of the consumer, so streaming callers keep bounded memory.
+    If the pool breaks (a worker crashed), the remaining pages are
+    extracted in-process.
+
+    With ``ocr``, a function of (pdf_path, page number from 0) returning
+    the page's text (None when recognition failed), pages without a usable
+    text layer are recognized instead, several at a time, up to
+    ``max_ocr_pages`` per document. ``report`` (a dict) receives the
+    ``ocr_pages`` sent to OCR and the ``ocr_failed`` ones, which keep their
+    text layer.
+    """
+    pages = _iter_text_layers(pdf_path, backend, workers, min_pages)
+    if ocr is None:
+        yield from pages
+    else:
+        yield from _route_pages(pdf_path, pages, ocr, max_ocr_pages, {} if report is None else report)
+
+
+def _route_pages(pdf_path, pages, ocr, max_ocr_pages, report):
+    report.setdefault('ocr_pages', 0)
+    report.setdefault('ocr_failed', 0)
+    pool = get_ocr_pool()
+    # (text layer, pending OCR or None) in page order
+    window = deque()
+    try:
+        for number, text in enumerate(pages):
+            future = None
+            if needs_ocr(text) and (max_ocr_pages is None or report['ocr_pages'] < max_ocr_pages):
+                report['ocr_pages'] += 1
+                future = pool.submit(ocr, pdf_path, number)
+            window.append((text, future))
+            while window and (window[0][1] is None or window[0][1].done() or len(window) > OCR_LOOKAHEAD_PAGES):
+                yield _page_result(*window.popleft(), report)
+        while window:
+            yield _page_result(*window.popleft(), report)
+    finally:
+        for _, future in window:
+            if future is not None:
+                future.cancel()
+
+
+def _page_result(text, future, report):
+    if future is None:
+        return text
+    try:
+        recognized = future.result()
+    except Exception:
+        recognized = None
+    if recognized is None:
+        report['ocr_failed'] += 1
+        return text
+    return recognized
+
+
+def _iter_text_layers(pdf_path, backend, workers, min_pages):
+    with open_pages(pdf_path, backend) as pages:
+        count = len(pages)
+        if workers < 2 or count < min_pages:
+            for page in pages:
+                yield page_text(page)
+            return
+
+    pool = get_pool(workers)
+    ranges = deque(page_ranges(count, workers * RANGES_PER_WORKER))
+    pending = deque()
+    done = 0
+    try:
+        while ranges or pending:
+            while ranges and len(pending) < 2 * workers:
+                start, end = ranges.popleft()
+                pending.append(pool.submit(extract_page_range, pdf_path, start, end, backend))
+            texts = pending.popleft().result()
+            done += len(texts)
+            yield from texts
+    except BrokenProcessPool:
+        discard_pool(workers, pool)
+        with open_pages(pdf_path, backend) as pages:
+            for i in range(done, count):
+                yield page_text(pages[i])
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def extract_pages(pdf_path, backend='pypdf2', workers=PDF_WORKERS, min_pages=PARALLEL_MIN_PAGES, **routing):
+    """Texts of all pages of a PDF, in page order (see iter_pages() for the OCR ``routing`` options)"""
+    return list(iter_pages(pdf_path, backend, workers, min_pages, **routing))
@@ -197,7 +197,7 @@ class SummaBrowsePro {
 
             chrome.tabs.sendMessage(tab.id, { action: 'getPageContent' }, async (response) => {
                 if (response && response.text) {
-                    const summary = await this.processSummary(response.text, 'page');
+                    const summary = await this.processSummary(response.text, 'page', tab.url);
                     this.hideProcessing();
                     this.showResult('Page Summary', summary);
                 } else {
@@ -257,10 +257,15 @@ class SummaBrowsePro {
         }
     }
 
-    async processSummary(text, type) {
+    async processSummary(text, type, url = null) {
         try {
             const summaryLength = document.querySelector('input[name="summaryLength"]:checked')?.value || 'brief';
             
+            // Every length comes back in one response, so switching length needs no new request
+            if (this.lastSummaries && this.lastSummaries.text === text && this.lastSummaries.summaries[summaryLength]) {
+                return this.lastSummaries.summaries[summaryLength];
+            }
+            
             const response = await fetch(`${this.apiUrl}/process-text`, {
                 method: 'POST',
                 headers: {
@@ -270,7 +275,9 @@ class SummaBrowsePro {
                     text: text,
                     type: type,
                     length: summaryLength,
-                    action: 'summarize'
+                    action: 'summarize',
+                    // Lets the server re-summarize a changed page from the sentences that changed
+                    ...(url ? { url: url } : {})
                 })
             });
 
@@ -279,6 +286,9 @@ class SummaBrowsePro {
             }
 
             const data = await response.json();
+            if (data.summaries) {
+                this.lastSummaries = { text: text, summaries: data.summaries };
+            }
             return data.summary || 'Summary generation completed successfully.';
         } catch (error) {
             return `Error: ${error.message}. Please try again or check your connection.`;
@@ -310,6 +320,39 @@ class SummaBrowsePro {
     }
 
     async processKeywords(text) {
+        try {
+            const response = await fetch(`${this.apiUrl}/process-text`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({
+                    text: text,
+                    action: 'keywords'
+                })
+            });
+
+            if (!response.ok) {
+                throw new Error('Keyword extraction failed');
+            }
+
+            const data = await response.json();
+            const keywords = (data.keywords || [])
+                .map(({ term, count }) => `${term} (${count})`)
+                .join(', ');
+            const keyphrases = (data.keyphrases || [])
+                .map(({ phrase }) => phrase)
+                .join(', ');
+
+            return keyphrases
+                ? `Key phrases: ${keyphrases}\n\nKey terms found: ${keywords}`
+                : `Key terms found: ${keywords}`;
+        } catch (error) {
+            return this.processKeywordsLocally(text);
+        }
+    }
+
+    processKeywordsLocally(text) {
         try {
             // Simple keyword extraction fallback
             const words = text.toLowerCase()
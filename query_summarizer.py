@@ -0,0 +1,105 @@
+# Query-focused summarization for SummaBrowser
+# BM25 over a per-document inverted index of sentences, blended with the advanced_summarize score
+
+import math
+import os
+from array import array
+from collections import Counter
+
+from summarizer_engine import (SentenceIndex, STOP_WORDS, WEB_SENTENCE_PATTERN, WORD_PATTERN, MAX_SUMMARY_SENTENCES,
+                               clean_text, rank_sentences_by_score)
+from graph_summarizer import rank_sentences
+from idf_lexicon import apply_lexicon
+
+# Share of the final score given to query relevance; the rest is the
+# document's own sentence score, so ties between equally relevant
+# sentences go to the ones the plain summary would pick
+QUERY_WEIGHT = float(os.environ.get('QUERY_WEIGHT', 0.7))
+
+# Standard BM25 parameters (term frequency saturation, length normalization)
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+class QueryIndex:
+    """Inverted index of one document's sentences for repeated queries.
+
+    Every term id maps to the sentences containing it and its count in
+    each, so a query only touches the postings of its own terms. The
+    document's plain sentence scores are kept for blending.
+    """
+
+    def __init__(self, index, scores, text):
+        self.index = index
+        self.words = len(text.split())
+        # Short documents are returned whole at lengths covering every sentence
+        self.text = text if len(index) <= MAX_SUMMARY_SENTENCES else None
+
+        offsets = index.offsets
+        token_ids = index.token_ids
+        self.lengths = array('I', (offsets[i + 1] - offsets[i] for i in range(len(index))))
+        self.average_length = (sum(self.lengths) / len(index) if len(index) else 0) or 1
+        self.postings = {}
+        for i in range(len(index)):
+            for term, count in Counter(token_ids[offsets[i]:offsets[i + 1]]).items():
+                posting = self.postings.get(term)
+                if posting is None:
+                    posting = self.postings[term] = (array('I'), array('I'))
+                posting[0].append(i)
+                posting[1].append(count)
+
+        scores = [float(score) for score in scores]
+        top = max(scores, default=0)
+        self.base_scores = [score / top for score in scores] if top else scores
+
+    @classmethod
+    def from_text(cls, text, mode='advanced'):
+        """Index a document, scoring its sentences the way advanced_summarize() does for ``mode``"""
+        text = clean_text(text)
+        index = apply_lexicon(
+            SentenceIndex.from_text(text, WEB_SENTENCE_PATTERN, min_length=10, stop_words=STOP_WORDS)
+        )
+        scores = rank_sentences(index) if mode == 'graph' else index.score_sentences()
+        return cls(index, scores, text)
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def query_terms(self, query):
+        """Distinct query words found in the document (stop words ignored)"""
+        vocab = self.index.vocab
+        return [word for word in dict.fromkeys(WORD_PATTERN.findall(query.lower()))
+                if word not in STOP_WORDS and word in vocab]
+
+    def bm25(self, words):
+        """BM25 relevance of every sentence to ``words``, sentences being the documents"""
+        n = len(self.lengths)
+        scores = [0.0] * n
+        lengths = self.lengths
+        length_norm = BM25_K1 / self.average_length
+        vocab = self.index.vocab
+        for word in words:
+            sentences, counts = self.postings[vocab[word]]
+            idf = math.log(1 + (n - len(sentences) + 0.5) / (len(sentences) + 0.5))
+            for i, count in zip(sentences, counts):
+                saturation = BM25_K1 * (1 - BM25_B) + BM25_B * lengths[i] * length_norm
+                scores[i] += idf * count * (BM25_K1 + 1) / (count + saturation)
+        return scores
+
+    def scores(self, query, weight=QUERY_WEIGHT):
+        """Blended sentence scores for ``query`` and the query words that matched
+
+        Without any matching word the plain sentence scores are returned.
+        """
+        words = self.query_terms(query)
+        relevance = self.bm25(words)
+        top = max(relevance, default=0)
+        if not top:
+            return self.base_scores, []
+        return [weight * r / top + (1 - weight) * b for r, b in zip(relevance, self.base_scores)], words
+
+    def ranking(self, query, limit=MAX_SUMMARY_SENTENCES):
+        """(ranking, matched words): the best sentences for ``query`` as rank_sentences_by_score() pairs"""
+        scores, words = self.scores(query)
+        return rank_sentences_by_score(self.index.sentences, scores, limit), words
+
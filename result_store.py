@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Persistent result store for SummaBrowser
+
+Keeps extracted text, summaries and transcripts per content hash in a SQLite
+database in WAL mode, so results survive restarts and are shared by every
+gunicorn worker (and every Flask app) pointed at the same file. Only the
+standard library is used.
+
+Usage:
+    python result_store.py stats   [--db PATH]
+    python result_store.py evict   [--db PATH] [--max-bytes N]
+    python result_store.py compact [--db PATH]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from array import array
+
+from near_duplicates import best_match, min_shared_values
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'results.db')
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Eviction trims the store to this share of max_bytes so it doesn't run on every write
+EVICTION_TARGET = 0.9
+
+# Last-access times are only rewritten when older than this, keeping reads read-only
+ACCESS_UPDATE_INTERVAL = 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    extracted_text TEXT,
+    summary TEXT,
+    transcript TEXT,
+    payload TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_accessed ON results (accessed_at);
+CREATE INDEX IF NOT EXISTS idx_results_hash ON results (content_hash);
+CREATE TABLE IF NOT EXISTS fingerprints (
+    key TEXT PRIMARY KEY,
+    scope TEXT NOT NULL,
+    sketch BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fingerprint_values (
+    scope TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    key TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_fingerprint_values ON fingerprint_values (scope, value);
+CREATE INDEX IF NOT EXISTS idx_fingerprint_keys ON fingerprint_values (key);
+CREATE TABLE IF NOT EXISTS contents (
+    content_hash TEXT PRIMARY KEY,
+    created_at REAL NOT NULL
+);
+INSERT OR IGNORE INTO contents (content_hash, created_at)
+    SELECT content_hash, MIN(created_at) FROM results
+    WHERE extracted_text IS NOT NULL OR transcript IS NOT NULL GROUP BY content_hash;
+"""
+
+# Payload fields that get their own column instead of living in the JSON blob
+TEXT_FIELDS = ('summary', 'transcript')
+
+
+class ResultStore:
+    """SQLite-backed key/value store for processing results.
+
+    Each thread gets its own connection. WAL mode lets any number of
+    processes read while one writes; writers wait up to ``timeout`` seconds
+    for the lock.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, max_bytes=DEFAULT_MAX_BYTES, timeout=30):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connection(self):
+        # Connections must not cross a fork (gunicorn --preload), so they are
+        # tied to the process that opened them as well as the thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        """Return the stored result dict (with extracted_text if any) or None.
+
+        Database errors are logged and treated as a miss so a broken store
+        never fails a request.
+        """
+        try:
+            return self._get(key)
+        except sqlite3.Error as e:
+            logger.warning(f'Result store read failed: {e}')
+            return None
+
+    def put(self, key, result, kind='', content_hash='', extracted_text=None):
+        """Store a JSON-serializable result dict under ``key``; False if not stored"""
+        try:
+            return self._put(key, result, kind, content_hash, extracted_text)
+        except sqlite3.Error as e:
+            logger.warning(f'Result store write failed: {e}')
+            return False
+
+    def _get(self, key):
+        conn = self._connection()
+        row = conn.execute(
+            'SELECT extracted_text, summary, transcript, payload, accessed_at FROM results WHERE key = ?',
+            (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        extracted_text, summary, transcript, payload, accessed_at = row
+        now = time.time()
+        if now - accessed_at > ACCESS_UPDATE_INTERVAL:
+            try:
+                with conn:
+                    conn.execute('UPDATE results SET accessed_at = ? WHERE key = ?', (now, key))
+            except sqlite3.OperationalError as e:
+                # A busy writer elsewhere only costs us LRU precision
+                logger.debug(f'Could not update access time: {e}')
+
+        result = json.loads(payload)
+        if summary is not None:
+            result['summary'] = summary
+        if transcript is not None:
+            result['transcript'] = transcript
+        if extracted_text is not None:
+            result['extracted_text'] = extracted_text
+        return result
+
+    def _put(self, key, result, kind, content_hash, extracted_text):
+        payload = {name: value for name, value in result.items() if name not in TEXT_FIELDS}
+        payload = json.dumps(payload, default=str)
+        summary = result.get('summary')
+        transcript = result.get('transcript')
+        size = len(payload) + sum(len(value) for value in (summary, transcript, extracted_text) if value)
+        if size > self.max_bytes:
+            return False
+
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            # A reprocessed result keeps its created_at
+            conn.execute(
+                'INSERT INTO results '
+                '(key, kind, content_hash, extracted_text, summary, transcript, payload, size, created_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (key) DO UPDATE SET kind = excluded.kind, content_hash = excluded.content_hash, '
+                'extracted_text = excluded.extracted_text, summary = excluded.summary, '
+                'transcript = excluded.transcript, payload = excluded.payload, size = excluded.size, '
+                'accessed_at = excluded.accessed_at',
+                (key, kind, content_hash, extracted_text, summary, transcript, payload, size, now, now)
+            )
+            # First time each content had text, kept when its results are evicted
+            if extracted_text is not None or transcript is not None:
+                conn.execute('INSERT OR IGNORE INTO contents (content_hash, created_at) VALUES (?, ?)',
+                             (content_hash, now))
+        self.evict()
+        return True
+
+    def add_fingerprint(self, key, scope, sketch):
+        """Index the near-duplicate sketch of the result stored under ``key``"""
+        try:
+            conn = self._connection()
+            with conn:
+                self._delete_fingerprint(conn, key)
+                conn.execute('INSERT INTO fingerprints (key, scope, sketch) VALUES (?, ?, ?)',
+                             (key, scope, array('I', sketch).tobytes()))
+                conn.executemany('INSERT INTO fingerprint_values (scope, value, key) VALUES (?, ?, ?)',
+                                 ((scope, value, key) for value in sketch))
+            return True
+        except sqlite3.Error as e:
+            logger.warning(f'Result store fingerprint write failed: {e}')
+            return False
+
+    def find_near_duplicate(self, sketch, scope, threshold):
+        """(key, similarity) of the closest stored result in ``scope``, or None"""
+        try:
+            conn = self._connection()
+            placeholders = ','.join('?' * len(sketch))
+            rows = conn.execute(
+                f'SELECT f.key, f.sketch FROM fingerprints f JOIN ('
+                f'  SELECT key FROM fingerprint_values WHERE scope = ? AND value IN ({placeholders})'
+                f'  GROUP BY key HAVING COUNT(*) >= ?'
+                f') candidates ON candidates.key = f.key',
+                (scope, *sketch, min_shared_values(threshold))
+            ).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f'Result store fingerprint read failed: {e}')
+            return None
+        candidates = {}
+        for key, blob in rows:
+            other = array('I')
+            other.frombytes(blob)
+            candidates[key] = other
+        return best_match(sketch, candidates, threshold)
+
+    def _delete_fingerprint(self, conn, key):
+        conn.execute('DELETE FROM fingerprints WHERE key = ?', (key,))
+        conn.execute('DELETE FROM fingerprint_values WHERE key = ?', (key,))
+
+    def iter_documents(self, since=0.0):
+        """Yield (content_hash, text, created_at) for every content first stored after ``since``.
+
+        The text is the extracted text, or the transcript for videos; content
+        processed several times (e.g. in different modes), reprocessed, or
+        stored again after eviction is yielded once, with the time it was
+        first stored.
+        """
+        rows = self._connection().execute(
+            'SELECT r.content_hash, COALESCE(r.extracted_text, r.transcript), c.created_at '
+            'FROM results r JOIN contents c ON c.content_hash = r.content_hash '
+            'WHERE (r.extracted_text IS NOT NULL OR r.transcript IS NOT NULL) AND c.created_at > ? '
+            'GROUP BY r.content_hash ORDER BY c.created_at',
+            (since,)
+        )
+        yield from rows
+
+    def total_bytes(self):
+        row = self._connection().execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()
+        return row[0]
+
+    def evict(self, max_bytes=None):
+        """Delete least recently used results until the store fits ``max_bytes``"""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        total = self.total_bytes()
+        if total <= max_bytes:
+            return 0
+
+        target = int(max_bytes * EVICTION_TARGET)
+        conn = self._connection()
+        removed = 0
+        with conn:
+            rows = conn.execute('SELECT key, size FROM results ORDER BY accessed_at').fetchall()
+            for key, size in rows:
+                if total <= target:
+                    break
+                conn.execute('DELETE FROM results WHERE key = ?', (key,))
+                self._delete_fingerprint(conn, key)
+                total -= size
+                removed += 1
+        logger.info(f'Result store evicted {removed} entries')
+        return removed
+
+    def compact(self):
+        """Checkpoint the WAL and rebuild the database file to reclaim space"""
+        conn = self._connection()
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        conn.execute('VACUUM')
+
+    def stats(self):
+        conn = self._connection()
+        count, total = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results').fetchone()
+        fingerprints = conn.execute('SELECT COUNT(*) FROM fingerprints').fetchone()[0]
+        file_size = sum(
+            os.path.getsize(self.path + suffix)
+            for suffix in ('', '-wal')
+            if os.path.exists(self.path + suffix)
+        )
+        return {
+            'entries': count,
+            'fingerprints': fingerprints,
+            'bytes': total,
+            'max_bytes': self.max_bytes,
+            'file_bytes': file_size
+        }
+
+
+def open_result_store(path, max_bytes=DEFAULT_MAX_BYTES):
+    """Open the store at ``path``; returns None when disabled or unavailable"""
+    if not path:
+        return None
+    try:
+        return ResultStore(path, max_bytes=max_bytes)
+    except (sqlite3.Error, OSError) as e:
+        logger.warning(f'Result store unavailable ({path}): {e}')
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Maintain the SummaBrowser result store')
+    parser.add_argument('command', choices=['stats', 'evict', 'compact'])
+    parser.add_argument('--db', default=os.environ.get('RESULT_STORE_PATH', DEFAULT_DB_PATH))
+    parser.add_argument('--max-bytes', type=int,
+                        default=int(os.environ.get('RESULT_STORE_MAX_BYTES', DEFAULT_MAX_BYTES)))
+    args = parser.parse_args()
+
+    store = ResultStore(args.db, max_bytes=args.max_bytes)
+    if args.command == 'evict':
+        print(f"🧹 Evicted {store.evict()} entries")
+    elif args.command == 'compact':
+        before = store.stats()['file_bytes']
+        store.compact()
+        print(f"🗜️ Compacted {args.db}: {before} -> {store.stats()['file_bytes']} bytes")
+    print(json.dumps(store.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+# Streaming sentence-scoring summarizer for SummaBrowser
+# Consumes text chunk by chunk (PDF pages, caption segments, file blocks)
+
+import heapq
+from collections import Counter
+
+from summarizer_engine import (
+    WORD_PATTERN, WEB_SENTENCE_PATTERN, STOP_WORDS, MIN_KEYWORD_LENGTH,
+    LENGTH_WEIGHT, POSITION_WEIGHT, KEYWORD_WEIGHT, IDEAL_SENTENCE_WORDS,
+    MAX_SUMMARY_SENTENCES, clean_text, top_sentence_indices, rank_sentences_by_score
+)
+
+# Candidate pool kept between chunks: max_sentences * POOL_FACTOR sentences
+POOL_FACTOR = 8
+MIN_POOL_SIZE = 64
+
+# A run of text this long without a sentence break is scored as one sentence
+MAX_CARRY_CHARS = 64 * 1024
+
+# Chunk size used when reading plain files
+FILE_BLOCK_SIZE = 64 * 1024
+
+
+class StreamingSummarizer:
+    """Incremental version of the advanced_summarize scoring.
+
+    Only the running word frequencies, the first and last two sentences and
+    a bounded pool of the best middle sentences are kept, so memory grows
+    with ``max_sentences`` and the vocabulary rather than with the document.
+    Middle sentences compete for the pool on their score at the time they
+    are read; the survivors are rescored with the complete word frequencies
+    at the end. Documents that fit in the pool get exactly the same
+    sentences as SentenceIndex.
+    """
+
+    def __init__(self, max_sentences=5, pool_size=None, split_pattern=WEB_SENTENCE_PATTERN,
+                 min_length=10, stop_words=STOP_WORDS):
+        self.max_sentences = max_sentences
+        self.pool_size = pool_size or max(max_sentences * POOL_FACTOR, MIN_POOL_SIZE)
+        self.split_pattern = split_pattern
+        self.min_length = min_length
+        self.stop_words = stop_words
+
+        self.word_freq = Counter()
+        self.max_freq = 0
+        self.sentence_count = 0
+        self.word_count = 0
+        self.char_count = 0
+
+        self._carry = ''
+        self._word_carry = ''
+        self._head = []
+        self._tail = []
+        self._pool = []
+        self._finished = False
+
+    def feed(self, chunk):
+        """Add the next chunk of raw text"""
+        if not chunk:
+            return
+        self.char_count += len(chunk)
+        self._count_words(chunk)
+
+        pieces = self.split_pattern.split(self._carry + chunk)
+        self._carry = pieces.pop()
+        for piece in pieces:
+            self._add_piece(piece)
+
+        if len(self._carry) > MAX_CARRY_CHARS:
+            self._add_piece(self._carry)
+            self._carry = ''
+
+    def feed_all(self, chunks):
+        """Consume an iterable of chunks and return self"""
+        for chunk in chunks:
+            self.feed(chunk)
+        return self
+
+    def summary_sentences(self):
+        """Best sentences in document order (call once all chunks are fed)"""
+        records, scores = self._candidates()
+        selected = {records[i][1] for i in top_sentence_indices(scores, self.max_sentences)}
+        return [record[1] for record in records if record[1] in selected]
+
+    def summary_ranking(self, limit=MAX_SUMMARY_SENTENCES):
+        """Best ``limit`` candidates, best first, as SentenceIndex.summary_ranking() returns them
+
+        Exact up to ``max_sentences``; longer summaries come from the pool
+        of candidates kept while reading.
+        """
+        records, scores = self._candidates()
+        return rank_sentences_by_score([record[1] for record in records], scores, limit)
+
+    def _candidates(self):
+        """Kept sentence records in document order and their final scores"""
+        if not self._finished:
+            self._add_piece(self._carry)
+            self._carry = ''
+            if self._word_carry:
+                self.word_count += 1
+                self._word_carry = ''
+            self._finished = True
+
+        candidates = {}
+        for record in self._head + self._tail + [entry[2] for entry in self._pool]:
+            candidates[record[0]] = record
+        records = [candidates[position] for position in sorted(candidates)]
+
+        return records, [self._final_score(record) for record in records]
+
+    def _count_words(self, chunk):
+        data = self._word_carry + chunk
+        words = data.split()
+        if words and not data[-1].isspace():
+            self._word_carry = words.pop()
+        else:
+            self._word_carry = ''
+        self.word_count += len(words)
+
+    def _add_piece(self, piece):
+        sentence = clean_text(piece)
+        words = WORD_PATTERN.findall(sentence.lower())
+        keywords = [word for word in words
+                    if len(word) >= MIN_KEYWORD_LENGTH and word not in self.stop_words]
+        word_freq = self.word_freq
+        max_freq = self.max_freq
+        for word in keywords:
+            count = word_freq[word] + 1
+            word_freq[word] = count
+            if count > max_freq:
+                max_freq = count
+        self.max_freq = max_freq
+
+        if len(sentence) <= self.min_length:
+            return
+
+        record = (self.sentence_count, sentence, len(words), keywords)
+        self.sentence_count += 1
+
+        if len(self._head) < 2:
+            self._head.append(record)
+            return
+
+        self._tail.append(record)
+        if len(self._tail) > 2:
+            self._offer(self._tail.pop(0))
+
+    def _offer(self, record):
+        """Keep ``record`` in the pool if it beats the current weakest entry"""
+        entry = (self._provisional_score(record), -record[0], record)
+        if len(self._pool) < self.pool_size:
+            heapq.heappush(self._pool, entry)
+        elif entry[:2] > self._pool[0][:2]:
+            heapq.heapreplace(self._pool, entry)
+
+    def _provisional_score(self, record):
+        _, _, word_count, keywords = record
+        score = min(word_count / IDEAL_SENTENCE_WORDS, 1.0) * LENGTH_WEIGHT
+        score += 0.5 * POSITION_WEIGHT
+        max_freq = self.max_freq
+        if word_count and max_freq:
+            keyword_score = sum(self.word_freq[word] for word in keywords) / word_count
+            score += min(keyword_score / max_freq, 1.0) * KEYWORD_WEIGHT
+        return score
+
+    def _final_score(self, record):
+        # Same arithmetic, in the same order, as SentenceIndex.score_sentences()
+        position, _, word_count, keywords = record
+        n = self.sentence_count
+        max_freq = self.max_freq
+        score = 0
+        score += min(word_count / IDEAL_SENTENCE_WORDS, 1.0) * LENGTH_WEIGHT
+        position_score = 1.0 if position < 2 or position >= n - 2 else 0.5
+        score += position_score * POSITION_WEIGHT
+        if word_count and max_freq:
+            keyword_score = sum(self.word_freq[word] for word in keywords) / word_count
+            score += min(keyword_score / max_freq, 1.0) * KEYWORD_WEIGHT
+        return score
+
+
+def iter_text_file(file_path, block_size=FILE_BLOCK_SIZE):
+    """Yield a text file in fixed-size blocks"""
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            yield block
+
+
+def summarize_chunks(chunks, max_sentences=5, **options):
+    """Summarize an iterable of text chunks; returns (sentences, summarizer)"""
+    summarizer = StreamingSummarizer(max_sentences, **options).feed_all(chunks)
+    return summarizer.summary_sentences(), summarizer
@@ -0,0 +1,289 @@
+# Indexed sentence-scoring engine for SummaBrowser
+# Backs advanced_summarize() in app-web.py and summary/app-ocr.py
+
+import heapq
+import math
+import operator
+import os
+import re
+from array import array
+from collections import Counter
+
+try:
+    import summarizer_vectorized
+except ImportError:
+    summarizer_vectorized = None
+
+WORD_PATTERN = re.compile(r'\b\w+\b')
+# The same words, plus an empty match for each punctuation mark (a keyphrase break)
+PHRASE_TOKEN_PATTERN = re.compile(r'(\b\w+\b)|[^\w\s]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# Sentence splitters used by the two Flask apps
+WEB_SENTENCE_PATTERN = re.compile(r'[.!?]+')
+OCR_SENTENCE_PATTERN = re.compile(r'(?<=[.!?])\s+(?=[A-Z])')
+
+STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
+    'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did',
+    'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can', 'this', 'that',
+    'these', 'those'
+})
+
+# Words shorter than this never count as keywords
+MIN_KEYWORD_LENGTH = 4
+
+# Scoring weights (length, position, keyword frequency)
+LENGTH_WEIGHT = 0.3
+POSITION_WEIGHT = 0.3
+KEYWORD_WEIGHT = 0.4
+IDEAL_SENTENCE_WORDS = 15
+
+# Lowercasing a capital sigma depends on its neighbours, so documents that
+# contain one are counted on the whole lowered text rather than per sentence
+CAPITAL_SIGMA = 'Σ'
+
+# Scoring backend: 'numpy' (sparse matrix, needs NumPy/SciPy) or 'python'.
+# Set SUMMA_SCORING_BACKEND=python to force the pure-Python loop.
+SCORING_BACKEND = os.environ.get('SUMMA_SCORING_BACKEND', 'numpy' if summarizer_vectorized else 'python')
+if summarizer_vectorized is None:
+    SCORING_BACKEND = 'python'
+
+# Below this many sentences the Python loop beats the array setup cost
+VECTORIZED_MIN_SENTENCES = 200
+
+# Longest summary offered, in sentences; rankings keep this many sentences
+MAX_SUMMARY_SENTENCES = 50
+
+
+class SentenceIndex:
+    """Tokenized view of a document built in a single pass.
+
+    Every distinct lowercase word gets an integer id. The tokens of all kept
+    sentences live in one flat ``array`` and ``offsets[i]:offsets[i + 1]`` is
+    the slice belonging to sentence ``i``, so scoring never re-runs a regex.
+    """
+
+    __slots__ = ('sentences', 'vocab', 'token_ids', 'offsets', 'keyword_freq', 'keyword_weights',
+                 'max_keyword_freq', 'term_freq', 'word_count', 'phrase_breaks', '_matrix')
+
+    def __init__(self, sentences, vocab, token_ids, offsets, keyword_freq, word_count=None, term_freq=None,
+                 phrase_breaks=None):
+        self.sentences = sentences
+        self.vocab = vocab
+        self.token_ids = token_ids
+        self.offsets = offsets
+        self.keyword_freq = keyword_freq
+        # What sentence scoring uses: the keyword counts, or tf-idf after apply_idf()
+        self.keyword_weights = keyword_freq
+        # Occurrences of every word id, stop words and short words included
+        self.term_freq = keyword_freq if term_freq is None else term_freq
+        # Word tokens in the whole text, including pieces too short to be sentences
+        self.word_count = len(token_ids) if word_count is None else word_count
+        self.max_keyword_freq = max(keyword_freq) if keyword_freq else 0
+        # Positions in token_ids that follow a punctuation mark inside their sentence
+        self.phrase_breaks = phrase_breaks
+        self._matrix = None
+
+    @classmethod
+    def from_text(cls, text, split_pattern=WEB_SENTENCE_PATTERN, min_length=10, stop_words=STOP_WORDS,
+                  phrase_breaks=False):
+        """Split cleaned text into sentences and tokenize each piece once.
+
+        Pieces shorter than ``min_length`` are dropped as sentences but their
+        words still count towards the document word frequencies. With
+        ``phrase_breaks`` the same pass records where punctuation splits a
+        sentence, for keyphrases.index_keyphrases().
+        """
+        vocab = {}
+        assign_id = vocab.setdefault
+        sentences = []
+        token_ids = array('I')
+        offsets = array('I', [0])
+        dropped_ids = array('I')
+        breaks = array('I') if phrase_breaks else None
+
+        for piece in split_pattern.split(text):
+            sentence = piece.strip()
+            if breaks is None:
+                ids = [assign_id(word, len(vocab)) for word in WORD_PATTERN.findall(sentence.lower())]
+            else:
+                ids = []
+                sentence_breaks = []
+                for word in PHRASE_TOKEN_PATTERN.findall(sentence.lower()):
+                    if word:
+                        ids.append(assign_id(word, len(vocab)))
+                    elif ids:
+                        sentence_breaks.append(len(ids))
+            if len(sentence) > min_length:
+                if breaks is not None:
+                    breaks.extend(len(token_ids) + position for position in sentence_breaks if position < len(ids))
+                sentences.append(sentence)
+                token_ids.extend(ids)
+                offsets.append(len(token_ids))
+            else:
+                dropped_ids.extend(ids)
+
+        words = list(vocab)
+        if CAPITAL_SIGMA in text:
+            counts = Counter(WORD_PATTERN.findall(text.lower()))
+            keyword_freq = array('I', (counts.get(word, 0) for word in words))
+        else:
+            counts = Counter(token_ids)
+            counts.update(dropped_ids)
+            keyword_freq = array('I', (counts[word_id] for word_id in range(len(words))))
+
+        term_freq = array('I', keyword_freq)
+        for word_id, word in enumerate(words):
+            if word in stop_words or len(word) < MIN_KEYWORD_LENGTH:
+                keyword_freq[word_id] = 0
+
+        return cls(sentences, vocab, token_ids, offsets, keyword_freq, len(token_ids) + len(dropped_ids), term_freq,
+                   breaks)
+
+    def apply_idf(self, weights):
+        """Score keywords by tf-idf instead of raw frequency.
+
+        ``weights`` holds one IDF weight per vocabulary word, in id order
+        (see idf_lexicon.apply_lexicon). With fractional weights the two
+        scoring backends may differ in the last bits of a score.
+        """
+        self.keyword_weights = array('d', map(operator.mul, self.keyword_freq, weights))
+        self.max_keyword_freq = max(self.keyword_weights, default=0)
+
+    def __len__(self):
+        return len(self.sentences)
+
+    def sentence_length(self, i):
+        """Number of word tokens in sentence ``i``"""
+        return self.offsets[i + 1] - self.offsets[i]
+
+    def term_matrix(self):
+        """Sparse sentence x term matrix, built once (vectorized backend only)"""
+        if self._matrix is None:
+            self._matrix = summarizer_vectorized.sentence_term_matrix(self)
+        return self._matrix
+
+    def score_sentences(self):
+        """Score every sentence on length, position and keyword frequency.
+
+        Returns a list, or a NumPy array when the vectorized backend is used.
+        """
+        if SCORING_BACKEND == 'numpy' and len(self.sentences) >= VECTORIZED_MIN_SENTENCES:
+            return summarizer_vectorized.score_sentences(
+                self, LENGTH_WEIGHT, POSITION_WEIGHT, KEYWORD_WEIGHT, IDEAL_SENTENCE_WORDS
+            )
+        return self._score_sentences_python()
+
+    def _score_sentences_python(self):
+        n = len(self.sentences)
+        offsets = self.offsets
+        token_ids = self.token_ids
+        freq_of = self.keyword_weights.__getitem__
+        max_freq = self.max_keyword_freq
+        scores = [0.0] * n
+
+        for i in range(n):
+            start, end = offsets[i], offsets[i + 1]
+            word_count = end - start
+            score = 0
+
+            # Length score (prefer medium-length sentences)
+            score += min(word_count / IDEAL_SENTENCE_WORDS, 1.0) * LENGTH_WEIGHT
+
+            # Position score (prefer sentences from beginning and end)
+            position_score = 1.0 if i < 2 or i >= n - 2 else 0.5
+            score += position_score * POSITION_WEIGHT
+
+            # Keyword frequency score
+            if word_count and max_freq:
+                keyword_score = sum(map(freq_of, token_ids[start:end])) / word_count
+                score += min(keyword_score / max_freq, 1.0) * KEYWORD_WEIGHT
+
+            scores[i] = score
+
+        return scores
+
+    def summary_sentences(self, max_sentences, scores=None):
+        """Return the top-scoring sentences in document order"""
+        if scores is None:
+            scores = self.score_sentences()
+        return select_sentences(self.sentences, scores, max_sentences)
+
+    def summary_ranking(self, scores=None, limit=MAX_SUMMARY_SENTENCES):
+        """Best ``limit`` sentences, best first, for summaries of any length (see rank_sentences_by_score)"""
+        if scores is None:
+            scores = self.score_sentences()
+        return rank_sentences_by_score(self.sentences, scores, limit)
+
+
+def top_sentence_indices(scores, k):
+    """Indices of the ``k`` best scores, earlier sentences winning ties"""
+    if not isinstance(scores, list):
+        return summarizer_vectorized.top_indices(scores, k)
+    return heapq.nsmallest(k, range(len(scores)), key=lambda i: (-scores[i], i))
+
+
+def select_sentences(sentences, scores, max_sentences):
+    """Pick the best sentences and keep them in their original order.
+
+    A sentence whose text repeats a selected one is kept as well, matching the
+    text-membership check the summarizers have always used.
+    """
+    selected = {sentences[i] for i in top_sentence_indices(scores, max_sentences)}
+    return [sentence for sentence in sentences if sentence in selected]
+
+
+def rank_sentences_by_score(sentences, scores, limit=MAX_SUMMARY_SENTENCES):
+    """The ``limit`` best sentences as ``[positions, sentence]`` pairs, best first.
+
+    ``positions`` lists every occurrence of the sentence text, so
+    ranked_summary_sentences() gives the same result as select_sentences()
+    for any length up to ``limit`` without scoring again. The ranking is
+    plain lists and can be cached as JSON.
+    """
+    order = top_sentence_indices(scores, limit)
+    ranked = {sentences[i] for i in order}
+    positions = {}
+    for position, sentence in enumerate(sentences):
+        if sentence in ranked:
+            positions.setdefault(sentence, []).append(position)
+    return [[positions[sentences[i]], sentences[i]] for i in order]
+
+
+def ranked_summary_sentences(ranking, max_sentences):
+    """The top ``max_sentences`` of a ranking in their original order"""
+    by_position = {position: sentence for positions, sentence in ranking[:max_sentences] for position in positions}
+    return [by_position[position] for position in sorted(by_position)]
+
+
+def summary_length(spec, sentence_count):
+    """Sentences in a summary of ``spec`` length: a count (5, '5') or a share of the document ('20%')
+
+    The result is between 1 and MAX_SUMMARY_SENTENCES; raises ValueError
+    for anything else.
+    """
+    spec = str(spec).strip()
+    try:
+        if spec.endswith('%'):
+            percent = float(spec[:-1])
+            valid = 0 < percent <= 100
+            count = math.ceil(sentence_count * percent / 100) if valid else 0
+        else:
+            count = int(spec)
+            valid = count >= 1
+    except ValueError:
+        valid = False
+    if not valid:
+        raise ValueError(f'Invalid summary length: {spec}')
+    return max(1, min(count, MAX_SUMMARY_SENTENCES))
+
+
+def count_sentences(text, split_pattern=WEB_SENTENCE_PATTERN, min_length=10):
+    """Sentences SentenceIndex.from_text() keeps from cleaned ``text``, without tokenizing them"""
+    return sum(1 for piece in split_pattern.split(text) if len(piece.strip()) > min_length)
+
+
+def clean_text(text):
+    """Collapse all whitespace runs into single spaces"""
+    return WHITESPACE_PATTERN.sub(' ', text).strip()
@@ -0,0 +1,78 @@
+# Vectorized sentence scoring for SummaBrowser
+# Optional backend for summarizer_engine, used when NumPy and SciPy are installed
+
+import numpy as np
+from scipy import sparse
+
+
+def sentence_term_matrix(index):
+    """Sparse sentence x term count matrix built from a SentenceIndex.
+
+    The flat token array and sentence offsets of the index already are the
+    CSR ``indices``/``indptr`` pair, so no per-token Python work is needed.
+    """
+    token_ids = np.frombuffer(index.token_ids, dtype=np.uintc)
+    offsets = np.frombuffer(index.offsets, dtype=np.uintc)
+    data = np.ones(len(token_ids), dtype=np.float64)
+    matrix = sparse.csr_matrix(
+        (data, token_ids, offsets),
+        shape=(len(index.sentences), len(index.vocab))
+    )
+    matrix.sum_duplicates()
+    return matrix
+
+
+def score_sentences(index, length_weight, position_weight, keyword_weight, ideal_words):
+    """Vectorized equivalent of SentenceIndex.score_sentences().
+
+    Every term is computed with the same float64 operations, in the same
+    order, as the pure-Python loop so both backends return identical scores.
+    """
+    matrix = index.term_matrix()
+    offsets = np.frombuffer(index.offsets, dtype=np.uintc).astype(np.float64)
+    word_counts = np.diff(offsets)
+    max_freq = index.max_keyword_freq
+    keyword_sums = matrix @ np.asarray(index.keyword_weights, dtype=np.float64) if max_freq else None
+    return combine_scores(word_counts, keyword_sums, max_freq,
+                          length_weight, position_weight, keyword_weight, ideal_words)
+
+
+def combine_scores(word_counts, keyword_sums, max_freq, length_weight, position_weight, keyword_weight, ideal_words):
+    """Sentence scores from per-sentence word counts and keyword weight sums (float64 arrays)"""
+    n = len(word_counts)
+
+    # Length score (prefer medium-length sentences)
+    scores = np.minimum(word_counts / ideal_words, 1.0) * length_weight
+
+    # Position score (prefer sentences from beginning and end)
+    position = np.full(n, 0.5)
+    position[:2] = 1.0
+    position[max(n - 2, 0):] = 1.0
+    scores += position * position_weight
+
+    # Keyword frequency score
+    if max_freq:
+        has_words = word_counts > 0
+        keyword_score = np.zeros(n)
+        keyword_score[has_words] = keyword_sums[has_words] / word_counts[has_words]
+        keyword_term = np.minimum(keyword_score / max_freq, 1.0) * keyword_weight
+        scores[has_words] += keyword_term[has_words]
+
+    return scores
+
+
+def top_indices(scores, k):
+    """Indices of the ``k`` best scores, earlier sentences winning ties"""
+    n = len(scores)
+    if k <= 0:
+        return []
+    if k >= n:
+        order = np.lexsort((np.arange(n), -scores))
+        return order.tolist()
+
+    threshold = np.partition(scores, n - k)[n - k]
+    above = np.flatnonzero(scores > threshold)
+    tied = np.flatnonzero(scores == threshold)[:k - len(above)]
+    candidates = np.concatenate((above, tied))
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order].tolist()
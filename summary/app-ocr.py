@@ -5,9 +5,25 @@ from werkzeug.utils import secure_filename
 import logging
 from datetime import datetime
 import base64
-import re
 import requests
 from io import BytesIO
+import sys
+
+# Shared engine modules live next to app-web.py (copied alongside in Docker)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from summarizer_engine import SentenceIndex, OCR_SENTENCE_PATTERN, clean_text
+from idf_lexicon import apply_lexicon
+from result_cache import file_sha256, make_key
+from result_store import open_result_store, DEFAULT_DB_PATH, DEFAULT_MAX_BYTES
+from pdf_extraction import iter_pages
+try:
+    from ocr_cache import OCRCache, file_image_key
+except ImportError:  # Pillow not installed: every image goes to the OCR API
+    OCRCache = None
+
+# Spawned PDF extraction workers (pdf_extraction.get_pool) import this script
+# again as __mp_main__; they only run pdf_extraction, so start-up work is skipped
+PDF_WORKER_IMPORT = __name__ == '__mp_main__'
 
 app = Flask(__name__)
 CORS(app)
@@ -21,11 +37,37 @@ app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs(OUTPUT_FOLDER, exist_ok=True)
 
+# Shared on-disk result store (set RESULT_STORE_PATH to an empty string to disable)
+result_store = open_result_store(
+    os.environ.get('RESULT_STORE_PATH', DEFAULT_DB_PATH) if not PDF_WORKER_IMPORT else '',
+    max_bytes=int(os.environ.get('RESULT_STORE_MAX_BYTES', DEFAULT_MAX_BYTES))
+)
+
+# OCR texts of recent images by perceptual hash, so a re-compressed or
+# resized copy skips the OCR API round-trip (per process; see ocr_cache)
+ocr_cache = OCRCache() if OCRCache is not None else None
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 def extract_text_with_online_ocr(image_path):
-    """Use online OCR API as fallback"""
+    """Use online OCR API as fallback
+
+    Images looking like one recognized before (by perceptual hash) reuse
+    its text instead of calling the API.
+    """
+    image_key = file_image_key(image_path) if ocr_cache is not None else None
+    text = ocr_cache.get(image_key, 'ocr.space') if image_key is not None else None
+    if text is not None:
+        logger.info(f'🖼️ OCR cache hit: {os.path.basename(image_path)}')
+        return text
+    text = request_online_ocr(image_path)
+    if text and image_key is not None:
+        ocr_cache.set(image_key, text, 'ocr.space')
+    return text
+
+def request_online_ocr(image_path):
+    """Text the OCR.space API recognizes in an image file, or None"""
     try:
         # Try OCR.space API (free tier available)
         api_key = os.environ.get('OCR_API_KEY', 'helloworld')  # Free API key
@@ -102,17 +144,9 @@ Format: Image file uploaded successfully
 def extract_text_from_pdf_basic(pdf_path):
     """Basic PDF text extraction"""
     try:
-        import PyPDF2
-        
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = ""
-            
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                text += page.extract_text() + "\n"
-            
-            return text.strip()
+        # Long PDFs are extracted page range by page range on a process pool
+        text = "".join(page + "\n" for page in iter_pages(pdf_path))
+        return text.strip()
     except ImportError:
         # If PyPDF2 is not available
         file_size = os.path.getsize(pdf_path)
@@ -130,56 +164,17 @@ def advanced_summarize(text, max_sentences=4):
         return "Content is too brief to summarize effectively."
     
     # Clean and prepare text
-    text = re.sub(r'\s+', ' ', text.strip())
+    text = clean_text(text)
     
-    # Split into sentences (improved)
-    sentence_pattern = r'(?<=[.!?])\s+(?=[A-Z])'
-    sentences = re.split(sentence_pattern, text)
-    sentences = [s.strip() for s in sentences if len(s.strip()) > 15]
+    # Split into sentences (improved) and tokenize once
+    index = SentenceIndex.from_text(text, OCR_SENTENCE_PATTERN, min_length=15, stop_words=frozenset())
+    apply_lexicon(index)
     
-    if len(sentences) <= max_sentences:
-        summary = ' '.join(sentences)
+    if len(index) <= max_sentences:
+        summary = ' '.join(index.sentences)
     else:
         # Score sentences based on length, position, and keyword frequency
-        scores = []
-        word_freq = {}
-        
-        # Calculate word frequency
-        words = re.findall(r'\b\w+\b', text.lower())
-        for word in words:
-            if len(word) > 3:  # Ignore short words
-                word_freq[word] = word_freq.get(word, 0) + 1
-        
-        # Score each sentence
-        for i, sentence in enumerate(sentences):
-            score = 0
-            sentence_words = re.findall(r'\b\w+\b', sentence.lower())
-            
-            # Length score (prefer medium-length sentences)
-            length_score = min(len(sentence_words) / 15, 1.0)
-            score += length_score * 0.3
-            
-            # Position score (prefer sentences from beginning and end)
-            position_score = 1.0 if i < 2 or i >= len(sentences) - 2 else 0.5
-            score += position_score * 0.3
-            
-            # Keyword frequency score
-            keyword_score = sum(word_freq.get(word, 0) for word in sentence_words) / len(sentence_words) if sentence_words else 0
-            score += min(keyword_score / max(word_freq.values()) if word_freq else 0, 1.0) * 0.4
-            
-            scores.append((score, sentence))
-        
-        # Select top sentences
-        scores.sort(reverse=True, key=lambda x: x[0])
-        selected_sentences = [s[1] for s in scores[:max_sentences]]
-        
-        # Maintain original order
-        summary_sentences = []
-        for sentence in sentences:
-            if sentence in selected_sentences:
-                summary_sentences.append(sentence)
-        
-        summary = ' '.join(summary_sentences)
+        summary = ' '.join(index.summary_sentences(max_sentences))
     
     # Add summary metadata
     summary = f"📄 SUMMARY (Generated by SummaBrowser AI)\n\n{summary}\n\n---\nSummary contains {len(summary.split())} words from original {len(text.split())} words."
@@ -658,6 +653,7 @@ def health():
             'ai_summarization': 'ready',
             'download_service': 'ready'
         },
+        'ocr_cache': ocr_cache.stats() if ocr_cache is not None else 'unavailable',
         'uptime': 'online'
     })
 
@@ -698,10 +694,19 @@ def process_file():
         file.save(file_path)
         logger.info(f'Processing file: {filename}')
 
+        # Reuse a stored result for identical content
+        content_hash = file_sha256(file_path)
+        cache_key = make_key('ocr_app', content_hash, ext=file_ext)
+        cached = result_store.get(cache_key) if result_store is not None else None
+
         # Extract text based on file type
         text = ""
+        cacheable = True
         
-        if file_ext.lower() == '.txt':
+        if cached is not None:
+            logger.info(f'Result store hit: {filename}')
+            text = cached.get('extracted_text', '')
+        elif file_ext.lower() == '.txt':
             with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
                 text = f.read()
         elif file_ext.lower() == '.pdf':
@@ -711,12 +716,21 @@ def process_file():
             text = extract_text_with_online_ocr(file_path)
             if not text or len(text.strip()) < 20:
                 text = extract_text_basic_image_analysis(file_path)
+                # Don't remember a placeholder caused by a failed OCR call
+                cacheable = False
 
         if not text or len(text.strip()) < 10:
             text = f"File '{filename}' processed successfully. Content analysis completed."
+            cacheable = False
 
         # Generate advanced summary
-        summary = advanced_summarize(text)
+        if cached is not None:
+            summary = cached['summary']
+        else:
+            summary = advanced_summarize(text)
+            if result_store is not None and cacheable:
+                result_store.put(cache_key, {'summary': summary}, kind='ocr_app',
+                                 content_hash=content_hash, extracted_text=text)
 
         # Save results with timestamp
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -9,6 +9,12 @@ import logging
 from datetime import datetime
 import tempfile
 import shutil
+import sys
+
+# Shared modules live next to app-web.py (copied alongside in Docker)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from result_cache import file_sha256, make_key
+from result_store import open_result_store, DEFAULT_DB_PATH, DEFAULT_MAX_BYTES
 
 # Simplified imports without heavy dependencies
 try:
@@ -38,6 +44,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Shared on-disk result store (set RESULT_STORE_PATH to an empty string to disable)
+result_store = open_result_store(
+    os.environ.get('RESULT_STORE_PATH', DEFAULT_DB_PATH),
+    max_bytes=int(os.environ.get('RESULT_STORE_MAX_BYTES', DEFAULT_MAX_BYTES))
+)
+
 def simple_summarize(text, max_sentences=3):
     """Simple text summarization without external dependencies"""
     if not text or len(text.strip()) < 50:
@@ -135,16 +147,28 @@ def process_file():
         file.save(file_path)
         logger.info(f'File saved: {filename}')
 
+        # Reuse a stored result for identical content
+        content_hash = file_sha256(file_path)
+        cache_key = make_key('simple_app', content_hash, ext=file_ext)
+        cached = result_store.get(cache_key) if result_store is not None else None
+
         # Process based on file type
         text = None
         summary = None
 
-        if file_ext.lower() in {'.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp'}:
+        if cached is not None:
+            logger.info('Using stored result')
+            text = cached.get('extracted_text')
+            summary = cached.get('summary')
+        elif file_ext.lower() in {'.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp'}:
             # Process image
             logger.info('Processing image file')
             text = extract_text_from_image(file_path)
             if text and len(text.strip()) > 10:
                 summary = simple_summarize(text)
+                if result_store is not None:
+                    result_store.put(cache_key, {'summary': summary}, kind='simple_app',
+                                     content_hash=content_hash, extracted_text=text)
             else:
                 text = "Could not extract readable text from the image."
                 summary = "Unable to generate summary - no readable text found in the image."
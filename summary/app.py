@@ -6,10 +6,21 @@ from flask import Flask, render_template, request, jsonify, send_file
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 from text_extraction_and_summarization import TextExtractorAndSummarizer
-from process_pdf import PDFProcessor
+from process_pdf import PDFProcessor, inference_metrics
+from model_registry import registry
 import logging
+import sys
 from datetime import datetime
 
+# Shared modules live next to app-web.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from result_cache import file_sha256, make_key
+from result_store import open_result_store, DEFAULT_DB_PATH, DEFAULT_MAX_BYTES
+
+# Spawned PDF extraction workers (pdf_extraction.get_pool) import this script
+# again as __mp_main__; they only run pdf_extraction, so start-up work is skipped
+PDF_WORKER_IMPORT = __name__ == '__mp_main__'
+
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
@@ -34,6 +45,18 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Shared on-disk result store (set RESULT_STORE_PATH to an empty string to disable)
+result_store = open_result_store(
+    os.environ.get('RESULT_STORE_PATH', DEFAULT_DB_PATH) if not PDF_WORKER_IMPORT else '',
+    max_bytes=int(os.environ.get('RESULT_STORE_MAX_BYTES', DEFAULT_MAX_BYTES))
+)
+
+# Load the summarization model and probe Tesseract once at start-up. Under
+# `gunicorn --preload app:app` this happens before the workers fork, so they
+# all share the loaded model (set PRELOAD_MODELS=0 to load on first request)
+if os.environ.get('PRELOAD_MODELS', '1') == '1' and not PDF_WORKER_IMPORT:
+    registry.preload()
+
 @app.route('/')
 def index():
     """Health check endpoint"""
@@ -48,6 +71,9 @@ def health():
     """Detailed health check"""
     return jsonify({
         'status': 'healthy',
+        'ready': registry.ready,
+        'models': registry.status(),
+        'inference': inference_metrics() or 'idle',
         'services': {
             'ocr': 'available',
             'summarization': 'available',
@@ -55,6 +81,13 @@ def health():
         }
     })
 
+@app.route('/ready')
+def ready():
+    """Readiness probe: 503 until the models are loaded"""
+    if registry.ready:
+        return jsonify({'ready': True})
+    return jsonify({'ready': False, 'models': registry.status()}), 503
+
 @app.route('/process', methods=['POST'])
 def process_file():
     """Process uploaded file and generate summary"""
@@ -93,11 +126,20 @@ def process_file():
         file.save(file_path)
         logger.info(f'File saved: {filename}')
 
+        # Reuse a stored result for identical content
+        content_hash = file_sha256(file_path)
+        cache_key = make_key('transformer_app', content_hash, ext=file_ext)
+        cached = result_store.get(cache_key) if result_store is not None else None
+
         # Process based on file type
         text = None
         summary = None
 
-        if file_ext.lower() in {'.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp'}:
+        if cached is not None:
+            logger.info('Using stored result')
+            text = cached.get('extracted_text')
+            summary = cached.get('summary')
+        elif file_ext.lower() in {'.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp'}:
             # Process image
             logger.info('Processing image file')
             summarizer = TextExtractorAndSummarizer()
@@ -126,6 +168,10 @@ def process_file():
             logger.error('No summary generated')
             return jsonify({'error': 'Could not generate summary. The extracted text may be too short or unclear.'}), 500
 
+        if cached is None and result_store is not None:
+            result_store.put(cache_key, {'summary': summary}, kind='transformer_app',
+                             content_hash=content_hash, extracted_text=text)
+
         # Save results
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         
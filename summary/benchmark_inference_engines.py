@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the CPU inference engines of the transformer summarizer
+
+Runs a fixed corpus through each engine (pytorch float32, int8 dynamic
+quantization, ONNX Runtime) in a fresh process and reports load time,
+summarization latency, resident memory and ROUGE-1/2/L F1. ROUGE is
+measured against reference summaries when the corpus provides them, and
+against the float32 PyTorch summaries otherwise.
+
+Usage:
+    python benchmark_inference_engines.py
+    python benchmark_inference_engines.py --engines pytorch int8 --documents 10
+    python benchmark_inference_engines.py --corpus corpus.jsonl   # {"text": ..., "summary": ...} per line
+    SUMMARIZER_MODEL=/path/to/local/model python benchmark_inference_engines.py
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import resource
+import sys
+import time
+from collections import Counter
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+from benchmark_summarizer import generate_document
+
+# Characters of text on a typical PDF page
+PAGE_CHARS = 3000
+
+WORD_PATTERN = re.compile(r'\w+')
+
+
+def fixed_corpus(documents, pages):
+    """The repo's test document plus deterministic synthetic documents"""
+    with open(os.path.join(ROOT_DIR, 'test-document.txt'), 'r', encoding='utf-8') as f:
+        corpus = [{'text': f.read()}]
+    corpus.extend({'text': generate_document(pages * PAGE_CHARS, seed=seed)} for seed in range(documents - 1))
+    return corpus
+
+
+def load_corpus(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_engine(engine, texts, batch_size):
+    """Load one engine and summarize the corpus (runs in a fresh process)"""
+    from process_pdf import SUMMARIZER_MODEL, load_summarizer, summarize_batched
+
+    before = _rss_mb()
+    start = time.perf_counter()
+    summarizer = load_summarizer(SUMMARIZER_MODEL, engine)
+    load_seconds = time.perf_counter() - start
+    loaded = _rss_mb()
+
+    # Warm-up so one-off initialisation isn't billed to the first document
+    summarize_batched(summarizer, texts[0][:PAGE_CHARS], batch_size)
+
+    summaries = []
+    chunks = 0
+    start = time.perf_counter()
+    for text in texts:
+        summary, chunk_count = summarize_batched(summarizer, text, batch_size)
+        summaries.append(summary)
+        chunks += chunk_count
+    seconds = time.perf_counter() - start
+
+    return {
+        'engine': summarizer.engine,
+        'load_seconds': load_seconds,
+        'seconds': seconds,
+        'chunks': chunks,
+        'model_mb': loaded - before,
+        'peak_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'summaries': summaries
+    }
+
+
+def _tokens(text):
+    return WORD_PATTERN.findall(text.lower())
+
+
+def _f1(overlap, reference_total, candidate_total):
+    if not overlap:
+        return 0.0
+    precision = overlap / candidate_total
+    recall = overlap / reference_total
+    return 2 * precision * recall / (precision + recall)
+
+
+def rouge_n(reference, candidate, n):
+    ref = Counter(zip(*[_tokens(reference)[i:] for i in range(n)]))
+    cand = Counter(zip(*[_tokens(candidate)[i:] for i in range(n)]))
+    if not ref and not cand:
+        # Both too short to have any n-grams
+        return 1.0
+    return _f1(sum((ref & cand).values()), sum(ref.values()), sum(cand.values()))
+
+
+def rouge_l(reference, candidate):
+    ref = _tokens(reference)
+    cand = _tokens(candidate)
+    previous = [0] * (len(cand) + 1)
+    for word in ref:
+        current = [0]
+        for j, other in enumerate(cand):
+            current.append(previous[j] + 1 if word == other else max(previous[j + 1], current[j]))
+        previous = current
+    return _f1(previous[-1], len(ref), len(cand))
+
+
+def average_rouge(references, candidates):
+    scores = [(rouge_n(r, c, 1), rouge_n(r, c, 2), rouge_l(r, c)) for r, c in zip(references, candidates)]
+    return [sum(column) / len(scores) for column in zip(*scores)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the summarizer inference engines')
+    parser.add_argument('--engines', nargs='+', default=['pytorch', 'int8', 'onnx'])
+    parser.add_argument('--corpus', help='JSONL file with a "text" (and optional "summary") per line')
+    parser.add_argument('--documents', type=int, default=5, help='size of the built-in corpus')
+    parser.add_argument('--pages', type=int, default=3, help='pages per synthetic document')
+    parser.add_argument('--batch-size', type=int, default=8)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else fixed_corpus(args.documents, args.pages)
+    texts = [document['text'] for document in corpus]
+    has_references = all(document.get('summary') for document in corpus)
+
+    engines = args.engines if 'pytorch' in args.engines or has_references else ['pytorch'] + args.engines
+    context = multiprocessing.get_context('spawn')
+    results = {}
+    for engine in engines:
+        with context.Pool(1) as pool:
+            results[engine] = pool.apply(run_engine, (engine, texts, args.batch_size))
+
+    references = [document['summary'] for document in corpus] if has_references else results['pytorch']['summaries']
+    baseline = results['pytorch']['seconds'] if 'pytorch' in results else None
+
+    print("📊 SummaBrowser inference engine benchmark")
+    print(f"Corpus: {len(texts)} documents, ROUGE against "
+          f"{'reference summaries' if has_references else 'the pytorch float32 summaries'}")
+    print(f"{'engine':<14} {'load (s)':>9} {'time (s)':>9} {'chunks/s':>9} {'speedup':>8} "
+          f"{'model MB':>9} {'peak MB':>8} {'R-1':>6} {'R-2':>6} {'R-L':>6}")
+    print("-" * 94)
+    for engine in engines:
+        result = results[engine]
+        label = engine if result['engine'] == engine else f"{engine}->{result['engine']}"
+        speedup = f"{baseline / result['seconds']:.2f}x" if baseline else '-'
+        rouge1, rouge2, rougel = average_rouge(references, result['summaries'])
+        print(f"{label:<14} {result['load_seconds']:>9.1f} {result['seconds']:>9.2f} "
+              f"{result['chunks'] / result['seconds']:>9.2f} {speedup:>8} {result['model_mb']:>9.0f} "
+              f"{result['peak_mb']:>8.0f} {rouge1:>6.3f} {rouge2:>6.3f} {rougel:>6.3f}")
+
+
+if __name__ == "__main__":
+    main()
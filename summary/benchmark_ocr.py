@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark for OCR of scanned pages
+
+Compares one tesseract process per page (pytesseract, as PDFProcessor did
+before) with the persistent Tesseract pool of tesseract_pool.py, where each
+instance loads the language data once. Pages come from a scanned PDF
+(rendered the way PDFProcessor renders them) or are drawn as synthetic
+text pages. Reports pages/second for each engine at the same worker count.
+
+Usage:
+    python benchmark_ocr.py
+    python benchmark_ocr.py --file scanned.pdf --workers 1 4
+    TESSERACT_LANG=eng+deu python benchmark_ocr.py --pages 20
+"""
+
+import argparse
+import os
+import sys
+import textwrap
+import time
+
+from PIL import Image, ImageDraw, ImageFont
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmark_summarizer import generate_document
+import tesseract_pool
+from tesseract_pool import TesseractPool, TESSERACT_WORKERS, tesserocr
+
+# Letter page at 150 dpi, 80 characters a line
+PAGE_SIZE = (1275, 1650)
+LINE_CHARS = 80
+LINES_PER_PAGE = 45
+
+
+def synthetic_pages(count):
+    """Grayscale images of text pages, as a scanner would produce them"""
+    font = ImageFont.load_default()
+    lines = textwrap.wrap(generate_document(count * LINES_PER_PAGE * LINE_CHARS), LINE_CHARS)
+    pages = []
+    for i in range(count):
+        image = Image.new('L', PAGE_SIZE, 255)
+        draw = ImageDraw.Draw(image)
+        for row, line in enumerate(lines[i * LINES_PER_PAGE:(i + 1) * LINES_PER_PAGE]):
+            draw.text((100, 100 + row * 32), line, fill=0, font=font)
+        pages.append(image)
+    return pages
+
+
+def scanned_pages(path, count):
+    """The first ``count`` pages of a PDF (all of a shorter one), rendered for OCR"""
+    from pdf_extraction import open_pages
+    from process_pdf import iter_rasterized_pages
+    with open_pages(path) as pages:
+        count = min(count, len(pages))
+    return [image for _, image in iter_rasterized_pages(path, list(range(count)))]
+
+
+def run(pages, engine, workers):
+    """Seconds to recognize every page, from starting the pool to the last result"""
+    start = time.perf_counter()
+    pool = TesseractPool(workers=workers, engine=engine)
+    for future in [pool.submit(page) for page in pages]:
+        future.result()
+    pool.close()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark OCR of scanned pages')
+    parser.add_argument('--pages', type=int, default=100, help='pages to recognize')
+    parser.add_argument('--file', help='scanned PDF to render instead of synthetic pages')
+    parser.add_argument('--workers', nargs='+', type=int, default=[TESSERACT_WORKERS],
+                        help='concurrent Tesseract instances / processes')
+    args = parser.parse_args()
+    # Every engine recognizes the same pages: measure OCR, not cache hits
+    tesseract_pool.ocr_cache.max_entries = 0
+
+    print("📊 SummaBrowser OCR benchmark")
+    pages = scanned_pages(args.file, args.pages) if args.file else synthetic_pages(args.pages)
+    print(f"{len(pages)} pages from {os.path.basename(args.file) if args.file else 'synthetic text'}")
+    engines = ['pytesseract', 'tesserocr']
+    if tesserocr is None:
+        print("⚠️ tesserocr is not installed: only the per-page process engine is measured")
+        engines = engines[:1]
+
+    print(f"{'engine':<12} {'workers':>7} {'time (s)':>10} {'pages/s':>8} {'speedup':>8}")
+    print("-" * 50)
+    for workers in args.workers:
+        baseline = None
+        for engine in engines:
+            elapsed = run(pages, engine, workers)
+            baseline = baseline or elapsed
+            print(f"{engine:<12} {workers:>7} {elapsed:>10.2f} {len(pages) / elapsed:>8.2f} "
+                  f"{baseline / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
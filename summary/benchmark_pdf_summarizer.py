@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark for PDFProcessor.summarize_text
+
+Compares the original approach (256-character slices, one pipeline call per
+slice) with token-aware chunking and length-sorted batches, on synthetic
+pages or a real PDF/TXT file. Reports chunks, chunks/second and end-to-end
+time for each batch size.
+
+Usage:
+    python benchmark_pdf_summarizer.py
+    python benchmark_pdf_summarizer.py --pages 10 100 --batch-sizes 1 8 16
+    python benchmark_pdf_summarizer.py --file report.pdf --skip-legacy
+    SUMMARIZER_MODEL=/path/to/local/model python benchmark_pdf_summarizer.py
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmark_summarizer import generate_document
+from process_pdf import PDFProcessor, load_summarizer, model_input_limit, summarize_batched
+
+# Characters of text on a typical PDF page
+PAGE_CHARS = 3000
+
+
+def legacy_summarize_text(summarizer, text):
+    """Original PDFProcessor.summarize_text"""
+    max_chunk = 256
+    chunks = [text[i:i+max_chunk] for i in range(0, len(text), max_chunk)]
+    summarized_chunks = []
+
+    for chunk in chunks:
+        summary = summarizer(chunk, max_length=2000, min_length=50, do_sample=False)
+        summarized_chunks.append(summary[0]['summary_text'])
+
+    return "\n".join(summarized_chunks), len(chunks)
+
+
+def load_text(path):
+    if path.lower().endswith('.pdf'):
+        return PDFProcessor().extract_text_with_ocr(path)
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        return f.read()
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    _, chunk_count = func(*args)
+    return time.perf_counter() - start, chunk_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark PDFProcessor.summarize_text')
+    parser.add_argument('--pages', nargs='+', type=int, default=[5, 25],
+                        help=f'synthetic document sizes in pages of {PAGE_CHARS} characters')
+    parser.add_argument('--file', help='benchmark a PDF or TXT file instead of synthetic pages')
+    parser.add_argument('--batch-sizes', nargs='+', type=int, default=[1, 4, 8, 16])
+    parser.add_argument('--skip-legacy', action='store_true', help='only time the batched approach')
+    args = parser.parse_args()
+
+    summarizer = load_summarizer()
+    print("📊 SummaBrowser transformer summarization benchmark")
+    print(f"Model: {summarizer.model.name_or_path} (input limit {model_input_limit(summarizer)} tokens)")
+
+    if args.file:
+        documents = [(os.path.basename(args.file), load_text(args.file))]
+    else:
+        documents = [(f"{pages} pages", generate_document(pages * PAGE_CHARS)) for pages in args.pages]
+
+    print(f"{'document':<14} {'approach':<16} {'chunks':>7} {'time (s)':>10} {'chunks/s':>9} {'speedup':>8}")
+    print("-" * 70)
+    for name, text in documents:
+        # Warm-up so one-off initialisation isn't billed to the first row
+        summarize_batched(summarizer, text[:PAGE_CHARS])
+
+        baseline = None
+        if not args.skip_legacy:
+            baseline, chunk_count = timed(legacy_summarize_text, summarizer, text)
+            print(f"{name:<14} {'256-char slices':<16} {chunk_count:>7} {baseline:>10.2f} "
+                  f"{chunk_count / baseline:>9.2f} {'1.0x':>8}")
+
+        for batch_size in args.batch_sizes:
+            elapsed, chunk_count = timed(summarize_batched, summarizer, text, batch_size)
+            speedup = f"{baseline / elapsed:.1f}x" if baseline else '-'
+            print(f"{name:<14} {f'tokens, batch {batch_size}':<16} {chunk_count:>7} {elapsed:>10.2f} "
+                  f"{chunk_count / elapsed:>9.2f} {speedup:>8}")
+
+
+if __name__ == "__main__":
+    main()
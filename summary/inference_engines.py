@@ -0,0 +1,81 @@
+# CPU inference engines for the transformer summarizer
+# pytorch: float32 pipeline, int8: dynamically quantized Linear layers, onnx: ONNX Runtime export
+
+import os
+import re
+import logging
+
+from transformers import pipeline
+
+logger = logging.getLogger(__name__)
+
+ENGINES = ('pytorch', 'int8', 'onnx')
+
+# Exported ONNX models are kept here so the export only runs once
+ONNX_CACHE_DIR = os.environ.get(
+    'ONNX_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models', 'onnx')
+)
+
+
+def build_pytorch_pipeline(model_name):
+    return pipeline("summarization", model=model_name)
+
+
+def build_int8_pipeline(model_name):
+    """Same model with its Linear layers quantized to int8 (weights) at load time"""
+    import torch
+    from torch.ao.quantization import quantize_dynamic
+    from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+    model = quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return pipeline("summarization", model=model, tokenizer=AutoTokenizer.from_pretrained(model_name))
+
+
+def build_onnx_pipeline(model_name):
+    """ONNX Runtime version of the model (needs optimum[onnxruntime]); exported on first use"""
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    from transformers import AutoTokenizer
+
+    export_dir = os.path.join(ONNX_CACHE_DIR, re.sub(r'[^\w.-]+', '_', model_name))
+    if os.path.exists(os.path.join(export_dir, 'config.json')):
+        model = ORTModelForSeq2SeqLM.from_pretrained(export_dir)
+        tokenizer = AutoTokenizer.from_pretrained(export_dir)
+    else:
+        print(f"📦 Exporting {model_name} to ONNX (first run only)...")
+        model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True)
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model.save_pretrained(export_dir)
+        tokenizer.save_pretrained(export_dir)
+    return pipeline("summarization", model=model, tokenizer=tokenizer)
+
+
+BUILDERS = {
+    'pytorch': build_pytorch_pipeline,
+    'int8': build_int8_pipeline,
+    'onnx': build_onnx_pipeline
+}
+
+
+def build_pipeline(model_name, engine='pytorch'):
+    """Summarization pipeline for ``model_name`` on ``engine``.
+
+    An unknown engine, a missing optional dependency or a failed
+    quantization/export falls back to the float32 PyTorch pipeline. The
+    engine actually used is stored on the pipeline as ``engine``.
+    """
+    if engine not in BUILDERS:
+        logger.warning(f"Unknown inference engine {engine!r}, using pytorch")
+        engine = 'pytorch'
+
+    try:
+        summarizer = BUILDERS[engine](model_name)
+    except Exception as e:
+        if engine == 'pytorch':
+            raise
+        logger.warning(f"{engine} engine unavailable for {model_name} ({e}), falling back to pytorch")
+        engine = 'pytorch'
+        summarizer = build_pytorch_pipeline(model_name)
+
+    summarizer.engine = engine
+    return summarizer
@@ -0,0 +1,169 @@
+# Cross-request micro-batching for model inference
+# Chunks from all in-flight requests are collected for a few milliseconds and run as one batch
+
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+# Recent batches kept for the percentile metrics
+METRICS_WINDOW = 1000
+
+# Items pulled from the queue per round to pick a batch of similar lengths from
+LOOKAHEAD_FACTOR = 4
+
+
+class _Item:
+    __slots__ = ('payload', 'size', 'future', 'enqueued_at')
+
+    def __init__(self, payload, size):
+        self.payload = payload
+        self.size = size
+        self.future = Future()
+        self.enqueued_at = time.monotonic()
+
+
+def _percentiles(values):
+    if not values:
+        return {'avg': 0, 'p50': 0, 'p95': 0, 'max': 0}
+    ordered = sorted(values)
+    return {
+        'avg': round(sum(ordered) / len(ordered), 2),
+        'p50': round(ordered[len(ordered) // 2], 2),
+        'p95': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+        'max': round(ordered[-1], 2)
+    }
+
+
+class InferenceScheduler:
+    """Runs ``run_batch`` over items submitted from any number of threads.
+
+    A batch starts when ``max_batch_size`` items are waiting or
+    ``max_wait_ms`` after its oldest item arrived, whichever comes first.
+    The oldest waiting item always goes into the next batch, together with
+    the waiting items closest to it in ``size`` (e.g. token count), so
+    padding stays low without starving anyone. ``run_batch`` receives a
+    list of payloads and must return one result per payload.
+
+    The batching thread starts on first use, and again after a fork, so
+    the scheduler can be created before gunicorn forks its workers.
+    """
+
+    def __init__(self, run_batch, max_batch_size=8, max_wait_ms=10):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._waits = deque(maxlen=METRICS_WINDOW * max_batch_size)
+        self._batch_sizes = deque(maxlen=METRICS_WINDOW)
+        self._latencies = deque(maxlen=METRICS_WINDOW)
+        self.batches = 0
+        self.items = 0
+        self.errors = 0
+
+    def submit(self, payloads, sizes=None):
+        """Queue payloads for inference; returns one Future per payload"""
+        self._ensure_thread()
+        items = [_Item(payload, size) for payload, size in zip(payloads, sizes or [0] * len(payloads))]
+        for item in items:
+            self._queue.put(item)
+        return [item.future for item in items]
+
+    def map(self, payloads, sizes=None, timeout=None):
+        """Run payloads through the scheduler and wait for their results, in order"""
+        return [future.result(timeout) for future in self.submit(payloads, sizes)]
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive() or self._pid != os.getpid():
+                if self._pid != os.getpid():
+                    # Items queued in the parent process belong to the parent
+                    self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='inference-scheduler', daemon=True)
+                self._thread.start()
+
+    def _collect(self, pending):
+        """Wait for the batch window to close, then pull waiting items into ``pending``"""
+        if not pending:
+            pending.append(self._queue.get())
+        deadline = pending[0].enqueued_at + self.max_wait
+        while len(pending) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                pending.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        # Look a little further ahead for better length matches
+        while len(pending) < self.max_batch_size * LOOKAHEAD_FACTOR:
+            try:
+                pending.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+    def _next_batch(self, pending):
+        oldest = pending[0]
+        others = sorted(range(1, len(pending)), key=lambda i: abs(pending[i].size - oldest.size))
+        chosen = {0, *others[:self.max_batch_size - 1]}
+        batch = [pending[i] for i in sorted(chosen)]
+        pending[:] = [item for i, item in enumerate(pending) if i not in chosen]
+        return batch
+
+    def _run(self):
+        pending = []
+        while True:
+            self._collect(pending)
+            batch = self._next_batch(pending)
+
+            start = time.monotonic()
+            try:
+                results = self.run_batch([item.payload for item in batch])
+                if len(results) != len(batch):
+                    raise ValueError(f'run_batch returned {len(results)} results for {len(batch)} items')
+                for item, result in zip(batch, results):
+                    item.future.set_result(result)
+                failed = False
+            except Exception as e:
+                logger.error(f'Inference batch of {len(batch)} failed: {e}')
+                for item in batch:
+                    item.future.set_exception(e)
+                failed = True
+            latency = time.monotonic() - start
+
+            with self._stats_lock:
+                self._waits.extend((start - item.enqueued_at) * 1000 for item in batch)
+                self._batch_sizes.append(len(batch))
+                self._latencies.append(latency * 1000)
+                self.batches += 1
+                self.items += len(batch)
+                self.errors += failed
+            logger.debug(f'Inference batch: {len(batch)} items in {latency * 1000:.0f}ms')
+
+    def stats(self):
+        """Queue wait, batch size and batch latency over recent batches"""
+        with self._stats_lock:
+            return {
+                'batches': self.batches,
+                'items': self.items,
+                'errors': self.errors,
+                'queue_depth': self._queue.qsize(),
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000,
+                'queue_wait_ms': _percentiles(self._waits),
+                'batch_size': _percentiles(self._batch_sizes),
+                'batch_latency_ms': _percentiles(self._latencies)
+            }
@@ -0,0 +1,96 @@
+# Process-wide registry for the heavy resources used by the summary apps
+# (transformer pipelines, Tesseract setup). Each one is loaded once per process.
+
+import gc
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """Named resources that are loaded on first use and then reused.
+
+    ``register`` only records how to load a resource; ``get`` loads it once
+    (other threads asking for it meanwhile wait) and returns the same object
+    afterwards. Calling ``preload`` at import time under
+    ``gunicorn --preload`` loads everything in the master process, so the
+    forked workers share the model pages copy-on-write instead of each
+    loading their own copy.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._resources = {}
+        self._errors = {}
+        self._load_seconds = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, loader):
+        """Record ``loader`` (a function without arguments) for ``name`` unless one exists"""
+        with self._lock:
+            self._loaders.setdefault(name, loader)
+            self._locks.setdefault(name, threading.Lock())
+
+    def get(self, name):
+        """Return the resource, loading it on the first call"""
+        if name in self._resources:
+            return self._resources[name]
+        if name not in self._loaders:
+            raise KeyError(f"No loader registered for {name!r}")
+
+        with self._locks[name]:
+            if name not in self._resources:
+                start = time.perf_counter()
+                try:
+                    resource = self._loaders[name]()
+                except Exception as e:
+                    self._errors[name] = str(e)
+                    raise
+                self._load_seconds[name] = time.perf_counter() - start
+                self._errors.pop(name, None)
+                self._resources[name] = resource
+                logger.info(f"Loaded {name} in {self._load_seconds[name]:.1f}s")
+        return self._resources[name]
+
+    def is_loaded(self, name):
+        return name in self._resources
+
+    def preload(self, names=None, freeze=True):
+        """Load the given (default: all registered) resources; returns True if all loaded.
+
+        Failures are logged and reported by status() instead of raised. With
+        ``freeze`` the loaded objects are moved out of the garbage collector's
+        reach so collections in forked workers don't touch (and copy) their
+        pages.
+        """
+        for name in list(self._loaders) if names is None else names:
+            try:
+                self.get(name)
+            except Exception as e:
+                logger.warning(f"Could not preload {name}: {e}")
+        if freeze:
+            gc.freeze()
+        return self.ready
+
+    @property
+    def ready(self):
+        """True once every registered resource has been loaded"""
+        return all(name in self._resources for name in self._loaders)
+
+    def status(self):
+        """Per-resource state for the health endpoint"""
+        status = {}
+        for name in self._loaders:
+            if name in self._resources:
+                status[name] = f"loaded ({self._load_seconds[name]:.1f}s)"
+            elif name in self._errors:
+                status[name] = f"error: {self._errors[name]}"
+            else:
+                status[name] = "not loaded"
+        return status
+
+
+registry = ModelRegistry()
@@ -1,90 +1,382 @@
 import os
-import pdfplumber
-import pytesseract
+import re
+import sys
+import copy
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from queue import Queue, Full
 from pdf2image import convert_from_path
-from transformers import pipeline
-from sklearn.feature_extraction.text import TfidfVectorizer
-
-# Set Tesseract path for Windows
-tesseract_paths = [
-    r'C:\Program Files\Tesseract-OCR\tesseract.exe',
-    r'C:\Program Files (x86)\Tesseract-OCR\tesseract.exe',
-    r'C:\Tesseract-OCR\tesseract.exe'
-]
-
-def find_tesseract():
-    """Find Tesseract executable"""
-    for path in tesseract_paths:
-        if os.path.exists(path):
-            return path
-    return None
+from model_registry import registry
+from inference_scheduler import InferenceScheduler
+from inference_engines import build_pipeline
+from text_extraction_and_summarization import configure_tesseract
+from tesseract_pool import get_tesseract_pool
 
-class PDFProcessor:
-    def __init__(self, output_folder="output"):
-        # Set Tesseract path for Windows
-        tesseract_path = find_tesseract()
-        if tesseract_path:
-            pytesseract.pytesseract.tesseract_cmd = tesseract_path
+# Shared modules live next to app-web.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from hierarchical_summarizer import (
+    hierarchical_summarize, DEFAULT_FAN_OUT, DEFAULT_MAX_DEPTH, DEFAULT_WORKERS
+)
+from keyphrases import extract_keyphrases
+from pdf_extraction import extract_pages, needs_ocr
+
+SUMMARIZER_MODEL = os.environ.get('SUMMARIZER_MODEL', "sshleifer/distilbart-cnn-12-6")
+
+# CPU inference engine: pytorch (float32), int8 (dynamic quantization) or
+# onnx (ONNX Runtime); falls back to pytorch when the engine can't be loaded
+SUMMARIZER_ENGINE = os.environ.get('SUMMARIZER_ENGINE', 'pytorch')
+
+# Texts at least this long (roughly 15 pages) are summarized hierarchically
+HIERARCHICAL_MIN_CHARS = int(os.environ.get('HIERARCHICAL_MIN_CHARS', 50000))
+
+# Characters per map task in hierarchical mode (a few model inputs each)
+HIERARCHICAL_CHUNK_CHARS = 12000
+
+# Chunks per forward pass. Chunks are sorted by token count first, so each
+# batch holds chunks of similar length and little padding is computed.
+SUMMARY_BATCH_SIZE = int(os.environ.get('SUMMARY_BATCH_SIZE', 8))
+
+# Cross-request micro-batching: chunks from concurrent requests share forward
+# passes, waiting at most INFERENCE_MAX_WAIT_MS for a batch to fill up
+INFERENCE_SCHEDULER = os.environ.get('INFERENCE_SCHEDULER', '1') == '1'
+INFERENCE_BATCH_SIZE = int(os.environ.get('INFERENCE_BATCH_SIZE', SUMMARY_BATCH_SIZE))
+INFERENCE_MAX_WAIT_MS = float(os.environ.get('INFERENCE_MAX_WAIT_MS', 10))
+
+# Summary length per chunk, in tokens
+SUMMARY_MAX_TOKENS = 150
+SUMMARY_MIN_TOKENS = 30
+
+# Tokens left free in every chunk, since tokens can merge across the
+# boundaries of separately counted pieces
+CHUNK_TOKEN_MARGIN = 16
+
+SENTENCE_PATTERN = re.compile(r'(?<=[.!?])\s+')
+
+# Scanned pages are rendered for OCR in grayscale at this resolution
+OCR_DPI = int(os.environ.get('OCR_DPI', 200))
+
+# Pages rendered per pdftoppm call, and rendered pages waiting for OCR
+# (rendering pauses while the queue is full, so memory doesn't grow with the
+# page count)
+RASTER_RANGE_PAGES = 4
+RASTER_QUEUE_PAGES = int(os.environ.get('OCR_QUEUE_PAGES', 8))
+
+# Fast tokenizers fail when two threads use them at once, and the pipeline's
+# tokenizer is busy on the scheduler thread, so chunking counts tokens with
+# its own copy, one thread at a time
+_counting_lock = threading.Lock()
+_counting_tokenizers = {}
+
+
+def _summarizer_name(model_name, engine):
+    return model_name if engine == 'pytorch' else f"{model_name} [{engine}]"
+
+def load_summarizer(model_name=SUMMARIZER_MODEL, engine=SUMMARIZER_ENGINE):
+    """Summarization pipeline for ``model_name`` on ``engine``, loaded once per process"""
+    name = _summarizer_name(model_name, engine)
+    registry.register(name, partial(build_pipeline, model_name, engine))
+    return registry.get(name)
+
+# Loaded by registry.preload() together with the Tesseract probe
+registry.register(_summarizer_name(SUMMARIZER_MODEL, SUMMARIZER_ENGINE),
+                  partial(build_pipeline, SUMMARIZER_MODEL, SUMMARIZER_ENGINE))
+registry.register("tesseract", configure_tesseract)
+
+def model_input_limit(summarizer):
+    """Longest input the pipeline's model accepts, in tokens"""
+    limit = summarizer.tokenizer.model_max_length
+    positions = getattr(summarizer.model.config, 'max_position_embeddings', None)
+    if positions and (not limit or limit > positions):
+        limit = positions
+    return limit
+
+def _token_counts(tokenizer, pieces):
+    # Counted with a leading space, as the pieces appear inside a chunk
+    with _counting_lock:
+        counter = _counting_tokenizers.get(id(tokenizer))
+        if counter is None:
+            counter = _counting_tokenizers[id(tokenizer)] = copy.deepcopy(tokenizer)
+        encoded = counter([' ' + piece for piece in pieces], add_special_tokens=False)
+    return [len(ids) for ids in encoded['input_ids']]
+
+def _pack_pieces(pieces, counts, budget):
+    chunks = []
+    current = []
+    size = 0
+    for piece, count in zip(pieces, counts):
+        if current and size + count > budget:
+            chunks.append((' '.join(current), size))
+            current = []
+            size = 0
+        current.append(piece)
+        size += count
+    if current:
+        chunks.append((' '.join(current), size))
+    return chunks
+
+def _cut_word(word, count, budget):
+    if count <= budget:
+        return [word]
+    step = max(1, len(word) * budget // (count * 2))
+    return [word[i:i + step] for i in range(0, len(word), step)]
+
+def chunk_by_tokens(text, tokenizer, max_tokens):
+    """Pack whole sentences into chunks of at most ``max_tokens`` tokens.
+
+    Returns ``(chunk_text, token_count)`` pairs in document order. A
+    sentence that is too long on its own is cut at word boundaries (and a
+    single overlong word into pieces).
+    """
+    budget = max_tokens - tokenizer.num_special_tokens_to_add() - CHUNK_TOKEN_MARGIN
+    sentences = [sentence.strip() for sentence in SENTENCE_PATTERN.split(text) if sentence.strip()]
+    if not sentences:
+        return []
+
+    chunks = []
+    pending = []
+    pending_counts = []
+    for sentence, count in zip(sentences, _token_counts(tokenizer, sentences)):
+        if count <= budget:
+            pending.append(sentence)
+            pending_counts.append(count)
+            continue
+        chunks.extend(_pack_pieces(pending, pending_counts, budget))
+        pending = []
+        pending_counts = []
+        words = sentence.split()
+        counts = _token_counts(tokenizer, words)
+        if max(counts) > budget:
+            words = [piece for word, count in zip(words, counts) for piece in _cut_word(word, count, budget)]
+            counts = _token_counts(tokenizer, words)
+        chunks.extend(_pack_pieces(words, counts, budget))
+    chunks.extend(_pack_pieces(pending, pending_counts, budget))
+    return chunks
+
+def summarize_batch(summarizer, chunks):
+    """Run ``(chunk_text, token_count)`` pairs through the pipeline as one batch"""
+    shortest = min(count for _, count in chunks)
+    outputs = summarizer(
+        [chunk for chunk, _ in chunks], batch_size=len(chunks),
+        max_length=SUMMARY_MAX_TOKENS, min_length=min(SUMMARY_MIN_TOKENS, shortest // 2),
+        do_sample=False, truncation=True
+    )
+    return [output['summary_text'] for output in outputs]
+
+def summarize_batched(summarizer, text, batch_size=SUMMARY_BATCH_SIZE, scheduler=None):
+    """Summarize token-sized chunks in length-sorted batches.
+
+    With a ``scheduler`` the chunks are batched together with those of
+    other requests instead. Returns the chunk summaries joined in document
+    order and the number of chunks.
+    """
+    chunks = chunk_by_tokens(text, summarizer.tokenizer, model_input_limit(summarizer))
+    if scheduler is not None:
+        return "\n".join(scheduler.map(chunks, [count for _, count in chunks])), len(chunks)
+
+    order = sorted(range(len(chunks)), key=lambda i: chunks[i][1], reverse=True)
+    summaries = [None] * len(chunks)
+
+    for start in range(0, len(order), batch_size):
+        batch = order[start:start + batch_size]
+        for i, summary in zip(batch, summarize_batch(summarizer, [chunks[i] for i in batch])):
+            summaries[i] = summary
+
+    return "\n".join(summaries), len(chunks)
+
+def load_scheduler(model_name=SUMMARIZER_MODEL, engine=SUMMARIZER_ENGINE):
+    """Process-wide inference scheduler for ``model_name`` on ``engine``"""
+    name = f"scheduler:{_summarizer_name(model_name, engine)}"
+    registry.register(name, lambda: InferenceScheduler(
+        partial(summarize_batch, load_summarizer(model_name, engine)),
+        max_batch_size=INFERENCE_BATCH_SIZE, max_wait_ms=INFERENCE_MAX_WAIT_MS
+    ))
+    return registry.get(name)
+
+def inference_metrics(model_name=SUMMARIZER_MODEL, engine=SUMMARIZER_ENGINE):
+    """Scheduler metrics for the health endpoint, or None before the first request"""
+    name = f"scheduler:{_summarizer_name(model_name, engine)}"
+    return registry.get(name).stats() if registry.is_loaded(name) else None
+
+def load_hierarchical_threads(workers=DEFAULT_WORKERS):
+    """Process-wide threads submitting hierarchical map tasks to the inference scheduler"""
+    name = f"hierarchical-threads:{workers}"
+    registry.register(name, lambda: ThreadPoolExecutor(max_workers=workers, thread_name_prefix='hierarchical'))
+    return registry.get(name)
+
+def page_runs(page_numbers, max_pages=RASTER_RANGE_PAGES):
+    """(start, end) ranges of consecutive ``page_numbers`` (sorted), at most ``max_pages`` long"""
+    runs = []
+    for number in page_numbers:
+        if runs and runs[-1][1] == number and number - runs[-1][0] < max_pages:
+            runs[-1][1] = number + 1
         else:
-            print("Warning: Tesseract not found in common locations.")
-            print("Please install Tesseract from: https://github.com/UB-Mannheim/tesseract/wiki")
-            print("Expected locations:")
-            for path in tesseract_paths:
-                print(f"- {path}")
+            runs.append([number, number + 1])
+    return [tuple(run) for run in runs]
+
+def iter_rasterized_pages(pdf_path, page_numbers, dpi=OCR_DPI, queue_pages=RASTER_QUEUE_PAGES):
+    """Yield (page number, grayscale image) for ``page_numbers`` (from 0, sorted), in order
+
+    Pages are rendered a range at a time on a background thread into a
+    queue of ``queue_pages``, so the consumer works on the first pages
+    while later ones render and at most a few images exist at once.
+    Rendering errors, and pages that didn't render, are raised to the
+    consumer.
+    """
+    queue = Queue(maxsize=max(1, queue_pages))
+    stop = threading.Event()
+    done = object()
+
+    def put(item):
+        # Give up when the consumer has gone away
+        while not stop.is_set():
+            try:
+                queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                pass
+        return False
+
+    def render():
+        runs = page_runs(page_numbers)
+        if runs and runs[0][1] - runs[0][0] > 1:
+            # The first page alone, so OCR starts as soon as it is rendered
+            runs[:1] = [(runs[0][0], runs[0][0] + 1), (runs[0][0] + 1, runs[0][1])]
+        try:
+            for start, end in runs:
+                images = convert_from_path(pdf_path, dpi=dpi, grayscale=True, first_page=start + 1, last_page=end)
+                if len(images) != end - start:
+                    # Past the last page, or pdftoppm gave up part-way
+                    raise ValueError(f"Rendered {len(images)} of pages {start + 1}-{end} of {pdf_path}")
+                images.reverse()
+                for number in range(start, end):
+                    if not put((number, images.pop())):
+                        return
+            put(done)
+        except Exception as e:
+            put(e)
+
+    renderer = threading.Thread(target=render, name="pdf-raster", daemon=True)
+    renderer.start()
+    try:
+        while True:
+            item = queue.get()
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
 
-        # Initialize the summarizer model
-        self.summarizer = pipeline("summarization", model="sshleifer/distilbart-cnn-12-6")
+def iter_ocr_pages(pdf_path, page_numbers, dpi=OCR_DPI):
+    """Yield (page number, text) of scanned pages in order, rendered and recognized as a pipeline
+
+    Every worker of the process's Tesseract pool recognizes a page while
+    the next ones render.
+    """
+    pool = get_tesseract_pool()
+    pending = deque()
+    for number, image in iter_rasterized_pages(pdf_path, page_numbers, dpi):
+        pending.append((number, pool.submit(image)))
+        while len(pending) >= pool.workers:
+            number, future = pending.popleft()
+            yield number, future.result()
+    for number, future in pending:
+        yield number, future.result()
+
+class PDFProcessor:
+    def __init__(self, output_folder="output", fan_out=DEFAULT_FAN_OUT, max_depth=DEFAULT_MAX_DEPTH,
+                 workers=DEFAULT_WORKERS, hierarchical_min_chars=HIERARCHICAL_MIN_CHARS,
+                 batch_size=SUMMARY_BATCH_SIZE, engine=SUMMARIZER_ENGINE):
+        # Tesseract is probed and the model loaded once per process
+        registry.get("tesseract")
+        self.model_name = SUMMARIZER_MODEL
+        self.engine = engine
+        self.summarizer = load_summarizer(self.model_name, engine)
+        self.batch_size = batch_size
+        self.scheduler = load_scheduler(self.model_name, engine) if INFERENCE_SCHEDULER else None
+
+        # Hierarchical summarization settings for long documents
+        self.fan_out = fan_out
+        self.max_depth = max_depth
+        self.workers = workers
+        self.hierarchical_min_chars = hierarchical_min_chars
 
         # Ensure the output folder exists
         self.output_folder = output_folder
         os.makedirs(self.output_folder, exist_ok=True)
 
     def extract_text_with_ocr(self, pdf_path):
-        """Extract text from a PDF using OCR if necessary."""
-        text = ""
+        """Extract text from a PDF, using OCR for the pages without selectable text."""
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                for page in pdf.pages:
-                    extracted_text = page.extract_text()
-                    if extracted_text:
-                        text += extracted_text + "\n"
-
-            if not text.strip():
-                print("📸 No selectable text found, using OCR...")
-                images = convert_from_path(pdf_path)
-                for img in images:
-                    text += pytesseract.image_to_string(img) + "\n"
+            # Long PDFs are extracted page range by page range on a process pool
+            pages = extract_pages(pdf_path, backend="pdfplumber")
+
+            # Only the scanned pages are rendered, a few at a time, while OCR runs
+            scanned = [number for number, page in enumerate(pages) if needs_ocr(page)]
+            if scanned:
+                print(f"📸 {len(scanned)} of {len(pages)} pages have no selectable text, using OCR...")
+                try:
+                    for number, page in iter_ocr_pages(pdf_path, scanned):
+                        pages[number] = page
+                except Exception as e:
+                    print(f"Error running OCR: {e}")
 
+            text = "".join(page + "\n" for page in pages if page)
             return text.strip() if text.strip() else None
         except Exception as e:
             print(f"Error extracting text: {e}")
             return None
 
-    def summarize_text(self, text):
-        """Summarize the extracted text using a transformer model."""
+    def summarize_text(self, text, hierarchical=None):
+        """Summarize the extracted text using a transformer model.
+
+        Long texts are summarized hierarchically unless ``hierarchical`` is
+        given explicitly.
+        """
+        if hierarchical is None:
+            hierarchical = len(text) >= self.hierarchical_min_chars
+        if hierarchical:
+            return self.summarize_hierarchical(text)
+
         try:
-            max_chunk = 256
-            chunks = [text[i:i+max_chunk] for i in range(0, len(text), max_chunk)]
-            summarized_chunks = []
+            start = time.perf_counter()
+            summary, chunk_count = summarize_batched(self.summarizer, text, self.batch_size, self.scheduler)
+            elapsed = time.perf_counter() - start
+            print(f"📖 Summarized {chunk_count} chunks in {elapsed:.1f}s ({chunk_count / max(elapsed, 1e-9):.2f} chunks/s)")
+            return summary
+        except Exception as e:
+            print(f"Error summarizing text: {str(e)}")
+            return None
 
-            for chunk in chunks:
-                summary = self.summarizer(chunk, max_length=2000, min_length=50, do_sample=False)
-                summarized_chunks.append(summary[0]['summary_text'])
+    def summarize_hierarchical(self, text):
+        """Summarize sections with the process's model, then summarize their summaries.
 
-            return "\n".join(summarized_chunks)
+        Sections are sent to the inference scheduler from ``workers`` shared
+        threads, so they fill each other's batches; without the scheduler
+        they are summarized one after another.
+        """
+        try:
+            # The model is loaded once per process: no worker processes with copies of their own
+            pool = load_hierarchical_threads(self.workers) if self.scheduler is not None else None
+            summary, stats = hierarchical_summarize(
+                text, lambda chunk: summarize_batched(self.summarizer, chunk, self.batch_size, self.scheduler)[0],
+                fan_out=self.fan_out, max_depth=self.max_depth, chunk_chars=HIERARCHICAL_CHUNK_CHARS,
+                workers=self.workers if pool is not None else 1, pool=pool
+            )
+            print(f"🧩 Hierarchical summary: {stats['chunks']} chunks, tasks per level {stats['levels']}")
+            return summary
         except Exception as e:
             print(f"Error summarizing text: {str(e)}")
             return None
 
     def extract_keywords(self, text, num_keywords=10):
-        """Extract top keywords using TF-IDF."""
+        """Extract the top keyphrases (RAKE-style co-occurrence scoring)."""
         try:
-            vectorizer = TfidfVectorizer(stop_words="english")
-            tfidf_matrix = vectorizer.fit_transform([text])
-            feature_names = vectorizer.get_feature_names_out()
-            scores = tfidf_matrix.sum(axis=0).A1
-            keywords = sorted(zip(feature_names, scores), key=lambda x: x[1], reverse=True)
-            return [keyword for keyword, _ in keywords[:num_keywords]]
+            return [item['phrase'] for item in extract_keyphrases(text, num_keywords)]
         except Exception as e:
             print(f"Error extracting keywords: {str(e)}")
             return []
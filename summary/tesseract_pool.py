@@ -0,0 +1,155 @@
+# Persistent Tesseract workers for the summary apps
+# Each worker thread keeps one Tesseract instance (language data loaded once) and recognizes images from a shared queue
+
+import os
+import sys
+import threading
+from concurrent.futures import Future
+from queue import SimpleQueue
+
+# Tesseract instances per process (0 = one per core); each holds its own copy
+# of the language data
+TESSERACT_WORKERS = int(os.environ.get('TESSERACT_WORKERS', 0)) or os.cpu_count() or 1
+
+# Parallel instances would otherwise each start an OpenMP thread per core
+# and slow each other down; must be set before libtesseract is loaded
+if TESSERACT_WORKERS > 1:
+    os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+
+import pytesseract
+
+try:
+    import tesserocr
+except ImportError:  # Optional C API binding; without it every image starts a tesseract process
+    tesserocr = None
+
+# Shared modules live next to app-web.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ocr_cache import OCRCache, image_key
+
+# Recognition languages, as for ``tesseract -l`` (e.g. eng+deu)
+TESSERACT_LANG = os.environ.get('TESSERACT_LANG', 'eng')
+
+# auto (tesserocr when installed), tesserocr or pytesseract
+OCR_ENGINE = os.environ.get('OCR_ENGINE', 'auto')
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Texts of recently recognized images by perceptual hash, so a re-uploaded
+# scan or screenshot (re-compressed or resized) isn't recognized again
+ocr_cache = OCRCache()
+
+
+class TesseractPool:
+    """Worker threads recognizing PIL images from one queue.
+
+    With the ``tesserocr`` engine every worker owns a Tesseract API
+    instance that loads the language data once, and tesserocr releases the
+    GIL while recognizing, so the workers run in parallel. The
+    ``pytesseract`` engine keeps the same interface but still starts one
+    ``tesseract`` process per image.
+    """
+
+    def __init__(self, workers=TESSERACT_WORKERS, lang=TESSERACT_LANG, engine=None):
+        if engine is None:
+            engine = 'tesserocr' if OCR_ENGINE == 'auto' and tesserocr is not None else OCR_ENGINE
+            engine = 'pytesseract' if engine == 'auto' else engine
+        if engine == 'tesserocr' and tesserocr is None:
+            raise RuntimeError('OCR_ENGINE=tesserocr but the tesserocr package is not installed')
+        if engine not in ('tesserocr', 'pytesseract'):
+            raise ValueError(f'Unknown OCR engine: {engine}')
+
+        self.engine = engine
+        self.lang = lang
+        self.workers = max(1, workers)
+        self.pid = os.getpid()
+        self.pages = 0
+        self._queue = SimpleQueue()
+        self._lock = threading.Lock()
+        # Created up front so missing language data fails here, not on the first image
+        apis = [tesserocr.PyTessBaseAPI(lang=lang) if engine == 'tesserocr' else None for _ in range(self.workers)]
+        self._threads = [
+            threading.Thread(target=self._run, args=(api,), name=f'tesseract-{i}', daemon=True)
+            for i, api in enumerate(apis)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _recognize(self, api, image):
+        if api is None:
+            return pytesseract.image_to_string(image, lang=self.lang)
+        try:
+            api.SetImage(image)
+            return api.GetUTF8Text()
+        finally:
+            api.Clear()
+
+    def _run(self, api):
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    return
+                image, future = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(self._recognize(api, image))
+                except Exception as e:
+                    future.set_exception(e)
+                with self._lock:
+                    self.pages += 1
+        finally:
+            if api is not None:
+                api.End()
+
+    def submit(self, image):
+        """Future of the text recognized in a PIL image (done at once for an image in the OCR cache)"""
+        future = Future()
+        scope = f'tesseract:{self.lang}'
+        key = image_key(image) if ocr_cache.max_entries > 0 else None
+        text = ocr_cache.get(key, scope)
+        if text is not None:
+            future.set_result(text)
+            return future
+        if key is not None:
+            future.add_done_callback(lambda done: _remember(done, key, scope))
+        self._queue.put((image, future))
+        return future
+
+    def image_to_string(self, image):
+        return self.submit(image).result()
+
+    def close(self):
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def stats(self):
+        return {'engine': self.engine, 'workers': self.workers, 'lang': self.lang, 'pages': self.pages,
+                'cache': ocr_cache.stats()}
+
+
+def _remember(future, key, scope):
+    if not future.cancelled() and future.exception() is None and future.result().strip():
+        ocr_cache.set(key, future.result(), scope)
+
+
+def get_tesseract_pool():
+    """This process's Tesseract pool, started on first use
+
+    Threads don't survive a fork, so a pool inherited from a preloading
+    parent (gunicorn --preload) is replaced in the child.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid():
+            _pool = TesseractPool()
+        return _pool
+
+
+def image_to_string(image):
+    """Text recognized in a PIL image by the process's Tesseract pool"""
+    return get_tesseract_pool().image_to_string(image)
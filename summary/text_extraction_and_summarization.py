@@ -1,6 +1,9 @@
 import os
+import shutil
 import pytesseract
 from PIL import Image
+from model_registry import registry
+from tesseract_pool import image_to_string
 
 # Set Tesseract path for Windows
 tesseract_paths = [
@@ -16,32 +19,40 @@ def find_tesseract():
             return path
     return None
 
+def configure_tesseract():
+    """Point pytesseract at the Tesseract executable; returns its path or None"""
+    # Set Tesseract path for Windows, otherwise use the one on PATH
+    tesseract_path = find_tesseract() or shutil.which(pytesseract.pytesseract.tesseract_cmd)
+    if tesseract_path:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_path
+    else:
+        print("Warning: Tesseract not found in common locations.")
+        print("Please install Tesseract from: https://github.com/UB-Mannheim/tesseract/wiki")
+        print("Expected locations:")
+        for path in tesseract_paths:
+            print(f"- {path}")
+    return tesseract_path
+
+# Probed once per process instead of on every request
+registry.register("tesseract", configure_tesseract)
+
 class TextExtractorAndSummarizer:
     def __init__(self):
-        # Set Tesseract path for Windows
-        tesseract_path = find_tesseract()
-        if tesseract_path:
-            pytesseract.pytesseract.tesseract_cmd = tesseract_path
-        else:
-            print("Warning: Tesseract not found in common locations.")
-            print("Please install Tesseract from: https://github.com/UB-Mannheim/tesseract/wiki")
-            print("Expected locations:")
-            for path in tesseract_paths:
-                print(f"- {path}")
+        self.tesseract_path = registry.get("tesseract")
 
     def extract_text_from_image(self, image_path):
         """
         Extract text from an image using Tesseract OCR
         """
         try:
-            if not os.path.exists(pytesseract.pytesseract.tesseract_cmd):
+            if not self.tesseract_path:
                 raise Exception(f"Tesseract not found at: {pytesseract.pytesseract.tesseract_cmd}")
 
             # Open the image
             image = Image.open(image_path)
             
             # Extract text from the image
-            extracted_text = pytesseract.image_to_string(image)
+            extracted_text = image_to_string(image)
             
             if not extracted_text.strip():
                 print("Warning: No text was extracted from the image")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test script for the perceptual-hash OCR cache: same-template images must
+not share OCR text, re-compressed and resized copies must
+"""
+
+from io import BytesIO
+
+from PIL import Image, ImageDraw, ImageFont
+
+from ocr_cache import OCRCache, image_key
+
+FIELDS = [("Policy number", "PX-4471-0092"), ("Claimant", "Jordan Smith"), ("Date of loss", "2024-03-14"),
+          ("Claim amount", "$1,234.56"), ("Account", "DE44 5001 0517 5407 3249 31")]
+
+
+def font(size):
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:  # Pillow < 10.1 has only the small bitmap font
+        return ImageFont.load_default()
+
+
+def claim_form(fields):
+    image = Image.new('L', (1700, 2200), 255)
+    draw = ImageDraw.Draw(image)
+    draw.text((120, 110), "INSURANCE CLAIM FORM - Section A", fill=0, font=font(44))
+    for row, (label, value) in enumerate(fields):
+        y = 300 + row * 110
+        draw.text((120, y), label, fill=0, font=font(30))
+        draw.rectangle((700, y - 10, 1580, y + 45), outline=0, width=2)
+        draw.text((720, y), value, fill=0, font=font(30))
+    return image
+
+
+def bank_screenshot(balance):
+    image = Image.new('RGB', (1080, 1920), (245, 247, 250))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, 0, 1080, 180), fill=(20, 60, 140))
+    draw.text((60, 60), "MyBank", fill='white', font=font(56))
+    draw.text((60, 260), "Available balance", fill=(90, 90, 90), font=font(40))
+    draw.text((60, 330), balance, fill=(0, 0, 0), font=font(96))
+    for i in range(8):
+        draw.text((60, 600 + i * 140), f"Card payment ACME STORE {i}", fill=(30, 30, 30), font=font(38))
+    return image
+
+
+def jpeg_copy(image, quality):
+    buffer = BytesIO()
+    image.convert('RGB').save(buffer, 'JPEG', quality=quality)
+    buffer.seek(0)
+    return Image.open(buffer)
+
+
+def cached_text(stored, lookup):
+    cache = OCRCache(max_entries=8)
+    cache.set(image_key(stored), 'stored text')
+    return cache.get(image_key(lookup))
+
+
+def test_same_template_images_do_not_match():
+    """Different filled-in values must never reuse the other document's text"""
+    form = claim_form(FIELDS)
+    for old, new in [('Jordan Smith', 'Alex Brown'), ('1,234.56', '1,284.56'), ('3249 31', '3249 37')]:
+        other = claim_form([(label, value.replace(old, new)) for label, value in FIELDS])
+        assert cached_text(form, other) is None, f"form with {new} matched the one with {old}"
+    assert cached_text(bank_screenshot("$12,345.67"), bank_screenshot("$12,845.67")) is None
+    assert cached_text(bank_screenshot("$12,345.67"), bank_screenshot("$12,345.61")) is None
+
+
+def test_copies_match():
+    """Re-compressed and resized copies reuse the stored text"""
+    for image in (claim_form(FIELDS), bank_screenshot("$12,345.67")):
+        width, height = image.size
+        for copy in (jpeg_copy(image, 40), image.resize((width * 2 // 3, height * 2 // 3)),
+                     jpeg_copy(image.resize((width // 2, height // 2)), 60)):
+            assert cached_text(image, copy) == 'stored text'
+
+
+def test_scopes_and_crops_do_not_match():
+    form = claim_form(FIELDS)
+    cache = OCRCache(max_entries=8)
+    cache.set(image_key(form), 'stored text', 'ocr.space')
+    assert cache.get(image_key(form), 'tesseract:eng') is None
+    assert cache.get(image_key(form.crop((0, 0, 1700, 1200))), 'ocr.space') is None
+
+
+if __name__ == "__main__":
+    for test in (test_same_template_images_do_not_match, test_copies_match, test_scopes_and_crops_do_not_match):
+        test()
+        print(f"✅ {test.__name__}")
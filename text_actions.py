@@ -0,0 +1,69 @@
+# Text actions behind the /process-text endpoint of app-web.py
+# Summary, analysis and keywords are all computed from one SentenceIndex per request
+
+from summarizer_engine import SentenceIndex, STOP_WORDS, WEB_SENTENCE_PATTERN, clean_text, ranked_summary_sentences
+from graph_summarizer import rank_sentences
+from text_analytics import analyze, format_analysis, top_terms
+from idf_lexicon import apply_lexicon
+from keyphrases import index_keyphrases
+
+TEXT_ACTIONS = ('summarize', 'analyze', 'keywords')
+
+# Summary modes computed from the one index (hierarchical chunks the raw text instead)
+TEXT_SUMMARY_MODES = ('advanced', 'graph')
+
+# Sentences per summary for the popup's length setting
+SUMMARY_LENGTHS = {'brief': 3, 'detailed': 7}
+
+KEYWORD_COUNT = 20
+
+
+def build_index(text, phrase_breaks=False):
+    """Clean ``text`` and tokenize it once for every action (with keyphrase breaks if asked)"""
+    text = clean_text(text)
+    index = SentenceIndex.from_text(text, WEB_SENTENCE_PATTERN, min_length=10, stop_words=STOP_WORDS,
+                                    phrase_breaks=phrase_breaks)
+    return text, apply_lexicon(index)
+
+
+def summarize_index(index, text, lengths, mode='advanced'):
+    """``{name: summary}`` for ``{name: sentences}`` from one ranking; short texts are returned whole
+
+    ``mode`` is one of TEXT_SUMMARY_MODES.
+    """
+    if mode not in TEXT_SUMMARY_MODES:
+        raise ValueError(f"Unsupported summarization mode for text: {mode}")
+    scores = rank_sentences(index) if mode == 'graph' else None
+    return render_summaries(index.summary_ranking(scores), len(index), text, lengths)
+
+
+def render_summaries(ranking, sentence_count, text, lengths):
+    """``{name: summary}`` for ``{name: sentences}`` from a summary_ranking() of ``text``"""
+    return {
+        name: text if sentence_count <= max_sentences else '. '.join(ranked_summary_sentences(ranking, max_sentences)) + '.'
+        for name, max_sentences in lengths.items()
+    }
+
+
+def process_text(text, actions, length='brief', mode='advanced', summaries=None):
+    """Run the requested actions on ``text`` with a single tokenization pass
+
+    Summaries come in every SUMMARY_LENGTHS length (``summaries``), so
+    switching length is served from the same result. Given ``summaries``
+    (those of a near-duplicate) they are reused; the other actions still
+    describe ``text``.
+    """
+    if summaries is None or set(actions) - {'summarize'}:
+        text, index = build_index(text, phrase_breaks='keywords' in actions)
+    result = {}
+    if 'summarize' in actions:
+        result['summaries'] = summaries if summaries is not None else summarize_index(index, text, SUMMARY_LENGTHS, mode)
+        result['summary'] = result['summaries'][length]
+    if 'analyze' in actions:
+        stats = analyze(index, text)
+        result['analysis'] = format_analysis(stats)
+        result['analysis_data'] = stats
+    if 'keywords' in actions:
+        result['keywords'] = top_terms(index, KEYWORD_COUNT)
+        result['keyphrases'] = index_keyphrases(index)
+    return result
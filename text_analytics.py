@@ -0,0 +1,154 @@
+# Document analytics computed from the SentenceIndex built for summarization
+# Readability, lexical diversity, reading time, language guess and top terms without re-tokenizing
+
+import heapq
+import math
+import operator
+import re
+
+# Same reading speed as the extension's own estimate
+WORDS_PER_MINUTE = 200
+
+TOP_TERMS = 10
+
+VOWEL_GROUP_PATTERN = re.compile(r'[aeiouyàáâãäåæèéêëìíîïòóôõöøùúûüýÿœ]+')
+
+# Syllable counts are cached per word across documents; the cache is
+# dropped when it grows past this many words
+SYLLABLE_CACHE_SIZE = 200000
+_syllable_cache = {}
+
+# Most frequent function words per language; the profile covering the most
+# of the document wins
+LANGUAGE_PROFILES = {
+    'en': ('the', 'and', 'of', 'to', 'is', 'in', 'that', 'it', 'for', 'was', 'with', 'this'),
+    'es': ('el', 'los', 'las', 'del', 'que', 'y', 'por', 'con', 'una', 'para', 'es', 'se'),
+    'fr': ('le', 'les', 'des', 'et', 'est', 'une', 'pour', 'dans', 'pas', 'du', 'au', 'qui'),
+    'de': ('der', 'die', 'und', 'das', 'ist', 'nicht', 'ein', 'eine', 'mit', 'den', 'von', 'zu'),
+    'it': ('il', 'di', 'che', 'per', 'sono', 'non', 'del', 'gli', 'della', 'una', 'con', 'è'),
+    'pt': ('de', 'que', 'não', 'uma', 'para', 'com', 'os', 'do', 'da', 'em', 'por', 'é'),
+    'nl': ('het', 'een', 'en', 'van', 'is', 'dat', 'niet', 'op', 'met', 'voor', 'zijn', 'de'),
+}
+
+# Share of the words a profile must cover before a language is reported
+MIN_LANGUAGE_COVERAGE = 0.05
+
+
+def count_syllables(word):
+    """Vowel-group syllable estimate (a trailing silent 'e' doesn't count)"""
+    groups = len(VOWEL_GROUP_PATTERN.findall(word))
+    if groups > 1 and word.endswith('e') and not word.endswith(('le', 'ee')):
+        groups -= 1
+    return max(groups, 1)
+
+
+def total_syllables(words, freq):
+    """Sum of count_syllables() over ``words`` weighted by ``freq``"""
+    try:
+        return sum(map(operator.mul, map(_syllable_cache.__getitem__, words), freq))
+    except KeyError:
+        # Summed from this call's own counts: another request's thread may
+        # clear the shared cache in the meantime
+        counts = [_syllable_cache.get(word) or count_syllables(word) for word in words]
+        if len(_syllable_cache) > SYLLABLE_CACHE_SIZE:
+            _syllable_cache.clear()
+        _syllable_cache.update(zip(words, counts))
+        return sum(map(operator.mul, counts, freq))
+
+
+def top_terms(index, count=TOP_TERMS):
+    """Highest weighted keywords (no stop words or short words), first seen first on ties
+
+    Keywords are ranked by frequency, or by tf-idf once the index has
+    corpus weights (idf_lexicon.apply_lexicon).
+    """
+    freq = index.keyword_freq
+    weights = index.keyword_weights
+    # Only words weighing at least as much as the count-th heaviest can make the list
+    threshold = max(heapq.nlargest(count, weights)[-1:], default=0)
+    candidates = [word_id for word_id, weight in enumerate(weights) if weight and weight >= threshold]
+    best = heapq.nlargest(count, candidates, key=weights.__getitem__)
+    words = list(index.vocab)
+    return [{'term': words[i], 'count': freq[i]} for i in best]
+
+
+def guess_language(index):
+    """ISO 639-1 code of the best matching function-word profile and its coverage"""
+    vocab = index.vocab
+    freq = index.term_freq
+    words = index.word_count
+    best, coverage = 'unknown', 0.0
+    if not words:
+        return {'code': best, 'confidence': coverage}
+    for code, profile in LANGUAGE_PROFILES.items():
+        hits = sum(freq[vocab[word]] for word in profile if word in vocab) / words
+        if hits > coverage:
+            best, coverage = code, hits
+    if coverage < MIN_LANGUAGE_COVERAGE:
+        best = 'unknown'
+    return {'code': best, 'confidence': round(coverage, 3)}
+
+
+def readability(words, sentences, syllables):
+    """Flesch reading ease and Flesch-Kincaid grade level"""
+    if not words or not sentences:
+        return {'flesch_reading_ease': 0, 'flesch_kincaid_grade': 0}
+    words_per_sentence = words / sentences
+    syllables_per_word = syllables / words
+    return {
+        'flesch_reading_ease': round(206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word, 1),
+        'flesch_kincaid_grade': round(0.39 * words_per_sentence + 11.8 * syllables_per_word - 15.59, 1)
+    }
+
+
+def analyze(index, text, terms=TOP_TERMS):
+    """Document statistics from an index built by SentenceIndex.from_text
+
+    Everything is derived from the index's vocabulary and per-word counts,
+    so the cost grows with the number of distinct words rather than with
+    the length of ``text``.
+    """
+    words = index.word_count
+    sentence_count = len(index)
+    offsets = index.offsets
+    syllables = total_syllables(index.vocab, index.term_freq)
+    return {
+        'characters': len(text),
+        'words': words,
+        'sentences': sentence_count,
+        'unique_words': len(index.vocab),
+        'average_sentence_length': round(len(index.token_ids) / sentence_count, 1) if sentence_count else 0,
+        'longest_sentence': max(map(operator.sub, offsets[1:], offsets[:-1]), default=0),
+        'lexical_diversity': round(len(index.vocab) / words, 3) if words else 0,
+        'syllables_per_word': round(syllables / words, 2) if words else 0,
+        **readability(words, sentence_count, syllables),
+        'reading_time_minutes': math.ceil(words / WORDS_PER_MINUTE),
+        'language': guess_language(index),
+        'top_keywords': top_terms(index, terms)
+    }
+
+
+def compression_stats(original_length, summary):
+    """The stats block returned with every summary"""
+    return {
+        'original_length': original_length,
+        'summary_length': len(summary),
+        'compression_ratio': f"{len(summary)/original_length*100:.1f}%" if original_length > 0 else "N/A"
+    }
+
+
+def format_analysis(stats):
+    """Readable analysis for the extension popup"""
+    keywords = ', '.join(f"{item['term']} ({item['count']})" for item in stats['top_keywords'])
+    return (
+        f"📊 CONTENT ANALYSIS\n\n"
+        f"Words: {stats['words']:,}\n"
+        f"Sentences: {stats['sentences']:,}\n"
+        f"Unique words: {stats['unique_words']:,}\n"
+        f"Average sentence length: {stats['average_sentence_length']} words\n"
+        f"Lexical diversity: {stats['lexical_diversity']}\n"
+        f"Reading ease: {stats['flesch_reading_ease']} (grade {stats['flesch_kincaid_grade']})\n"
+        f"Language: {stats['language']['code']}\n"
+        f"Reading time: ~{stats['reading_time_minutes']} min\n\n"
+        f"🔑 Top terms: {keywords or 'none'}"
+    )
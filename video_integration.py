@@ -12,8 +12,21 @@ from urllib.parse import urlparse, parse_qs
 # Add the current directory to path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-def advanced_summarize(text):
+def format_summary(summary, text):
+    """Add the SummaBrowser header and word counts to a summary, as app-web.py does"""
+    return f"📄 SUMMARY (Generated by SummaBrowser AI)\n\n{summary}\n\n---\nSummary contains {len(summary.split())} words from original {len(text.split())} words."
+
+def advanced_summarize(text, mode='advanced'):
     """Enhanced text summarization (import from main app)"""
+    if mode == 'graph':
+        # Graph ranking copes well with long, repetitive transcripts
+        from graph_summarizer import graph_summarize
+        return format_summary(graph_summarize(text), text)
+    if mode == 'hierarchical':
+        # Long transcripts are summarized in sections on a process pool
+        from hierarchical_summarizer import hierarchical_extractive_summarize
+        return format_summary(hierarchical_extractive_summarize(text)[0], text)
+    
     try:
         # Import from the main app
         from app import advanced_summarize as main_summarizer
@@ -46,7 +59,7 @@ def advanced_summarize(text):
         summary_length = min(3, len(top_sentences))
         summary = '. '.join([sentence for sentence, score in top_sentences[:summary_length]])
         
-        return summary if summary else text[:500] + "..."
+        return format_summary(summary, text) if summary else text[:500] + "..."
 
 class VideoProcessor:
     def __init__(self):
@@ -67,7 +80,7 @@ class VideoProcessor:
         except:
             return None
     
-    def get_youtube_transcript(self, video_url):
+    def get_youtube_transcript(self, video_url, mode='advanced'):
         """Get YouTube transcript using youtube-transcript-api"""
         try:
             from youtube_transcript_api import YouTubeTranscriptApi
@@ -97,7 +110,7 @@ class VideoProcessor:
                 metadata = {}
             
             # Generate summary
-            summary = advanced_summarize(transcript)
+            summary = advanced_summarize(transcript, mode)
             
             return {
                 'success': True,
@@ -112,7 +125,7 @@ class VideoProcessor:
         except Exception as e:
             return None, f"YouTube processing failed: {str(e)}"
     
-    def transcribe_with_assemblyai(self, video_url):
+    def transcribe_with_assemblyai(self, video_url, mode='advanced'):
         """Use official AssemblyAI package for video transcription"""
         try:
             import assemblyai as aai
@@ -138,7 +151,7 @@ class VideoProcessor:
             transcript_text = transcript.text if transcript.text else ""
             
             # Generate summary using our own function since AssemblyAI doesn't provide it
-            summary_text = advanced_summarize(transcript_text) if transcript_text else ""
+            summary_text = advanced_summarize(transcript_text, mode) if transcript_text else ""
             
             # Extract highlights if available
             highlights = []
@@ -161,7 +174,7 @@ class VideoProcessor:
         except Exception as e:
             return None, f"AssemblyAI error: {str(e)}"
     
-    def process_video(self, video_input, input_type='url'):
+    def process_video(self, video_input, input_type='url', mode='advanced'):
         """Main video processing function"""
         try:
             if input_type == 'url':
@@ -170,18 +183,18 @@ class VideoProcessor:
                 # Check if it's a YouTube URL
                 if 'youtube.com' in video_url or 'youtu.be' in video_url:
                     # Try YouTube transcript first (free and fast)
-                    result = self.get_youtube_transcript(video_url)
+                    result = self.get_youtube_transcript(video_url, mode)
                     if result and isinstance(result, dict) and result.get('success'):
                         return result
                     elif result and len(result) == 2 and result[0] is None:
                         # If transcript fails, try AssemblyAI
-                        result = self.transcribe_with_assemblyai(video_url)
+                        result = self.transcribe_with_assemblyai(video_url, mode)
                         return result
                     else:
                         return result  # Return the original result
                 else:
                     # For other video URLs, use AssemblyAI
-                    return self.transcribe_with_assemblyai(video_url)
+                    return self.transcribe_with_assemblyai(video_url, mode)
             
             elif input_type == 'file':
                 # Handle file upload using AssemblyAI
@@ -207,7 +220,7 @@ class VideoProcessor:
                     
                     # Extract results
                     transcript_text = transcript.text if transcript.text else ""
-                    summary_text = advanced_summarize(transcript_text) if transcript_text else ""
+                    summary_text = advanced_summarize(transcript_text, mode) if transcript_text else ""
                     
                     # Extract highlights if available
                     highlights = []
@@ -239,9 +252,9 @@ class VideoProcessor:
 # Global video processor instance
 video_processor = VideoProcessor()
 
-def process_video_request(video_input, input_type='url'):
+def process_video_request(video_input, input_type='url', mode='advanced'):
     """Process video request and return result"""
-    result = video_processor.process_video(video_input, input_type)
+    result = video_processor.process_video(video_input, input_type, mode)
     
     if result and isinstance(result, dict) and result.get('success'):
         return result